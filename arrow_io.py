@@ -0,0 +1,293 @@
+import os
+from array import array
+from model import TrafficAnalysisResult, TrafficRecord, TrafficRecords
+from columnar import HALF_HOUR_SECONDS, ColumnarTrafficData, require_numpy
+from timestamps import parse_slot
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, only Parquet and Arrow files need it
+    pa = pc = pq = None
+
+TIMESTAMP_COLUMN = "timestamp"
+CAR_COUNT_COLUMN = "car_count"
+COLUMNS = [TIMESTAMP_COLUMN, CAR_COUNT_COLUMN]
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+PARQUET_MAGIC = b"PAR1"
+ARROW_FILE_MAGIC = b"ARROW1"
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+
+
+def require_pyarrow():
+    """
+    Function to fail early with a clear message when pyarrow is not installed.
+    """
+    if pa is None:
+        raise ImportError("Parquet and Arrow files require pyarrow, install it with `pip install pyarrow`")
+
+
+def arrow_format(file_path: str) -> str | None:
+    """
+    Function to detect a Parquet ("parquet"), Arrow IPC file ("arrow") or Arrow IPC stream ("arrow_stream")
+    data file from its first bytes, None for a text data file or a path which is not a file.
+    """
+    if not os.path.isfile(file_path):
+        return None
+    with open(file_path, "rb") as data_file:
+        magic = data_file.read(len(ARROW_FILE_MAGIC))
+    if magic.startswith(PARQUET_MAGIC):
+        return "parquet"
+    if magic == ARROW_FILE_MAGIC:
+        return "arrow"
+    if magic.startswith(ARROW_STREAM_MAGIC):
+        return "arrow_stream"
+    return None
+
+
+def range_filter(timestamp_type, start_slot: int | None = None, end_slot: int | None = None):
+    """
+    Function to build the filter expression keeping the rows from start_slot up to, excluding, end_slot,
+    None without a range. The bounds are compared as the type of the timestamp column, timestamps
+    or yyyy-mm-ddThh:mm:ss strings, which sort the same way.
+    """
+    expression = None
+    for slot, keep in ((start_slot, lambda column, bound: column >= bound),
+                       (end_slot, lambda column, bound: column < bound)):
+        if slot is None:
+            continue
+        bound = pa.scalar(slot * HALF_HOUR_SECONDS, pa.int64()).cast(pa.timestamp("s"))
+        if pa.types.is_string(timestamp_type) or pa.types.is_large_string(timestamp_type):
+            bound = pc.strftime(bound, format=TIMESTAMP_FORMAT)
+        else:
+            bound = bound.cast(timestamp_type)
+        condition = keep(pc.field(TIMESTAMP_COLUMN), bound)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def parquet_row_groups(parquet_file, start_slot: int | None = None, end_slot: int | None = None) -> list[int]:
+    """
+    Function to get the row groups of a Parquet file which can hold rows from start_slot up to, excluding,
+    end_slot, from the min and max statistics of their timestamp column. Row groups without statistics are kept.
+    """
+    metadata = parquet_file.metadata
+    column = metadata.schema.names.index(TIMESTAMP_COLUMN)
+    row_groups = []
+    for i in range(metadata.num_row_groups):
+        statistics = metadata.row_group(i).column(column).statistics
+        if statistics is not None and statistics.has_min_max:
+            first_slot, last_slot = (parse_slot(value if isinstance(value, str) else value.strftime(TIMESTAMP_FORMAT))
+                                     for value in (statistics.min, statistics.max))
+            if (start_slot is not None and last_slot < start_slot) or (end_slot is not None and first_slot >= end_slot):
+                continue
+        row_groups.append(i)
+    return row_groups
+
+
+def read_arrow_table(file_path: str, start_slot: int | None = None, end_slot: int | None = None) -> "pa.Table":
+    """
+    Function to read the timestamp and car_count columns of a Parquet or Arrow IPC file, other columns
+    are never read. Parquet row groups whose statistics are out of the range from start_slot up to,
+    excluding, end_slot are skipped without being read. Arrow IPC files are memory mapped, so their
+    columns are used in place.
+    """
+    require_pyarrow()
+    file_format = arrow_format(file_path)
+    if file_format == "parquet":
+        timestamp_type = pq.read_schema(file_path).field(TIMESTAMP_COLUMN).type
+        return pq.read_table(file_path, columns=COLUMNS, filters=range_filter(timestamp_type, start_slot, end_slot))
+    source = pa.memory_map(file_path)
+    reader = pa.ipc.open_file(source) if file_format == "arrow" else pa.ipc.open_stream(source)
+    table = reader.read_all().select(COLUMNS)
+    expression = range_filter(table.schema.field(TIMESTAMP_COLUMN).type, start_slot, end_slot)
+    return table if expression is None else table.filter(expression)
+
+
+def iter_arrow_batches(file_path: str, start_slot: int | None = None, end_slot: int | None = None):
+    """
+    Function to read the timestamp and car_count columns of a Parquet or Arrow IPC file batch by batch,
+    so only one batch is in memory at a time. Parquet row groups whose statistics are out of the range
+    from start_slot up to, excluding, end_slot are skipped without being read.
+    """
+    require_pyarrow()
+    file_format = arrow_format(file_path)
+    if file_format == "parquet":
+        parquet_file = pq.ParquetFile(file_path)
+        row_groups = parquet_row_groups(parquet_file, start_slot, end_slot)
+        batches = parquet_file.iter_batches(row_groups=row_groups, columns=COLUMNS)
+        timestamp_type = parquet_file.schema_arrow.field(TIMESTAMP_COLUMN).type
+    else:
+        source = pa.memory_map(file_path)
+        reader = pa.ipc.open_file(source) if file_format == "arrow" else pa.ipc.open_stream(source)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches)) if file_format == "arrow" else reader
+        timestamp_type = reader.schema.field(TIMESTAMP_COLUMN).type
+    expression = range_filter(timestamp_type, start_slot, end_slot)
+    for batch in batches:
+        batch = batch.select(COLUMNS)
+        yield batch if expression is None else batch.filter(expression)
+
+
+def slot_column(timestamps) -> "pa.ChunkedArray":
+    """
+    Function to convert a timestamp column, of Arrow timestamps or yyyy-mm-ddThh:mm:ss strings, to int64 slots.
+    """
+    if pa.types.is_string(timestamps.type) or pa.types.is_large_string(timestamps.type):
+        timestamps = pc.strptime(timestamps, format=TIMESTAMP_FORMAT, unit="s")
+    seconds = timestamps.cast(pa.timestamp("s")).cast(pa.int64())
+    return pc.divide(seconds, HALF_HOUR_SECONDS)
+
+
+def int64_values(column) -> array:
+    """
+    Function to copy the values of an int64 Arrow column into an int64 array, from its buffers.
+    """
+    values = array("q")
+    chunks = column.chunks if isinstance(column, pa.ChunkedArray) else [column]
+    for chunk in chunks:
+        chunk = chunk.cast(pa.int64())
+        if chunk.null_count:
+            raise ValueError("Traffic data columns cannot have missing values")
+        data = memoryview(chunk.buffers()[1]).cast("B")
+        values.frombytes(data[chunk.offset * 8:(chunk.offset + len(chunk)) * 8])
+    return values
+
+
+def table_to_records(table) -> TrafficRecords:
+    """
+    Function to convert a table, or a record batch, of timestamp and car_count columns to TrafficRecords.
+    """
+    return TrafficRecords(int64_values(slot_column(table.column(TIMESTAMP_COLUMN))),
+                          int64_values(table.column(CAR_COUNT_COLUMN)))
+
+
+def read_arrow_records(file_path: str, start_slot: int | None = None, end_slot: int | None = None) -> TrafficRecords:
+    """
+    Function to read a Parquet or Arrow IPC file into TrafficRecords.
+    """
+    return table_to_records(read_arrow_table(file_path, start_slot, end_slot))
+
+
+def read_arrow_columns(file_path: str, start_slot: int | None = None, end_slot: int | None = None):
+    """
+    Function to read a Parquet or Arrow IPC file into ColumnarTrafficData, as numpy views of the
+    Arrow columns where their type and layout allow it.
+    """
+    require_numpy()
+    table = read_arrow_table(file_path, start_slot, end_slot)
+    seconds = pc.multiply(slot_column(table.column(TIMESTAMP_COLUMN)), HALF_HOUR_SECONDS)
+    return ColumnarTrafficData(timestamps=seconds.to_numpy(),
+                               car_counts=table.column(CAR_COUNT_COLUMN).cast(pa.int32()).to_numpy())
+
+
+def iter_arrow_records(file_path: str, start_slot: int | None = None, end_slot: int | None = None):
+    """
+    Function to read a Parquet or Arrow IPC file lazily as a generator of TrafficRecord, batch by batch.
+    """
+    for batch in iter_arrow_batches(file_path, start_slot, end_slot):
+        yield from table_to_records(batch)
+
+
+def iter_arrow_slots(file_path: str):
+    """
+    Function to read a Parquet or Arrow IPC file lazily as (slot, car_count) pairs, batch by batch.
+    """
+    for batch in iter_arrow_batches(file_path):
+        records = table_to_records(batch)
+        yield from zip(records.slots, records.car_counts)
+
+
+def records_to_arrow(records) -> "pa.Table":
+    """
+    Function to export TrafficRecords, or any TrafficRecord iterable, as a table of timestamp and
+    car_count columns. The int64 arrays of TrafficRecords are copied in one block each, since an array
+    exported to Arrow cannot grow while the table holds it.
+    """
+    require_pyarrow()
+    if not isinstance(records, TrafficRecords):
+        records = TrafficRecords.from_records(records)
+    slots = pa.Array.from_buffers(pa.int64(), len(records), [None, pa.py_buffer(records.slots.tobytes())])
+    car_counts = pa.Array.from_buffers(pa.int64(), len(records), [None, pa.py_buffer(records.car_counts.tobytes())])
+    timestamps = pc.multiply(slots, HALF_HOUR_SECONDS).cast(pa.timestamp("s"))
+    return pa.table({TIMESTAMP_COLUMN: timestamps, CAR_COUNT_COLUMN: car_counts})
+
+
+def columns_to_arrow(timestamps, car_counts) -> "pa.Table":
+    """
+    Function to export numpy columns of epoch seconds and car counts as a table of timestamp and
+    car_count columns. The timestamps are handed to Arrow without copying them.
+    """
+    require_pyarrow()
+    return pa.table({TIMESTAMP_COLUMN: pa.array(timestamps).cast(pa.timestamp("s")),
+                     CAR_COUNT_COLUMN: pa.array(car_counts).cast(pa.int64())})
+
+
+def window_records_table(records: list[TrafficRecord]) -> "pa.Table":
+    """
+    Function to export TrafficRecord of half hours or windows as a table with their duration, "N/A" as null.
+    """
+    records = [record for record in records if record.timestamp != "N/A"]
+    return pa.table({
+        TIMESTAMP_COLUMN: pa.array([record.slot * HALF_HOUR_SECONDS for record in records], pa.int64())
+        .cast(pa.timestamp("s")),
+        CAR_COUNT_COLUMN: pa.array([record.car_count for record in records], pa.int64()),
+        "duration_mins": pa.array([record.duration_mins for record in records], pa.int64())
+    })
+
+
+def traffic_table(traffic: dict, key: str, key_type) -> "pa.Table":
+    """
+    Function to export a dict of cars seen per date, hour, week, month or day of the week as a table.
+    """
+    keys = pa.array(list(traffic), pa.string())
+    if key_type == "date":
+        keys = pc.strptime(keys, format="%Y-%m-%d", unit="s").cast(pa.date32())
+    elif key_type == "timestamp":
+        keys = pc.strptime(keys, format=TIMESTAMP_FORMAT, unit="s")
+    return pa.table({key: keys, CAR_COUNT_COLUMN: pa.array(list(traffic.values()), pa.int64())})
+
+
+def result_to_arrow(result: TrafficAnalysisResult) -> dict:
+    """
+    Function to export the aggregates of a TrafficAnalysisResult as Arrow tables keyed by section,
+    the rollup sections only when they are set.
+    """
+    require_pyarrow()
+    tables = {
+        "total_traffic": pa.table({CAR_COUNT_COLUMN: pa.array([result.total_traffic], pa.int64())}),
+        "daily_traffic": traffic_table(result.daily_traffic, "date", "date"),
+        "top_n_half_hours": window_records_table(result.top_n_half_hours),
+        "least_ninety_mins_traffic": window_records_table([result.least_ninety_mins_traffic])
+    }
+    rollups = {"hourly_traffic": ("hour", "timestamp"), "weekly_traffic": ("week", "date"),
+               "monthly_traffic": ("month", None), "day_of_week_traffic": ("day_of_week", None)}
+    for section, (key, key_type) in rollups.items():
+        if getattr(result, section) is not None:
+            tables[section] = traffic_table(getattr(result, section), key, key_type)
+    return tables
+
+
+def write_table(table, file_path: str):
+    """
+    Function to write a table as a Parquet file when the path ends with .parquet, else as an Arrow IPC file.
+    """
+    require_pyarrow()
+    if file_path.endswith(".parquet"):
+        pq.write_table(table, file_path)
+        return
+    with pa.OSFile(file_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def write_result(result: TrafficAnalysisResult, output_dir: str, suffix: str = ".arrow") -> list[str]:
+    """
+    Function to write each section of a TrafficAnalysisResult to its own file in output_dir,
+    named after the section, and return the paths written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for section, table in result_to_arrow(result).items():
+        paths.append(os.path.join(output_dir, section + suffix))
+        write_table(table, paths[-1])
+    return paths
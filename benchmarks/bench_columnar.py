@@ -0,0 +1,56 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_daily_traffic import write_half_hour_file
+from traffic_analyzer import TrafficAnalyzer
+
+
+def measure(file_path, **analyzer_options):
+    """
+    Function to measure load memory and the time of every analysis for one backend.
+    """
+    tracemalloc.start()
+    analyzer = TrafficAnalyzer(file_path, **analyzer_options).load()
+    loaded_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    analyzer.calculate_traffic()
+    analyzer.get_daily_traffic()
+    analyzer.get_top_n_half_hours(n=3)
+    analyzer.least_cars_in_ninety_mins()
+    return loaded_bytes, time.perf_counter() - start
+
+
+def main():
+    """
+    Benchmark of the list backend against the columnar backend,
+    run as `python -m benchmarks.bench_columnar --records 10000000`.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000, help="Number of half hour records")
+    args = parser.parse_args()
+
+    fd, file_path = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        write_half_hour_file(file_path, args.records)
+        list_bytes, list_seconds = measure(file_path)
+        columnar_bytes, columnar_seconds = measure(file_path, columnar=True)
+    finally:
+        os.unlink(file_path)
+
+    print(f"Records: {args.records}")
+    print("Backend    Memory (MB)   Analysis (s)")
+    print("-------------------------------------")
+    print(f"list       {list_bytes / 2**20:<13.1f} {list_seconds:.3f}")
+    print(f"columnar   {columnar_bytes / 2**20:<13.1f} {columnar_seconds:.3f}")
+    print(f"Memory {list_bytes / max(columnar_bytes, 1):.1f}x smaller, "
+          f"analysis {list_seconds / max(columnar_seconds, 1e-9):.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
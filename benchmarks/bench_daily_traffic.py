@@ -0,0 +1,57 @@
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from traffic_analyzer import TrafficAnalyzer
+
+
+def write_half_hour_file(file_path, n_records, start="2021-01-01T00:00:00"):
+    """
+    Function to write n_records contiguous half hour lines to the given file.
+    """
+    start_dt = datetime.fromisoformat(start)
+    with open(file_path, "w") as data_file:
+        for i in range(n_records):
+            timestamp = (start_dt + timedelta(minutes=30 * i)).isoformat()
+            data_file.write(f"{timestamp} {i % 97}\n")
+
+
+def time_daily_traffic(n_records):
+    """
+    Function to time get_daily_traffic on n_records half hour records.
+    """
+    fd, file_path = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        write_half_hour_file(file_path, n_records)
+        analyzer = TrafficAnalyzer(file_path).load()
+        start = time.perf_counter()
+        analyzer.get_daily_traffic()
+        return time.perf_counter() - start
+    finally:
+        os.unlink(file_path)
+
+
+def main():
+    """
+    Benchmark of get_daily_traffic, run as `python -m benchmarks.bench_daily_traffic`.
+    The time per record should stay flat as the input grows, i.e. the aggregation scales linearly.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-records", type=int, default=1_000_000,
+                        help="Largest input size to benchmark, e.g. 10000000")
+    args = parser.parse_args()
+
+    print("Records      Seconds    ns/record")
+    print("---------------------------------")
+    n_records = 1_000
+    while n_records <= args.max_records:
+        elapsed = time_daily_traffic(n_records)
+        print(f"{n_records:<12} {elapsed:<10.3f} {elapsed / n_records * 1e9:.0f}")
+        n_records *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from parallel import aggregate_files
+
+
+def write_daily_files(directory, n_files, records_per_file=48):
+    """
+    Function to write n_files consecutive days of half hour records, one file per day.
+    """
+    start = datetime(2021, 1, 1)
+    file_paths = []
+    for day in range(n_files):
+        file_path = os.path.join(directory, f"counter-{day:06d}.txt")
+        with open(file_path, "w") as data_file:
+            for i in range(records_per_file):
+                timestamp = (start + timedelta(days=day, minutes=30 * i)).isoformat()
+                data_file.write(f"{timestamp} {(day + i) % 97}\n")
+        file_paths.append(file_path)
+    return file_paths
+
+
+def main():
+    """
+    Benchmark of multi-file aggregation for an increasing number of worker processes,
+    run as `python -m benchmarks.bench_parallel --files 2000`.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1000, help="Number of daily files")
+    parser.add_argument("--records-per-file", type=int, default=48 * 20, help="Half hour records per file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_paths = write_daily_files(directory, args.files, args.records_per_file)
+
+        print(f"Files: {args.files}, records per file: {args.records_per_file}")
+        print("Workers    Seconds    Speedup")
+        print("-----------------------------")
+        baseline = None
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            start = time.perf_counter()
+            aggregate_files(file_paths, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:<10} {elapsed:<10.3f} {baseline / elapsed:.1f}x")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
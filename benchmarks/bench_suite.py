@@ -0,0 +1,157 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import main as main_module
+from benchmarks.synthetic_data import write_synthetic_file
+from traffic_analyzer import TrafficAnalyzer
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+TOLERANCE = 0.25
+MIN_SECONDS = 0.05
+MIN_PEAK_BYTES = 2**20
+
+QUERIES = {
+    "calculate_traffic": lambda analyzer: analyzer.calculate_traffic(),
+    "get_daily_traffic": lambda analyzer: analyzer.get_daily_traffic(),
+    "get_top_n_half_hours": lambda analyzer: analyzer.get_top_n_half_hours(n=3),
+    "get_bottom_n_half_hours": lambda analyzer: analyzer.get_bottom_n_half_hours(n=3),
+    "get_top_n_half_hours_per_day": lambda analyzer: analyzer.get_top_n_half_hours_per_day(n=3),
+    "least_cars_in_ninety_mins": lambda analyzer: analyzer.least_cars_in_ninety_mins(),
+    "get_window_extremes": lambda analyzer: analyzer.get_window_extremes(window_mins=180),
+    "get_traffic_between": lambda analyzer: analyzer.get_traffic_between("1970-01-01T00:00:00", "9999-12-31T23:30:00"),
+}
+
+
+def run_main(file_path):
+    """
+    Function to run main.main() end to end on the given file, returns what it printed.
+    """
+    output = io.StringIO()
+    with patch.object(sys, "argv", ["main.py", "--inputfile", file_path]), redirect_stdout(output):
+        main_module.main()
+    return output.getvalue()
+
+
+def measure(function, setup, n_records, repeat):
+    """
+    Function to measure the best time of repeat runs of function, after setup each time, and
+    the peak memory allocated by one more traced run. The checksum of the result catches
+    optimizations which change the answer.
+    """
+    seconds = min(timeit.repeat(function, setup=setup, number=1, repeat=repeat))
+    setup()
+    tracemalloc.start()
+    result = function()
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "records_per_second": n_records / max(seconds, 1e-9),
+        "peak_bytes": peak_bytes,
+        "checksum": hashlib.sha1(repr(result).encode()).hexdigest()[0:16],
+    }
+
+
+def benchmark_size(n_records, repeat=5):
+    """
+    Function to benchmark loading, every query and main end to end on a synthetic file of n_records.
+    Queries are memoized, so the query cache is cleared before each run.
+    """
+    fd, file_path = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        write_synthetic_file(file_path, n_records)
+        results = {"load": measure(lambda: len(TrafficAnalyzer(file_path).traffic_data), lambda: None,
+                                   n_records, repeat)}
+        analyzer = TrafficAnalyzer(file_path).load()
+        for name, query in QUERIES.items():
+            results[name] = measure(lambda: query(analyzer), analyzer.invalidate_cache, n_records, repeat)
+        results["main"] = measure(lambda: run_main(file_path), lambda: None, n_records, repeat)
+        return results
+    finally:
+        os.unlink(file_path)
+
+
+def compare_to_baseline(results, baseline, tolerance=TOLERANCE):
+    """
+    Function to list the regressions against the baseline: benchmarks more than tolerance slower
+    or using more than tolerance more memory, and benchmarks whose result changed.
+    Times under MIN_SECONDS and peaks under MIN_PEAK_BYTES are too noisy to compare.
+    """
+    regressions = []
+    for size, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            expected = baseline.get(size, {}).get(name)
+            if expected is None:
+                continue
+            if result["checksum"] != expected["checksum"]:
+                regressions.append(f"{name} on {size} records: result changed")
+            if max(result["seconds"], expected["seconds"]) >= MIN_SECONDS and \
+                    result["seconds"] > expected["seconds"] * (1 + tolerance):
+                regressions.append(f"{name} on {size} records: {result['seconds']:.3f}s, "
+                                   f"baseline {expected['seconds']:.3f}s")
+            if max(result["peak_bytes"], expected["peak_bytes"]) >= MIN_PEAK_BYTES and \
+                    result["peak_bytes"] > expected["peak_bytes"] * (1 + tolerance):
+                regressions.append(f"{name} on {size} records: {result['peak_bytes'] / 2**20:.1f} MB, "
+                                   f"baseline {expected['peak_bytes'] / 2**20:.1f} MB")
+    return regressions
+
+
+def main():
+    """
+    Benchmark suite of TrafficAnalyzer on synthetic data, compared against benchmarks/baseline.json,
+    run as `python -m benchmarks.bench_suite --sizes 1000 1000000`. Exits with status 1 when a
+    regression is flagged, `--update-baseline` stores the results as the new baseline instead.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Numbers of records to benchmark, from 1000 up to 100000000")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark, the best one is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Allowed slowdown, 0.25 is 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="Save the results as the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    print("Records      Benchmark                        Seconds    Records/s     Peak (MB)")
+    print("--------------------------------------------------------------------------------")
+    for n_records in args.sizes:
+        results[str(n_records)] = benchmark_size(n_records, args.repeat)
+        for name, result in results[str(n_records)].items():
+            print(f"{n_records:<12} {name:<32} {result['seconds']:<10.4f} {result['records_per_second']:<13.0f} "
+                  f"{result['peak_bytes'] / 2**20:.1f}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results},
+                      baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}, run with --update-baseline to create it")
+        return
+    with open(args.baseline) as baseline_file:
+        regressions = compare_to_baseline(results, json.load(baseline_file)["results"], args.tolerance)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for regression in regressions:
+            print(f"- {regression}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import timeit
+from datetime import datetime, timedelta
+
+from timestamps import parse_slot, slot_to_date
+
+
+def fromisoformat_path(timestamps):
+    """
+    Function to decode dates and contiguity the way traffic_analyzer.py used to,
+    through datetime.fromisoformat and isoformat() strings.
+    """
+    for previous, timestamp in zip(timestamps, timestamps[1:]):
+        datetime.fromisoformat(timestamp).date().strftime("%Y-%m-%d")
+        (datetime.fromisoformat(previous) + timedelta(minutes=30)).isoformat() == timestamp
+
+
+def slot_path(timestamps):
+    """
+    Function to decode dates and contiguity through half hour slots.
+    """
+    slots = [parse_slot(timestamp) for timestamp in timestamps]
+    for previous, slot in zip(slots, slots[1:]):
+        slot_to_date(slot)
+        previous + 1 == slot
+
+
+def main():
+    """
+    Micro-benchmark of the fixed width decoder, run as `python -m benchmarks.bench_timestamps`.
+    """
+    start = datetime(2021, 1, 1)
+    timestamps = [(start + timedelta(minutes=30 * i)).isoformat() for i in range(100_000)]
+
+    fromisoformat_seconds = min(timeit.repeat(lambda: fromisoformat_path(timestamps), number=1, repeat=5))
+    slot_seconds = min(timeit.repeat(lambda: slot_path(timestamps), number=1, repeat=5))
+
+    print(f"Timestamps: {len(timestamps)}")
+    print(f"fromisoformat   {fromisoformat_seconds:.3f}s")
+    print(f"parse_slot      {slot_seconds:.3f}s")
+    print(f"{fromisoformat_seconds / slot_seconds:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
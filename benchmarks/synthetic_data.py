@@ -0,0 +1,48 @@
+import argparse
+import math
+import random
+
+from timestamps import SLOTS_PER_DAY, parse_slot, slot_to_timestamp
+
+DAILY_PROFILE = [round(30 * (1 - math.cos(2 * math.pi * (slot - 8) / SLOTS_PER_DAY))) for slot in range(SLOTS_PER_DAY)]
+
+
+def synthetic_lines(n_records, seed=0, start="2021-01-01T00:00:00", gap_probability=0.01, max_gap_slots=48):
+    """
+    Function to generate n_records valid half hour lines, the same lines for the same arguments.
+    Car counts follow a daily profile with random noise, and after a record the next half hour
+    is missing with gap_probability, skipping up to max_gap_slots half hours, so the data spans
+    several days and has gaps that break the contiguous windows.
+    """
+    rng = random.Random(seed)
+    slot = parse_slot(start)
+    for _ in range(n_records):
+        yield f"{slot_to_timestamp(slot)} {DAILY_PROFILE[slot % SLOTS_PER_DAY] + rng.randrange(20)}\n"
+        slot += rng.randint(2, max_gap_slots) if rng.random() < gap_probability else 1
+
+
+def write_synthetic_file(file_path, n_records, seed=0, gap_probability=0.01):
+    """
+    Function to write n_records synthetic half hour lines to the given file.
+    """
+    with open(file_path, "w") as data_file:
+        data_file.writelines(synthetic_lines(n_records, seed=seed, gap_probability=gap_probability))
+
+
+def main():
+    """
+    Generator of synthetic data files,
+    run as `python -m benchmarks.synthetic_data data/synthetic.txt --records 100000000`.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file_path", help="File to write")
+    parser.add_argument("--records", type=int, default=1_000_000, help="Number of half hour records")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random car counts and gaps")
+    parser.add_argument("--gap-probability", type=float, default=0.01, help="Probability of a gap after a record")
+    args = parser.parse_args()
+
+    write_synthetic_file(args.file_path, args.records, seed=args.seed, gap_probability=args.gap_probability)
+
+
+if __name__ == "__main__":
+    main()
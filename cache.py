@@ -0,0 +1,132 @@
+import hashlib
+import os
+import struct
+import sys
+from array import array
+from model import TrafficRecords
+
+CACHE_DIR_NAME = ".traffic_cache"
+CACHE_REGISTRY_PATH = os.path.join(os.path.expanduser("~"), ".cache", "traffic_analyzer", "cache_dirs.txt")
+MAX_CACHE_BYTES = 1024 * 1024 * 1024
+CACHE_SUFFIX = ".bin"
+MAGIC = b"TRAFFIC1"
+HEADER = struct.Struct("<8sqqq")
+
+
+def default_cache_dir(data_file_path: str) -> str:
+    """
+    Function to get the cache directory next to a data file.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(data_file_path)), CACHE_DIR_NAME)
+
+
+def cache_file_path(data_file_path: str, cache_dir: str | None = None) -> str:
+    """
+    Function to get the cache file of a data file, named after the file and a hash of its absolute path.
+    """
+    data_file_path = os.path.abspath(data_file_path)
+    path_hash = hashlib.sha1(data_file_path.encode()).hexdigest()[0:16]
+    return os.path.join(cache_dir or default_cache_dir(data_file_path),
+                        f"{os.path.basename(data_file_path)}.{path_hash}{CACHE_SUFFIX}")
+
+
+def load_cached(data_file_path: str, cache_dir: str | None = None) -> TrafficRecords | None:
+    """
+    Function to load the cached records of a data file, None if there is no cache
+    or the data file changed since, i.e. its size or modification time differ.
+    A cache hit refreshes the modification time of the cache file, used for LRU eviction.
+    """
+    cache_path = cache_file_path(data_file_path, cache_dir)
+    try:
+        stat = os.stat(data_file_path)
+        with open(cache_path, "rb") as cache_file:
+            header = cache_file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return None
+            magic, size, mtime_ns, record_count = HEADER.unpack(header)
+            if (magic, size, mtime_ns) != (MAGIC, stat.st_size, stat.st_mtime_ns):
+                return None
+            traffic_records = TrafficRecords()
+            traffic_records.slots.fromfile(cache_file, record_count)
+            traffic_records.car_counts.fromfile(cache_file, record_count)
+        os.utime(cache_path)
+    except (OSError, EOFError):
+        return None
+    if sys.byteorder == "big":
+        traffic_records.slots.byteswap()
+        traffic_records.car_counts.byteswap()
+    return traffic_records
+
+
+def save_cached(data_file_path: str, traffic_records: TrafficRecords, cache_dir: str | None = None,
+                max_bytes: int = MAX_CACHE_BYTES, source_stat: os.stat_result | None = None,
+                registry_path: str | None = None):
+    """
+    Function to write the records of a data file to its cache file, as a header with the size and
+    modification time of the data file followed by the int64 slots and car counts, little endian.
+    source_stat should be taken before the data file was parsed, so a change during parsing
+    invalidates the cache. Least recently used cache files of every cache directory in the
+    registry are then removed until all of them together fit in max_bytes.
+    """
+    stat = source_stat or os.stat(data_file_path)
+    cache_path = cache_file_path(data_file_path, cache_dir)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    slots, car_counts = array("q", traffic_records.slots), array("q", traffic_records.car_counts)
+    if sys.byteorder == "big":
+        slots.byteswap()
+        car_counts.byteswap()
+
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as cache_file:
+        cache_file.write(HEADER.pack(MAGIC, stat.st_size, stat.st_mtime_ns, len(slots)))
+        slots.tofile(cache_file)
+        car_counts.tofile(cache_file)
+    os.replace(temp_path, cache_path)
+    cache_dirs = register_cache_dir(os.path.dirname(cache_path), registry_path)
+    evict_cached(*cache_dirs, max_bytes=max_bytes, keep=cache_path)
+
+
+def register_cache_dir(cache_dir: str, registry_path: str | None = None) -> list[str]:
+    """
+    Function to add a cache directory to the registry, a text file with one cache directory per line,
+    and return every registered cache directory which still exists. Directories removed since are
+    dropped from the registry.
+    """
+    registry_path = registry_path or CACHE_REGISTRY_PATH
+    try:
+        with open(registry_path) as registry_file:
+            registered = [line.rstrip("\n") for line in registry_file if line.strip()]
+    except FileNotFoundError:
+        registered = []
+    cache_dirs = [path for path in dict.fromkeys(registered + [os.path.abspath(cache_dir)]) if os.path.isdir(path)]
+    if cache_dirs != registered:
+        os.makedirs(os.path.dirname(registry_path), exist_ok=True)
+        temp_path = f"{registry_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as registry_file:
+            registry_file.writelines(f"{path}\n" for path in cache_dirs)
+        os.replace(temp_path, registry_path)
+    return cache_dirs
+
+
+def evict_cached(*cache_dirs: str, max_bytes: int = MAX_CACHE_BYTES, keep: str | None = None):
+    """
+    Function to remove the least recently used cache files of the cache directories until all of them
+    together fit in max_bytes. The keep file, the one just written, is never removed.
+    """
+    entries = []
+    for cache_dir in cache_dirs:
+        try:
+            scanned = list(os.scandir(cache_dir))
+        except FileNotFoundError:
+            continue
+        for entry in scanned:
+            if entry.name.endswith(CACHE_SUFFIX) and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        if path != keep:
+            os.remove(path)
+            total_bytes -= size
@@ -0,0 +1,317 @@
+import os
+from array import array
+from dataclasses import dataclass, replace
+from decompression import compression_format, iter_line_chunks, open_data_file
+from itertools import islice
+from model import TrafficRecord, TrafficRecords
+from readers import find_file_byte_ranges
+from rollups import Rollup
+from sliding_window import window_size
+from time_filter import TimeFilter
+from timestamps import SLOTS_PER_DAY
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only the columnar backend needs it
+    np = None
+
+SECONDS_PER_DAY = 24 * 60 * 60
+SECONDS_PER_HOUR = 60 * 60
+HALF_HOUR_SECONDS = 30 * 60
+CHUNK_LINES = 1_000_000
+CHUNK_BYTES = 64 * 1024 * 1024
+COUNT_OFFSET = len("yyyy-mm-ddThh:mm:ss ")
+
+
+def require_numpy():
+    """
+    Function to fail early with a clear message when numpy is not installed.
+    """
+    if np is None:
+        raise ImportError("The columnar backend requires numpy, install it with `pip install numpy`")
+
+
+@dataclass
+class ColumnarTrafficData:
+    """
+    Class to hold traffic data as columns instead of a list of TrafficRecord.
+    Timestamps are stored as int64 epoch seconds and car counts as int32,
+    so every analysis runs as a vectorized numpy operation.
+    """
+    timestamps: "np.ndarray"
+    car_counts: "np.ndarray"
+
+    @classmethod
+    def from_file(cls, data_file_path: str):
+        """
+        Function to read the data file into columns, chunk by chunk to bound the temporary lists.
+        """
+        require_numpy()
+        timestamp_chunks, car_count_chunks = [], []
+        with open_data_file(data_file_path, "r") as data_file:
+            while lines := list(islice(data_file, CHUNK_LINES)):
+                tokens = " ".join(lines).split()
+                timestamp_chunks.append(np.array(tokens[0::2], dtype="datetime64[s]").view(np.int64))
+                car_count_chunks.append(np.array(tokens[1::2], dtype=np.int32))
+        return cls.from_columns(timestamp_chunks, car_count_chunks)
+
+    @classmethod
+    def from_mmap(cls, data_file_path: str, time_filter: TimeFilter = TimeFilter()):
+        """
+        Function to read a memory mapped data file into columns without creating any per line object.
+        The file is scanned as bytes in chunks ending at a newline. As the timestamp has a fixed width,
+        every field is decoded for all lines of a chunk at once from its byte offset.
+        With a time_filter only the byte range of its time range, found by binary search in the file
+        in time order, is decoded, and its time of day range is then selected on the decoded columns.
+        A compressed file is decoded the same way from its decompressed chunks of whole lines, then filtered.
+        """
+        require_numpy()
+        if os.path.getsize(data_file_path) == 0:
+            return cls.from_columns([], [])
+        if compression_format(data_file_path):
+            columns = [_decode_lines(np.frombuffer(chunk, dtype=np.uint8), 0, len(chunk))
+                       for chunk in iter_line_chunks(data_file_path)]
+            columns = cls.from_columns([timestamps for timestamps, _ in columns],
+                                       [car_counts for _, car_counts in columns])
+            return columns.select(time_filter)
+        buffer = np.memmap(data_file_path, dtype=np.uint8, mode="r")
+        time_range = replace(time_filter, first_slot_of_day=None, slots_of_day=None)
+        byte_ranges = find_file_byte_ranges(data_file_path, time_range) if time_range else [(0, len(buffer))]
+        timestamp_chunks, car_count_chunks = [], []
+        for range_start, range_end in byte_ranges:
+            chunk_start = range_start
+            while chunk_start < range_end:
+                chunk_end = min(chunk_start + CHUNK_BYTES, range_end)
+                if chunk_end < range_end:
+                    chunk_end = chunk_start + int(np.flatnonzero(buffer[chunk_start:chunk_end] == ord("\n"))[-1]) + 1
+                timestamps, car_counts = _decode_lines(buffer, chunk_start, chunk_end)
+                timestamp_chunks.append(timestamps)
+                car_count_chunks.append(car_counts)
+                chunk_start = chunk_end
+        columns = cls.from_columns(timestamp_chunks, car_count_chunks)
+        if time_filter and np.any(np.diff(columns.timestamps) < 0):
+            raise ValueError(f"{data_file_path} is not in time order, a time range needs a file in time order")
+        return columns.select(time_filter)
+
+    def select(self, time_filter: TimeFilter):
+        """
+        Function to select the half hours of time_filter, as new columns.
+        """
+        if not time_filter:
+            return self
+        slots = self.timestamps // HALF_HOUR_SECONDS
+        selected = np.ones(len(slots), dtype=bool)
+        if time_filter.start_slot is not None:
+            selected &= slots >= time_filter.start_slot
+        if time_filter.end_slot is not None:
+            selected &= slots < time_filter.end_slot
+        if time_filter.first_slot_of_day is not None:
+            selected &= (slots - time_filter.first_slot_of_day) % SLOTS_PER_DAY < time_filter.slots_of_day
+        return ColumnarTrafficData(timestamps=self.timestamps[selected], car_counts=self.car_counts[selected])
+
+    @classmethod
+    def from_records(cls, records: list[TrafficRecord]):
+        """
+        Function to build columns from TrafficRecord objects.
+        """
+        require_numpy()
+        return cls(
+            timestamps=np.array([record.slot for record in records], dtype=np.int64) * HALF_HOUR_SECONDS,
+            car_counts=np.array([record.car_count for record in records], dtype=np.int32)
+        )
+
+    @classmethod
+    def from_traffic_records(cls, traffic_records: TrafficRecords):
+        """
+        Function to build columns from the slot and car count arrays of TrafficRecords, without records.
+        """
+        require_numpy()
+        return cls(
+            timestamps=np.frombuffer(traffic_records.slots, dtype=np.int64) * HALF_HOUR_SECONDS,
+            car_counts=np.frombuffer(traffic_records.car_counts, dtype=np.int64).astype(np.int32)
+        )
+
+    def to_traffic_records(self) -> TrafficRecords:
+        """
+        Function to convert the columns into TrafficRecords.
+        Raises ValueError if a timestamp is not on a half hour, slots cannot represent it.
+        """
+        if not self.on_half_hours():
+            raise ValueError("Timestamps which are not on a half hour cannot be stored as slots")
+        traffic_records = TrafficRecords()
+        traffic_records.slots.frombytes((self.timestamps // HALF_HOUR_SECONDS).astype(np.int64).tobytes())
+        traffic_records.car_counts.frombytes(self.car_counts.astype(np.int64).tobytes())
+        return traffic_records
+
+    def on_half_hours(self) -> bool:
+        """
+        Function to check every timestamp is on a half hour, so the columns can be converted to slots.
+        """
+        return not np.any(self.timestamps % HALF_HOUR_SECONDS)
+
+    @classmethod
+    def from_columns(cls, timestamp_chunks: list, car_count_chunks: list):
+        """
+        Function to concatenate column chunks into one ColumnarTrafficData.
+        """
+        require_numpy()
+        if not timestamp_chunks:
+            return cls(timestamps=np.empty(0, dtype=np.int64), car_counts=np.empty(0, dtype=np.int32))
+        return cls(timestamps=np.concatenate(timestamp_chunks), car_counts=np.concatenate(car_count_chunks))
+
+    def __len__(self):
+        return len(self.car_counts)
+
+    def calculate_traffic(self):
+        """
+        Function to calculate total traffic.
+        """
+        return int(self.car_counts.sum(dtype=np.int64))
+
+    def get_daily_traffic(self):
+        """
+        Function to calculate daily traffic ordered by date.
+        """
+        days, day_index = np.unique(self.timestamps // SECONDS_PER_DAY, return_inverse=True)
+        day_totals = np.bincount(day_index.ravel(), weights=self.car_counts, minlength=len(days)).astype(np.int64)
+        dates = np.datetime_as_string(days.astype("datetime64[D]"))
+        return {str(date): int(total) for date, total in zip(dates, day_totals)}
+
+    def get_top_n_half_hours(self, n=3, largest=True):
+        """
+        Function to get top (or bottom) n half hours with highest (or lowest) traffic.
+        Only the candidates at or beyond the n-th count are sorted,
+        ties keep the input order like a stable sort of the full list.
+        """
+        if n <= 0 or len(self) == 0:
+            return []
+        keys = self.car_counts.astype(np.int64) if largest else -self.car_counts.astype(np.int64)
+        if n < len(self):
+            threshold = np.partition(keys, len(self) - n)[len(self) - n]
+            candidates = np.flatnonzero(keys >= threshold)
+        else:
+            candidates = np.arange(len(self))
+        order = np.lexsort((candidates, -keys[candidates]))
+        return [self._record_at(i) for i in candidates[order][0:n]]
+
+    def hourly_rollup(self) -> Rollup:
+        """
+        Function to sum the cars and records of every hour into a Rollup, vectorized.
+        """
+        if len(self) == 0:
+            return Rollup()
+        hours = self.timestamps // SECONDS_PER_HOUR
+        start = int(hours.min())
+        car_counts = np.bincount(hours - start, weights=self.car_counts).astype(np.int64)
+        return Rollup(start, array("q", car_counts.tolist()), array("q", np.bincount(hours - start).tolist()))
+
+    def iter_records(self):
+        """
+        Function to iterate over the columns as TrafficRecord.
+        """
+        for i in range(len(self)):
+            yield self._record_at(i)
+
+    def least_cars_in_ninety_mins(self):
+        """
+        Function to find the timestamp with least number of cars seen in next 90 minutes.
+        """
+        return self.get_window_extremes(window_mins=90)[0]
+
+    def get_window_extremes(self, window_mins=90):
+        """
+        Function to find the contiguous windows of window_mins with least and most cars seen.
+        Window sums come from a cumulative sum and gaps from a cumulative count of
+        non contiguous neighbours, so any window length runs in O(n).
+        """
+        size = window_size(window_mins)
+        not_available = TrafficRecord(timestamp="N/A", car_count=0, duration_mins=window_mins)
+        if len(self) < size:
+            return not_available, not_available
+
+        gaps = np.concatenate(([0], np.cumsum(np.diff(self.timestamps) != HALF_HOUR_SECONDS)))
+        contiguous = gaps[size - 1:] == gaps[:len(gaps) - size + 1]
+        if not contiguous.any():
+            return not_available, not_available
+
+        running_counts = np.concatenate(([0], np.cumsum(self.car_counts, dtype=np.int64)))
+        window_counts = running_counts[size:] - running_counts[:-size]
+        starts = np.flatnonzero(contiguous)
+        least = starts[np.argmin(window_counts[starts])]
+        most = starts[np.argmax(window_counts[starts])]
+        return (
+            TrafficRecord.from_slot(self._slot_at(least), car_count=int(window_counts[least]), duration_mins=window_mins),
+            TrafficRecord.from_slot(self._slot_at(most), car_count=int(window_counts[most]), duration_mins=window_mins)
+        )
+
+    def _slot_at(self, i: int):
+        """
+        Function to get the half hour slot of the timestamp at index i.
+        """
+        return int(self.timestamps[i]) // HALF_HOUR_SECONDS
+
+    def _record_at(self, i: int):
+        """
+        Function to get the half hour at index i as TrafficRecord.
+        """
+        return TrafficRecord.from_slot(self._slot_at(i), car_count=int(self.car_counts[i]))
+
+
+def _decode_lines(buffer, chunk_start: int, chunk_end: int):
+    """
+    Function to decode the whole lines of buffer[chunk_start:chunk_end] into
+    int64 epoch seconds and int32 car counts.
+    """
+    newlines = chunk_start + np.flatnonzero(buffer[chunk_start:chunk_end] == ord("\n"))
+    if len(newlines) == 0 or newlines[-1] != chunk_end - 1:
+        newlines = np.append(newlines, chunk_end)
+    starts = np.concatenate(([chunk_start], newlines[:-1] + 1))
+    ends = newlines.copy()
+    has_carriage_return = (ends > starts) & (buffer[np.maximum(ends - 1, 0)] == ord("\r"))
+    ends[has_carriage_return] -= 1
+    starts, ends = starts[ends > starts], ends[ends > starts]
+    if len(starts) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+    if (ends - starts <= COUNT_OFFSET).any():
+        raise ValueError(f"Invalid line at byte {int(starts[ends - starts <= COUNT_OFFSET][0])}")
+
+    def number(offset, width):
+        value = np.zeros(len(starts), dtype=np.int64)
+        for i in range(width):
+            digit = buffer[starts + offset + i].astype(np.int64) - ord("0")
+            if ((digit < 0) | (digit > 9)).any():
+                raise ValueError(f"Invalid timestamp at byte {int(starts[(digit < 0) | (digit > 9)][0])}")
+            value = value * 10 + digit
+        return value
+
+    separators_ok = ((buffer[starts + 4] == ord("-")) & (buffer[starts + 7] == ord("-")) &
+                     (buffer[starts + 10] == ord("T")) & (buffer[starts + 13] == ord(":")) &
+                     (buffer[starts + 16] == ord(":")) & (buffer[starts + 19] == ord(" ")))
+    if not separators_ok.all():
+        raise ValueError(f"Invalid timestamp at byte {int(starts[~separators_ok][0])}")
+
+    days = _days_from_civil(number(0, 4), number(5, 2), number(8, 2))
+    timestamps = days * SECONDS_PER_DAY + number(11, 2) * 3600 + number(14, 2) * 60 + number(17, 2)
+
+    widths = ends - starts - COUNT_OFFSET
+    car_counts = np.zeros(len(starts), dtype=np.int64)
+    for i in range(int(widths.max())):
+        in_count = i < widths
+        digit = buffer[np.where(in_count, starts + COUNT_OFFSET + i, starts)].astype(np.int64) - ord("0")
+        if ((in_count & ((digit < 0) | (digit > 9)))).any():
+            raise ValueError(f"Invalid car count at byte {int(starts[in_count & ((digit < 0) | (digit > 9))][0])}")
+        car_counts = np.where(in_count, car_counts * 10 + digit, car_counts)
+    return timestamps, car_counts.astype(np.int32)
+
+
+def _days_from_civil(year, month, day):
+    """
+    Function to convert year, month and day arrays into days since 1970-01-01
+    (H. Hinnant's days_from_civil, exact for the proleptic Gregorian calendar).
+    """
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
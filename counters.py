@@ -0,0 +1,220 @@
+import os
+import re
+from dataclasses import dataclass, field
+from decompression import open_data_file
+from model import TrafficAnalysisResult, TrafficRecord
+from time_filter import TimeFilter
+from traffic_aggregator import TrafficAggregator
+
+DEFAULT_COUNTER = "default"
+SHARD_SUFFIX = ".txt"
+COUNTER_ID_PATTERN = re.compile(r"\w[\w.-]*")
+SHARD_BUFFER_LINES = 4096
+SHARD_MANIFEST_NAME = ".counters"
+
+
+def parse_counter_line(line: str) -> tuple[str, TrafficRecord] | None:
+    """
+    Function to parse a line with an optional counter id column after the car count,
+    e.g. "2021-12-01T05:00:00 5 counter-7", into (counter_id, TrafficRecord), None for a blank line.
+    Lines without counter id belong to DEFAULT_COUNTER, so single counter files read as one counter.
+    """
+    fields = line.split()
+    if not fields:
+        return None
+    if len(fields) == 2:
+        return DEFAULT_COUNTER, TrafficRecord(timestamp=fields[0], car_count=int(fields[1]))
+    timestamp, car_count, counter_id = fields
+    return counter_id, TrafficRecord(timestamp=timestamp, car_count=int(car_count))
+
+
+def read_counter_records(file_path: str):
+    """
+    Function to read a multi-counter data file lazily as a generator of (counter_id, TrafficRecord).
+    """
+    with open_data_file(file_path, "r") as data_file:
+        for line in data_file:
+            counter_record = parse_counter_line(line)
+            if counter_record is not None:
+                yield counter_record
+
+
+def counter_shard_path(shard_dir: str, counter_id: str) -> str:
+    """
+    Function to get the shard file of a counter, a data file named after the counter id.
+    """
+    if not COUNTER_ID_PATTERN.fullmatch(counter_id):
+        raise ValueError(f"Invalid counter id: {counter_id!r}")
+    return os.path.join(shard_dir, f"{counter_id}{SHARD_SUFFIX}")
+
+
+def analysis_result(aggregator: TrafficAggregator, n: int | None = None) -> TrafficAnalysisResult:
+    """
+    Function to turn an aggregate into the report of its top n half hours, n defaults to top_n.
+    """
+    return TrafficAnalysisResult(
+        total_traffic=aggregator.total_traffic,
+        daily_traffic=aggregator.get_daily_traffic(),
+        top_n_half_hours=aggregator.get_top_n_half_hours(n),
+        least_ninety_mins_traffic=aggregator.least_cars_in_ninety_mins()
+    )
+
+
+@dataclass
+class CounterAggregator:
+    """
+    Class to aggregate the records of many counters in a single pass.
+    1. Keeps a TrafficAggregator per counter, fed with the records of that counter only
+    2. Keeps the cars seen in each half hour over all counters, for the global aggregates
+
+    The global aggregates see the whole network as a single counter: the total, daily
+    traffic, top n half hours and least window of the cars summed per half hour.
+    The records of each counter are expected in time order, but the counters can be
+    interleaved in any way. Memory is bounded by the number of counters times days,
+    plus the number of distinct half hours, independent of the number of records.
+    """
+    top_n: int = 3
+    window_mins: int = 90
+    counters: dict[str, TrafficAggregator] = field(default_factory=dict)
+    slot_totals: dict[int, int] = field(default_factory=dict)
+
+    def add(self, counter_id: str, record: TrafficRecord):
+        """
+        Function to update the aggregates of the counter and the global aggregates with the given record.
+        """
+        aggregator = self.counters.get(counter_id)
+        if aggregator is None:
+            aggregator = self.counters[counter_id] = TrafficAggregator(top_n=self.top_n, window_mins=self.window_mins)
+        aggregator.add(record)
+        self.slot_totals[record.slot] = self.slot_totals.get(record.slot, 0) + record.car_count
+
+    def global_records(self):
+        """
+        Function to get the cars seen in each half hour over all counters, as TrafficRecord in time order.
+        """
+        for slot in sorted(self.slot_totals):
+            yield TrafficRecord.from_slot(slot, self.slot_totals[slot])
+
+    def global_aggregator(self) -> TrafficAggregator:
+        """
+        Function to aggregate the half hour totals over all counters.
+        """
+        aggregator = TrafficAggregator(top_n=self.top_n, window_mins=self.window_mins)
+        for record in self.global_records():
+            aggregator.add(record)
+        return aggregator
+
+    def counter_results(self, n: int | None = None) -> dict[str, TrafficAnalysisResult]:
+        """
+        Function to get the report of each counter, ordered by counter id.
+        """
+        return {counter_id: analysis_result(self.counters[counter_id], n) for counter_id in sorted(self.counters)}
+
+
+class CounterShardWriter:
+    """
+    Class to split records by counter into shards, one data file per counter in the
+    single counter format, so a counter can later be analyzed without reading the others.
+    Lines are buffered per counter and appended in batches, so hundreds of counters do
+    not keep hundreds of files open. Shards are written to temporary files which replace
+    the previous shards on close, and the shards of counters of the previous pass which are
+    not in this one are removed. The counters of the last pass are listed in a manifest file,
+    so other files in the shard directory are never removed.
+    """
+
+    def __init__(self, shard_dir: str):
+        self.shard_dir = shard_dir
+        self.buffers: dict[str, list[str]] = {}
+        os.makedirs(shard_dir, exist_ok=True)
+
+    def add(self, counter_id: str, record: TrafficRecord):
+        """
+        Function to add a record to the shard of its counter.
+        """
+        buffer = self.buffers.get(counter_id)
+        if buffer is None:
+            open(self._temp_path(counter_id), "w").close()
+            buffer = self.buffers[counter_id] = []
+        buffer.append(f"{record.timestamp} {record.car_count}\n")
+        if len(buffer) >= SHARD_BUFFER_LINES:
+            self._flush(counter_id)
+
+    def close(self) -> dict[str, str]:
+        """
+        Function to write the remaining lines, replace the shards and remove the stale ones,
+        returns the shard file of each counter.
+        """
+        shard_paths = {}
+        for counter_id in sorted(self.buffers):
+            self._flush(counter_id)
+            shard_paths[counter_id] = counter_shard_path(self.shard_dir, counter_id)
+            os.replace(self._temp_path(counter_id), shard_paths[counter_id])
+        self.buffers.clear()
+        manifest_path = os.path.join(self.shard_dir, SHARD_MANIFEST_NAME)
+        try:
+            with open(manifest_path) as manifest_file:
+                previous_counter_ids = manifest_file.read().split()
+        except FileNotFoundError:
+            previous_counter_ids = []
+        for counter_id in previous_counter_ids:
+            if counter_id not in shard_paths and COUNTER_ID_PATTERN.fullmatch(counter_id):
+                try:
+                    os.remove(counter_shard_path(self.shard_dir, counter_id))
+                except FileNotFoundError:
+                    pass
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as manifest_file:
+            manifest_file.writelines(f"{counter_id}\n" for counter_id in shard_paths)
+        os.replace(temp_path, manifest_path)
+        return shard_paths
+
+    def discard(self):
+        """
+        Function to remove the temporary files of a pass which did not finish, keeping the previous shards.
+        """
+        for counter_id in self.buffers:
+            try:
+                os.remove(self._temp_path(counter_id))
+            except FileNotFoundError:
+                pass
+        self.buffers.clear()
+
+    def _flush(self, counter_id: str):
+        """
+        Function to append the buffered lines of a counter to its temporary shard file.
+        """
+        with open(self._temp_path(counter_id), "a") as shard_file:
+            shard_file.writelines(self.buffers[counter_id])
+        self.buffers[counter_id].clear()
+
+    def _temp_path(self, counter_id: str) -> str:
+        """
+        Function to get the temporary file a shard is written to until close.
+        """
+        return f"{counter_shard_path(self.shard_dir, counter_id)}.{os.getpid()}.tmp"
+
+
+def aggregate_counters(file_paths: list[str], top_n: int = 3, window_mins: int = 90,
+                       shard_dir: str | None = None, time_filter: TimeFilter = TimeFilter()) -> CounterAggregator:
+    """
+    Function to aggregate multi-counter data files, in file order, per counter and globally
+    in a single pass. With a shard_dir the records are also split into one shard file per
+    counter in that same pass. With a time_filter only the selected records are aggregated
+    and written to the shards, the lines of all counters being interleaved they are all parsed.
+    """
+    aggregator = CounterAggregator(top_n=top_n, window_mins=window_mins)
+    shard_writer = CounterShardWriter(shard_dir) if shard_dir else None
+    try:
+        for file_path in file_paths:
+            for counter_id, record in read_counter_records(file_path):
+                if time_filter and not time_filter.contains(record.slot):
+                    continue
+                aggregator.add(counter_id, record)
+                if shard_writer:
+                    shard_writer.add(counter_id, record)
+        if shard_writer:
+            shard_writer.close()
+    finally:
+        if shard_writer:
+            shard_writer.discard()
+    return aggregator
@@ -0,0 +1,175 @@
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, only .zst files need it
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+READ_BYTES = 1024 * 1024
+QUEUE_CHUNKS = 8
+
+
+def compression_format(file_path: str) -> str | None:
+    """
+    Function to detect a gzip ("gz"), Zstandard ("zst") or xz ("xz") compressed file from its first bytes,
+    None for an uncompressed file or a path which is not a file.
+    """
+    if not os.path.isfile(file_path):
+        return None
+    with open(file_path, "rb") as data_file:
+        magic = data_file.read(len(XZ_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        return "gz"
+    if magic.startswith(ZSTD_MAGIC):
+        return "zst"
+    if magic.startswith(XZ_MAGIC):
+        return "xz"
+    return None
+
+
+def require_zstandard():
+    """
+    Function to fail early with a clear message when zstandard is not installed.
+    """
+    if zstandard is None:
+        raise ImportError("Zstandard compressed files require zstandard, install it with `pip install zstandard`")
+
+
+def open_decompressor(file_path: str, file_format: str):
+    """
+    Function to open a compressed file as a binary file object of its decompressed bytes.
+    """
+    if file_format == "gz":
+        return gzip.open(file_path, "rb")
+    if file_format == "xz":
+        return lzma.open(file_path, "rb")
+    require_zstandard()
+    return zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), read_across_frames=True, closefd=True)
+
+
+class BackgroundDecompressor(io.RawIOBase):
+    """
+    Class to read a compressed file as a raw binary stream of its decompressed bytes.
+    A background thread decompresses the file in chunks of READ_BYTES into a queue of at most
+    QUEUE_CHUNKS chunks, while the reading thread parses the chunks decompressed before.
+    zlib, lzma and zstandard release the GIL while they decompress, so both run at the same time,
+    and memory stays bounded by the queue. An error of the background thread is raised by the read
+    which reaches it, closing the stream stops the background thread.
+    """
+
+    def __init__(self, file_path: str, file_format: str):
+        super().__init__()
+        self._chunks = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self._stopped = threading.Event()
+        self._chunk = memoryview(b"")
+        self._finished = False
+        self._decompressor = open_decompressor(file_path, file_format)
+        self._thread = threading.Thread(target=self._decompress, daemon=True)
+        self._thread.start()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        """
+        Function to copy the next decompressed bytes into buffer, 0 at the end of the file.
+        """
+        if not self._chunk:
+            self._chunk = memoryview(self._next_chunk())
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def read_chunk(self) -> bytes:
+        """
+        Function to get the next chunk as it was decompressed, without copying it, b"" at the end of the file.
+        """
+        if self._chunk:
+            chunk, self._chunk = self._chunk.tobytes(), memoryview(b"")
+            return chunk
+        return self._next_chunk()
+
+    def close(self):
+        if not self.closed:
+            self._stopped.set()
+            self._thread.join()
+            self._decompressor.close()
+        super().close()
+
+    def _next_chunk(self) -> bytes:
+        """
+        Function to take the next chunk from the queue, b"" at the end of the file.
+        """
+        if self._finished:
+            return b""
+        chunk = self._chunks.get()
+        if isinstance(chunk, Exception):
+            self._finished = True
+            raise chunk
+        if chunk is None:
+            self._finished = True
+            return b""
+        return chunk
+
+    def _decompress(self):
+        """
+        Function to decompress the file into the queue, run in the background thread.
+        """
+        try:
+            while not self._stopped.is_set():
+                chunk = self._decompressor.read(READ_BYTES)
+                self._put(chunk or None)
+                if not chunk:
+                    return
+        except Exception as error:
+            self._put(error)
+
+    def _put(self, item):
+        """
+        Function to put an item in the queue, giving up once the stream is closed.
+        """
+        while not self._stopped.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+def open_data_file(file_path: str, mode: str = "r"):
+    """
+    Function to open a data file for reading in text ("r") or binary ("rb") mode, decompressing it
+    transparently in a background thread when it is gzip, Zstandard or xz compressed.
+    """
+    file_format = compression_format(file_path)
+    if file_format is None:
+        return open(file_path, mode)
+    stream = io.BufferedReader(BackgroundDecompressor(file_path, file_format), READ_BYTES)
+    return stream if mode == "rb" else io.TextIOWrapper(stream)
+
+
+def iter_line_chunks(file_path: str):
+    """
+    Function to iterate over the decompressed bytes of a compressed data file in chunks of whole lines,
+    each chunk ends with a newline except the last one.
+    """
+    with BackgroundDecompressor(file_path, compression_format(file_path)) as stream:
+        rest = b""
+        while chunk := stream.read_chunk():
+            end = chunk.rfind(b"\n") + 1
+            if end:
+                yield rest + chunk[:end]
+                rest = chunk[end:]
+            else:
+                rest += chunk
+        if rest:
+            yield rest
@@ -0,0 +1,151 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from model import TrafficAnalysisPartial, TrafficAnalysisResult
+from readers import parse_line
+from time_filter import TimeFilter
+from traffic_aggregator import TrafficAggregator
+
+POLL_INTERVAL = 0.05
+
+
+@dataclass
+class FollowedFile:
+    """
+    Class to follow a data file as lines are appended to it, like tail -f.
+    Only the bytes appended since the last read are parsed, and their complete
+    lines are added to the aggregate of the file. A file which shrank or was
+    replaced by a new file is read again from its start.
+    Only the records of the half hours selected by time_filter are added.
+    """
+    file_path: str
+    top_n: int = 3
+    time_filter: TimeFilter = TimeFilter()
+    offset: int = 0
+    pending: bytes = b""
+    file_id: tuple | None = None
+    aggregator: TrafficAggregator = field(init=False, repr=False)
+    _partial: TrafficAnalysisPartial | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.aggregator = TrafficAggregator(top_n=self.top_n)
+
+    def read_appended(self) -> bool:
+        """
+        Function to read what was appended since the last read, True if the aggregate changed.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return False
+        file_id = (stat.st_dev, stat.st_ino)
+        restarted = self.offset > 0 and (stat.st_size < self.offset or file_id != self.file_id)
+        if restarted:
+            self.offset, self.pending = 0, b""
+            self.aggregator = TrafficAggregator(top_n=self.top_n)
+        self.file_id = file_id
+        if stat.st_size == self.offset and not restarted:
+            return False
+
+        with open(self.file_path, "rb") as data_file:
+            data_file.seek(self.offset)
+            data = data_file.read(stat.st_size - self.offset)
+        self.offset += len(data)
+        lines = (self.pending + data).split(b"\n")
+        self.pending = lines.pop()
+        for line in lines:
+            record = parse_line(line)
+            if record is not None and self._selected(record):
+                self.aggregator.add(record)
+        self._partial = None
+        return True
+
+    def partial(self) -> TrafficAnalysisPartial:
+        """
+        Function to get the partial of the file, including a last line without newline
+        if it already parses, it is read again once its newline is written.
+        """
+        if self._partial is None:
+            self._partial = self.aggregator.to_partial()
+            try:
+                record = parse_line(self.pending)
+            except ValueError:
+                record = None
+            if record is not None and self._selected(record):
+                pending = TrafficAggregator(top_n=self.top_n)
+                pending.add(record)
+                self._partial = self._partial + pending.to_partial()
+        return self._partial
+
+    def _selected(self, record) -> bool:
+        return not self.time_filter or self.time_filter.contains(record.slot)
+
+
+class PartialTree:
+    """
+    Class to keep the merged partial of a list of partials up to date as some of them change.
+    Partials are merged pairwise in a segment tree, so replacing one partial only merges
+    the log2(n) partials on its path to the root, instead of all n partials again.
+    """
+
+    def __init__(self, partials: list[TrafficAnalysisPartial], identity: TrafficAnalysisPartial):
+        self.size = 1
+        while self.size < len(partials):
+            self.size *= 2
+        self._tree = [identity] * (2 * self.size)
+        self._tree[self.size:self.size + len(partials)] = partials
+        for i in range(self.size - 1, 0, -1):
+            self._tree[i] = self._tree[2 * i] + self._tree[2 * i + 1]
+
+    def update(self, i: int, partial: TrafficAnalysisPartial):
+        """
+        Function to replace the partial at index i.
+        """
+        i += self.size
+        self._tree[i] = partial
+        while i > 1:
+            i //= 2
+            self._tree[i] = self._tree[2 * i] + self._tree[2 * i + 1]
+
+    def merged(self) -> TrafficAnalysisPartial:
+        """
+        Function to get the merge of all partials, in list order.
+        """
+        return self._tree[1]
+
+
+def follow_result(followed_files: list[FollowedFile], top_n: int = 3) -> TrafficAnalysisResult:
+    """
+    Function to merge the partials of the followed files, in file order, into a report.
+    """
+    identity = TrafficAnalysisPartial(top_n=top_n)
+    return PartialTree([followed_file.partial() for followed_file in followed_files], identity).merged().to_result()
+
+
+async def follow_files(file_paths: list[str], on_update, top_n: int = 3, poll_interval: float = POLL_INTERVAL,
+                       time_filter: TimeFilter = TimeFilter()):
+    """
+    Function to follow data files until cancelled, calling on_update with a new
+    TrafficAnalysisResult once at start and then whenever lines were appended.
+    A single coroutine polls the size of every file each poll_interval seconds, so
+    thousands of files are followed without a thread or an open file per file,
+    and a new line shows in the report within about poll_interval seconds.
+    Only the half hours selected by time_filter are reported.
+    """
+    followed_files = [FollowedFile(file_path, top_n=top_n, time_filter=time_filter) for file_path in sorted(file_paths)]
+    for followed_file in followed_files:
+        followed_file.read_appended()
+    partials = PartialTree([followed_file.partial() for followed_file in followed_files],
+                           TrafficAnalysisPartial(top_n=top_n))
+    on_update(partials.merged().to_result())
+    while True:
+        await asyncio.sleep(poll_interval)
+        changed = False
+        for i, followed_file in enumerate(followed_files):
+            if followed_file.read_appended():
+                partials.update(i, followed_file.partial())
+                changed = True
+            if i % 256 == 255:
+                await asyncio.sleep(0)
+        if changed:
+            on_update(partials.merged().to_result())
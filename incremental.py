@@ -0,0 +1,115 @@
+import json
+import os
+from model import TrafficAnalysisPartial
+from readers import parse_line
+from traffic_aggregator import TrafficAggregator
+
+STATE_VERSION = 1
+
+
+def read_state(state_file_path: str) -> dict | None:
+    """
+    Function to read a saved state file, None if there is none yet or it cannot be read.
+    """
+    try:
+        with open(state_file_path, "r") as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) and state.get("version") == STATE_VERSION else None
+
+
+def write_state(state_file_path: str, state: dict):
+    """
+    Function to save the state file, written to a temporary file first and renamed,
+    so an interrupted run never leaves a half written state behind.
+    """
+    temp_file_path = state_file_path + ".tmp"
+    with open(temp_file_path, "w") as state_file:
+        json.dump(state, state_file)
+    os.replace(temp_file_path, state_file_path)
+
+
+def aggregate_appended(data_file_path: str, offset: int, top_n: int = 3, window_mins: int = 90):
+    """
+    Function to aggregate the lines of a data file from byte offset to its end.
+    Returns the partial of the complete lines, the offset after the last complete line,
+    that last complete line and the partial of a last line without newline. Such a line
+    may still be being written, so it is only reported if it parses and is read again next run.
+    """
+    complete = TrafficAggregator(top_n=top_n, window_mins=window_mins)
+    pending = TrafficAggregator(top_n=top_n, window_mins=window_mins)
+    last_line = b""
+    with open(data_file_path, "rb") as data_file:
+        data_file.seek(offset)
+        for line in data_file:
+            if not line.endswith(b"\n"):
+                try:
+                    _add_line(pending, line)
+                except ValueError:
+                    pass
+                break
+            _add_line(complete, line)
+            offset += len(line)
+            last_line = line
+    return complete.to_partial(), offset, last_line, pending.to_partial()
+
+
+def update_state(data_file_path: str, state_file_path: str, top_n: int = 3, window_mins: int = 90):
+    """
+    Function to analyze a data file that only grows by appended lines, reusing the state saved
+    by the previous run: only the bytes appended since are parsed and their partial is added to
+    the saved one, O(new lines). The state is rebuilt from the start of the file when it was saved
+    for another file or with fewer top n or another window, or when the file was truncated or
+    rewritten, detected by the last line before the saved offset not matching anymore.
+    Returns a TrafficAggregator of the whole file.
+    """
+    data_file_path = os.path.abspath(data_file_path)
+    state = read_state(state_file_path)
+    if state is None or not _can_resume(state, data_file_path, top_n, window_mins):
+        state = {
+            "version": STATE_VERSION,
+            "data_file_path": data_file_path,
+            "offset": 0,
+            "last_line": "",
+            "partial": TrafficAnalysisPartial(top_n=top_n, window_mins=window_mins).to_dict()
+        }
+
+    saved = TrafficAnalysisPartial.from_dict(state["partial"])
+    appended, offset, last_line, pending = aggregate_appended(
+        data_file_path, state["offset"], saved.top_n, saved.window_mins
+    )
+    if offset > state["offset"]:
+        saved = saved + appended
+        state.update(offset=offset, last_line=last_line.decode(), partial=saved.to_dict())
+        write_state(state_file_path, state)
+    return TrafficAggregator.from_partial(saved + pending)
+
+
+def _can_resume(state: dict, data_file_path: str, top_n: int, window_mins: int) -> bool:
+    """
+    Function to check that a saved state belongs to the data file as it is now.
+    """
+    partial = state["partial"]
+    if (state["data_file_path"] != data_file_path or partial["top_n"] < top_n or
+            partial["window_mins"] != window_mins):
+        return False
+    last_line = state["last_line"].encode()
+    offset = state["offset"]
+    try:
+        with open(data_file_path, "rb") as data_file:
+            if os.fstat(data_file.fileno()).st_size < offset:
+                return False
+            data_file.seek(offset - len(last_line))
+            return data_file.read(len(last_line)) == last_line
+    except OSError:
+        return False
+
+
+def _add_line(aggregator: TrafficAggregator, line: bytes):
+    """
+    Function to parse a line of the data file and add its record, blank lines are skipped.
+    """
+    record = parse_line(line)
+    if record is not None:
+        aggregator.add(record)
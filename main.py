@@ -1,4 +1,11 @@
 import argparse
+import asyncio
+import cProfile
+import os
+from arrow_io import write_result, write_table
+from follow import follow_files
+from parallel import find_data_files
+from time_filter import TimeFilter
 from traffic_analyzer import TrafficAnalyzer
 from model import TrafficAnalysisResult
 
@@ -7,9 +14,52 @@ def main():
     Main function of the program.
     if --inputfile is provided then the file will passed to TrafficAnalyzer,
     else the default path ./data/data.txt will be used.
+    The data files can be gzip, Zstandard or xz compressed, they are decompressed while they are read.
+    if --stream is provided then the file is analyzed in a single streaming pass
+    without loading all records into memory.
+    if --columnar is provided then the file is loaded into numpy columns and analyzed vectorized.
+    --inputfile can also be a directory or a glob pattern, the files are then aggregated
+    in parallel by up to --workers processes.
+    if --mmap is provided then the files are memory mapped and scanned as bytes.
+    if --state is provided then the aggregate state is saved to that file,
+    and the next run only analyzes the lines appended to the input file since.
+    if --cache is provided then the parsed file is cached in a binary file next to it,
+    later runs load the cache instead of parsing the file again until it changes.
+    if --follow is provided then the input files are followed as lines are appended,
+    and the report is printed again on every update until interrupted, only --from, --to and --hours apply to it.
+    if --counters is provided then the input files may have a counter id column, the global
+    report is followed by the report of each counter, and --shards writes one file per counter.
+    if --counter is provided then --inputfile is a shard directory and only that counter is analyzed.
+    if --database is provided then the file is loaded into that SQLite database, or the database is reused
+    while the file is unchanged, and the analysis runs as SQL queries.
+    --inputfile can also be a Parquet or Arrow file.
+    if --from, --to or --hours are provided then the analysis only covers the half hours of that time range
+    and of that time of day range of each day, only their part of files in time order is read.
+    if --export is provided then the records and each section of the report are written to Arrow files in that directory.
+    if --rollups is provided then hourly, weekly, monthly and day of week traffic are added to the report.
+    if --profile is provided then the wall time, records per second and peak RSS of loading the file
+    and of each analysis are printed after the report, --profile-output dumps a cProfile stats file.
     """
     parser = argparse.ArgumentParser()
-    parser.add_argument("--inputfile", help="Filepath of machine generated traffic data")
+    parser.add_argument("--inputfile", help="Filepath, directory or glob pattern of machine generated traffic data")
+    parser.add_argument("--stream", action="store_true", help="Analyze the file in bounded memory without loading it")
+    parser.add_argument("--columnar", action="store_true", help="Analyze the file with the numpy columnar backend")
+    parser.add_argument("--workers", type=int, help="Number of processes used to analyze multiple files")
+    parser.add_argument("--mmap", action="store_true", help="Memory map the files and parse them as bytes")
+    parser.add_argument("--state", help="State file to analyze an append only input file incrementally")
+    parser.add_argument("--cache", action="store_true", help="Cache the parsed file in a binary file next to it")
+    parser.add_argument("--follow", action="store_true", help="Follow the input files and report on every update")
+    parser.add_argument("--counters", action="store_true", help="Report per counter for files with a counter id column")
+    parser.add_argument("--shards", help="Directory to write one data file per counter to, with --counters")
+    parser.add_argument("--counter", help="Counter id to analyze from the shard directory given as --inputfile")
+    parser.add_argument("--database", help="SQLite database to load the file into and analyze with SQL")
+    parser.add_argument("--from", dest="start", help="Analyze from this date or timestamp on")
+    parser.add_argument("--to", dest="end", help="Analyze up to this date, inclusive, or timestamp, exclusive")
+    parser.add_argument("--hours", help="Analyze this time of day range of each day only, e.g. 07:00-10:00")
+    parser.add_argument("--export", help="Directory to write the records and the report to as Arrow files")
+    parser.add_argument("--rollups", action="store_true", help="Add hourly, weekly, monthly and day of week traffic")
+    parser.add_argument("--profile", action="store_true", help="Print the time and memory of each analysis phase")
+    parser.add_argument("--profile-output", help="File to dump cProfile stats to, readable with pstats")
     args = parser.parse_args()
     
     if (not args.inputfile):
@@ -17,9 +67,64 @@ def main():
     else: 
         file_path = args.inputfile
 
+    if args.follow:
+        follow_options = [("--stream", args.stream), ("--columnar", args.columnar), ("--workers", args.workers),
+                          ("--mmap", args.mmap), ("--state", args.state), ("--cache", args.cache),
+                          ("--database", args.database), ("--export", args.export), ("--rollups", args.rollups),
+                          ("--profile", args.profile), ("--profile-output", args.profile_output),
+                          ("--counters", args.counters), ("--shards", args.shards), ("--counter", args.counter)]
+        ignored_options = [option for option, value in follow_options if value]
+        if ignored_options:
+            parser.error(f"--follow cannot be combined with {', '.join(ignored_options)}")
+    try:
+        time_filter = TimeFilter.parse(args.start, args.end, args.hours)
+    except ValueError as error:
+        parser.error(str(error))
+
     print("Analyzing traffic data...")
 
-    traffic_analyzer = TrafficAnalyzer(file_path)
+    if args.follow:
+        follow(file_path, time_filter)
+        return
+
+    analyzer_options = {}
+    if args.stream:
+        analyzer_options["streaming"] = True
+    if args.columnar:
+        analyzer_options["columnar"] = True
+    if args.workers:
+        analyzer_options["workers"] = args.workers
+    if args.mmap:
+        analyzer_options["memory_map"] = True
+    if args.state:
+        analyzer_options["state_file"] = args.state
+    if args.cache:
+        analyzer_options["cache"] = True
+    if args.counters:
+        analyzer_options["counters"] = True
+    if args.shards:
+        analyzer_options["shard_dir"] = args.shards
+    if args.counter:
+        analyzer_options["counter"] = args.counter
+    if args.database:
+        analyzer_options["database"] = args.database
+    if args.start:
+        analyzer_options["start"] = args.start
+    if args.end:
+        analyzer_options["end"] = args.end
+    if args.hours:
+        analyzer_options["hours"] = args.hours
+    if args.profile:
+        analyzer_options["profile"] = True
+
+    profiler = cProfile.Profile() if args.profile_output else None
+    if profiler:
+        profiler.enable()
+
+    try:
+        traffic_analyzer = TrafficAnalyzer(file_path, **analyzer_options)
+    except ValueError as error:
+        parser.error(str(error))
 
     print("Generating traffic analysis report...")
 
@@ -30,8 +135,44 @@ def main():
         least_ninety_mins_traffic = traffic_analyzer.least_cars_in_ninety_mins()
     )
 
+    if args.rollups:
+        traffic_analysis_result.hourly_traffic = traffic_analyzer.get_hourly_traffic()
+        traffic_analysis_result.weekly_traffic = traffic_analyzer.get_weekly_traffic()
+        traffic_analysis_result.monthly_traffic = traffic_analyzer.get_monthly_traffic()
+        traffic_analysis_result.day_of_week_traffic = traffic_analyzer.get_day_of_week_traffic()
+
+    if args.export:
+        write_result(traffic_analysis_result, args.export)
+        write_table(traffic_analyzer.to_arrow(), os.path.join(args.export, "records.arrow"))
+
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile_output)
+
     print("\nTraffic Analysis Result:\n")
     print(traffic_analysis_result)
 
+    if args.counters:
+        for counter_id, counter_result in traffic_analyzer.get_counter_results(n=3).items():
+            print(f"\nCounter {counter_id}:\n")
+            print(counter_result)
+
+    if args.profile:
+        print("\nProfile:\n")
+        print(traffic_analyzer.stats)
+
+def follow(file_path, time_filter=TimeFilter()):
+    """
+    Function to print the report of the half hours of time_filter of the followed files on every update, until interrupted.
+    """
+    def print_result(traffic_analysis_result):
+        print("\nTraffic Analysis Result:\n")
+        print(traffic_analysis_result, flush=True)
+
+    try:
+        asyncio.run(follow_files(find_data_files(file_path), print_result, time_filter=time_filter))
+    except KeyboardInterrupt:
+        pass
+
 if __name__ == "__main__":
     main()
@@ -1,23 +1,130 @@
-from dataclasses import dataclass
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from timestamps import parse_slot, slot_to_timestamp
 
-@dataclass
+NOT_AVAILABLE = "N/A"
+HALF_HOUR_SUFFIXES = ("00:00", "30:00")
+
+
+@dataclass(slots=True, init=False, repr=False)
 class TrafficRecord:
     """
     Class to hold individual traffic record.
+    The timestamp is kept as its half hour slot, an int, and formatted back on access,
+    so a record is three slot pointers instead of a __dict__ and a timestamp string.
+    A slot of None stands for the "N/A" timestamp of a window that was not found.
     """
-    timestamp: str
+    slot: int | None
     car_count: int
+    duration_mins: int
+
+    def __init__(self, timestamp: str, car_count: int, duration_mins: int = 30):
+        if timestamp == NOT_AVAILABLE:
+            self.slot = None
+        elif timestamp[14:] in HALF_HOUR_SUFFIXES:
+            self.slot = parse_slot(timestamp)
+        else:
+            raise ValueError(f"Timestamp is not on a half hour: {timestamp!r}")
+        self.car_count = car_count
+        self.duration_mins = duration_mins
+
+    @classmethod
+    def from_slot(cls, slot: int, car_count: int, duration_mins: int = 30):
+        """
+        Function to create a record from an already decoded half hour slot, without formatting a timestamp.
+        """
+        record = cls.__new__(cls)
+        record.slot = slot
+        record.car_count = car_count
+        record.duration_mins = duration_mins
+        return record
+
+    @property
+    def timestamp(self) -> str:
+        """
+        Timestamp in yyyy-mm-ddThh:mm:ss format, or "N/A".
+        """
+        return NOT_AVAILABLE if self.slot is None else slot_to_timestamp(self.slot)
+
+    def __repr__(self):
+        return f"TrafficRecord(timestamp={self.timestamp!r}, car_count={self.car_count!r}, duration_mins={self.duration_mins!r})"
+
+@dataclass(eq=False, repr=False)
+class TrafficRecords(Sequence):
+    """
+    Class to hold many half hour records as an array of structs, the slots and car counts
+    of all records in two typed arrays of 8 bytes per record each and one duration shared
+    by all of them. TrafficRecord objects are only created when records are read.
+    """
+    slots: array = field(default_factory=lambda: array("q"))
+    car_counts: array = field(default_factory=lambda: array("q"))
     duration_mins: int = 30
 
+    @classmethod
+    def from_records(cls, records, duration_mins: int = 30):
+        """
+        Function to pack TrafficRecord objects, the records are not kept.
+        """
+        traffic_records = cls(duration_mins=duration_mins)
+        for record in records:
+            traffic_records.append(record)
+        return traffic_records
+
+    @classmethod
+    def from_slots(cls, slots_and_counts, duration_mins: int = 30):
+        """
+        Function to pack (slot, car_count) pairs, e.g. from readers.read_slots_mmap.
+        """
+        traffic_records = cls(duration_mins=duration_mins)
+        for slot, car_count in slots_and_counts:
+            traffic_records.slots.append(slot)
+            traffic_records.car_counts.append(car_count)
+        return traffic_records
+
+    def append(self, record: TrafficRecord):
+        """
+        Function to add a record at the end.
+        """
+        self.slots.append(record.slot)
+        self.car_counts.append(record.car_count)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TrafficRecords(self.slots[index], self.car_counts[index], self.duration_mins)
+        return TrafficRecord.from_slot(self.slots[index], self.car_counts[index], self.duration_mins)
+
+    def __iter__(self):
+        duration_mins = self.duration_mins
+        for slot, car_count in zip(self.slots, self.car_counts):
+            yield TrafficRecord.from_slot(slot, car_count, duration_mins)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(record == other_record for record, other_record in zip(self, other))
+
+    def __repr__(self):
+        return f"TrafficRecords({list(self)!r})"
+
 @dataclass(repr=False)
 class TrafficAnalysisResult:
     """
     Class to hold the results of traffic analysis.
+    The hourly, weekly, monthly and day of week rollup sections are optional,
+    they are only reported when set.
     """
     total_traffic: int
     daily_traffic: dict
     top_n_half_hours: list
     least_ninety_mins_traffic: TrafficRecord
+    hourly_traffic: dict | None = None
+    weekly_traffic: dict | None = None
+    monthly_traffic: dict | None = None
+    day_of_week_traffic: dict | None = None
 
     def __repr__(self):
         """
@@ -39,5 +146,163 @@ class TrafficAnalysisResult:
             result.append(f"{record.timestamp} {record.car_count}")
 
         result.append(f"Timestamp with least number of cars seen in next 90 minutes: {self.least_ninety_mins_traffic.timestamp}")
+
+        rollup_sections = [
+            ("Hourly traffic...", "Hour", self.hourly_traffic),
+            ("Weekly traffic...", "Week of", self.weekly_traffic),
+            ("Monthly traffic...", "Month", self.monthly_traffic),
+            ("Traffic by day of week...", "Day", self.day_of_week_traffic)
+        ]
+        for title, period_name, traffic in rollup_sections:
+            if traffic is not None:
+                result.append(f"\n\n{title}")
+                result.append(f"{period_name:<20}Number of cars seen")
+                result.append("---------------------------------------")
+                for period, car_count in traffic.items():
+                    result.append(f"{period:<20}{car_count}")
         
         return "\n".join(result)
+
+
+@dataclass
+class TrafficAnalysisPartial:
+    """
+    Class to hold the mergeable partial analysis of a shard of traffic data (a file,
+    a worker's share or a time range), unlike TrafficAnalysisResult which is final.
+    Partials of consecutive shards combine with +, and an empty TrafficAnalysisPartial with
+    the same top_n and window_mins is the identity, so shards can be reduced in any grouping.
+    The first and last window_mins - 30 minutes of records (two half hours for 90 minutes)
+    are kept in head and tail, so windows crossing shard boundaries are found on merge.
+    """
+    top_n: int = 3
+    window_mins: int = 90
+    total_traffic: int = 0
+    daily_traffic: dict = field(default_factory=dict)
+    top_n_half_hours: list = field(default_factory=list)
+    least_window: TrafficRecord | None = None
+    most_window: TrafficRecord | None = None
+    head: list = field(default_factory=list)
+    tail: list = field(default_factory=list)
+    record_count: int = 0
+
+    def __add__(self, other: "TrafficAnalysisPartial"):
+        """
+        Function to merge with the partial of the shard that follows this one.
+        """
+        if (self.top_n, self.window_mins) != (other.top_n, other.window_mins):
+            raise ValueError("Only partials with the same top_n and window_mins can be merged")
+        fragment_size = self.window_mins // 30 - 1
+
+        daily_traffic = dict(self.daily_traffic)
+        for date, car_count in other.daily_traffic.items():
+            daily_traffic[date] = daily_traffic.get(date, 0) + car_count
+
+        crossing_windows = self._crossing_windows(other)
+        tail = self.tail + other.tail
+        return TrafficAnalysisPartial(
+            top_n=self.top_n,
+            window_mins=self.window_mins,
+            total_traffic=self.total_traffic + other.total_traffic,
+            daily_traffic=daily_traffic,
+            top_n_half_hours=sorted(self.top_n_half_hours + other.top_n_half_hours,
+                                    key=lambda x: x.car_count, reverse=True)[0:self.top_n],
+            least_window=_first_extreme([self.least_window, *crossing_windows, other.least_window],
+                                        lambda car_count, best: car_count < best),
+            most_window=_first_extreme([self.most_window, *crossing_windows, other.most_window],
+                                       lambda car_count, best: car_count > best),
+            head=(self.head + other.head)[0:fragment_size],
+            tail=tail[max(len(tail) - fragment_size, 0):],
+            record_count=self.record_count + other.record_count
+        )
+
+    def to_result(self) -> "TrafficAnalysisResult":
+        """
+        Function to turn the partial into the final report.
+        """
+        return TrafficAnalysisResult(
+            total_traffic=self.total_traffic,
+            daily_traffic=dict(sorted(self.daily_traffic.items())),
+            top_n_half_hours=self.top_n_half_hours,
+            least_ninety_mins_traffic=self.least_window or TrafficRecord(
+                timestamp="N/A", car_count=0, duration_mins=self.window_mins
+            )
+        )
+
+    def to_dict(self) -> dict:
+        """
+        Function to export the partial as plain JSON serializable values,
+        records are written as [slot, car_count, duration_mins] lists.
+        """
+        return {
+            "top_n": self.top_n,
+            "window_mins": self.window_mins,
+            "total_traffic": self.total_traffic,
+            "daily_traffic": dict(self.daily_traffic),
+            "top_n_half_hours": [_record_to_list(record) for record in self.top_n_half_hours],
+            "least_window": _record_to_list(self.least_window),
+            "most_window": _record_to_list(self.most_window),
+            "head": [_record_to_list(record) for record in self.head],
+            "tail": [_record_to_list(record) for record in self.tail],
+            "record_count": self.record_count
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict):
+        """
+        Function to rebuild a partial exported with to_dict.
+        """
+        return cls(
+            top_n=values["top_n"],
+            window_mins=values["window_mins"],
+            total_traffic=values["total_traffic"],
+            daily_traffic=dict(values["daily_traffic"]),
+            top_n_half_hours=[_record_from_list(record) for record in values["top_n_half_hours"]],
+            least_window=_record_from_list(values["least_window"]),
+            most_window=_record_from_list(values["most_window"]),
+            head=[_record_from_list(record) for record in values["head"]],
+            tail=[_record_from_list(record) for record in values["tail"]],
+            record_count=values["record_count"]
+        )
+
+    def _crossing_windows(self, other: "TrafficAnalysisPartial"):
+        """
+        Function to find the contiguous windows made of this tail and the other head.
+        Both fragments are shorter than a window, so every such window crosses the boundary.
+        """
+        size = self.window_mins // 30
+        records = self.tail + other.head
+        windows = []
+        for i in range(len(records) - size + 1):
+            window = records[i:i + size]
+            if all(current.slot == previous.slot + 1 for previous, current in zip(window, window[1:])):
+                windows.append(TrafficRecord.from_slot(
+                    window[0].slot,
+                    car_count=sum(record.car_count for record in window),
+                    duration_mins=self.window_mins
+                ))
+        return windows
+
+
+def _first_extreme(windows, is_better):
+    """
+    Function to pick the best window from candidates in input order, the first one wins ties.
+    """
+    best = None
+    for window in windows:
+        if window is not None and (best is None or is_better(window.car_count, best.car_count)):
+            best = window
+    return best
+
+
+def _record_to_list(record: TrafficRecord | None):
+    """
+    Function to write a record as a [slot, car_count, duration_mins] list, None stays None.
+    """
+    return None if record is None else [record.slot, record.car_count, record.duration_mins]
+
+
+def _record_from_list(values: list | None):
+    """
+    Function to read a record written by _record_to_list.
+    """
+    return None if values is None else TrafficRecord.from_slot(*values)
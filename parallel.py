@@ -0,0 +1,79 @@
+import glob
+import operator
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from arrow_io import arrow_format, iter_arrow_records
+from model import TrafficAnalysisPartial
+from readers import read_records, read_records_mmap
+from time_filter import TimeFilter
+from traffic_aggregator import TrafficAggregator
+
+GLOB_CHARS = "*?["
+
+
+def is_multi_file_path(path: str) -> bool:
+    """
+    Function to check if the path names a directory or a glob pattern instead of a single file.
+    """
+    return os.path.isdir(path) or (not os.path.isfile(path) and any(char in path for char in GLOB_CHARS))
+
+
+def find_data_files(path: str) -> list[str]:
+    """
+    Function to list the data files of a directory, glob pattern or single file.
+    Files are returned in sorted path order, which is the order they are aggregated in,
+    so file names are expected to sort chronologically (e.g. counter-2021-12-01.txt).
+    Hidden files of a directory, e.g. the manifest of a shard directory, are not data files.
+    """
+    if os.path.isdir(path):
+        file_paths = [os.path.join(path, name) for name in os.listdir(path) if not name.startswith(".")]
+    elif is_multi_file_path(path):
+        file_paths = glob.glob(path)
+    else:
+        return [path]
+    return sorted(file_path for file_path in file_paths if os.path.isfile(file_path))
+
+
+def read_file_records(file_path: str, memory_map: bool = False, time_filter: TimeFilter = TimeFilter()):
+    """
+    Function to read a text, compressed, Parquet or Arrow data file lazily as a generator of TrafficRecord,
+    only the records selected by time_filter. The selection of a text file is read from its byte ranges
+    found by binary search in the memory mapped file, the range of a Parquet file from its row groups.
+    """
+    if arrow_format(file_path):
+        return time_filter.filter_records(iter_arrow_records(file_path, time_filter.start_slot, time_filter.end_slot))
+    if memory_map or time_filter:
+        return read_records_mmap(file_path, time_filter)
+    return read_records(file_path)
+
+
+def aggregate_file(file_path: str, top_n: int = 3, window_mins: int = 90, memory_map: bool = False,
+                   time_filter: TimeFilter = TimeFilter()) -> TrafficAnalysisPartial:
+    """
+    Function to aggregate a single data file, text, Parquet or Arrow, into a partial, runs inside the worker processes.
+    """
+    aggregator = TrafficAggregator(top_n=top_n, window_mins=window_mins)
+    for record in read_file_records(file_path, memory_map, time_filter):
+        aggregator.add(record)
+    return aggregator.to_partial()
+
+
+def aggregate_files(file_paths: list[str], top_n: int = 3, window_mins: int = 90, max_workers=None,
+                    memory_map: bool = False, time_filter: TimeFilter = TimeFilter()):
+    """
+    Function to aggregate many data files over a process pool and merge the partials
+    in file order. Each worker parses and aggregates whole files, only the small
+    TrafficAnalysisPartial of each file travels back to the main process.
+    """
+    identity = TrafficAnalysisPartial(top_n=top_n, window_mins=window_mins)
+    if len(file_paths) <= 1:
+        partials = (aggregate_file(file_path, top_n, window_mins, memory_map, time_filter) for file_path in file_paths)
+        return TrafficAggregator.from_partial(reduce(operator.add, partials, identity))
+
+    chunksize = max(1, len(file_paths) // (4 * (max_workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        partials = executor.map(aggregate_file, file_paths, [top_n] * len(file_paths),
+                                [window_mins] * len(file_paths), [memory_map] * len(file_paths),
+                                [time_filter] * len(file_paths), chunksize=chunksize)
+        return TrafficAggregator.from_partial(reduce(operator.add, partials, identity))
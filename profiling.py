@@ -0,0 +1,85 @@
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Function to get the peak resident set size of the process so far, None where it is not available.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@dataclass
+class PhaseStats:
+    """
+    Class to hold the measurements of one phase of an analysis, loading the file or a query.
+    records is the number of records the phase went over, None when it is not known, e.g. when streaming.
+    peak_rss_bytes is the peak resident set size of the process at the end of the phase.
+    """
+    name: str
+    seconds: float
+    records: int | None = None
+    peak_rss_bytes: int | None = None
+
+    @property
+    def records_per_second(self) -> float | None:
+        """
+        Throughput of the phase, None when the number of records is not known.
+        """
+        if self.records is None:
+            return None
+        return self.records / max(self.seconds, 1e-9)
+
+
+@dataclass(repr=False)
+class AnalyzerStats:
+    """
+    Class to hold the phases measured while a TrafficAnalyzer loads its data and answers queries,
+    in the order they finished. A query which calls another query includes the time of the inner query,
+    which is also listed as its own phase.
+    """
+    phases: list[PhaseStats] = field(default_factory=list)
+
+    @contextmanager
+    def phase(self, name: str, records=None):
+        """
+        Function to measure the wall time of the code run in the with block as a phase.
+        records is called after the block to count the records the phase went over.
+        """
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        self.phases.append(PhaseStats(name, seconds, records() if records else None, peak_rss_bytes()))
+
+    def to_dict(self) -> dict:
+        """
+        Function to export the phases as a JSON serializable dict.
+        """
+        return {"phases": [
+            {"name": phase.name, "seconds": phase.seconds, "records": phase.records,
+             "records_per_second": phase.records_per_second, "peak_rss_bytes": phase.peak_rss_bytes}
+            for phase in self.phases
+        ]}
+
+    def __repr__(self):
+        """
+        Custom string representation as a table of the phases.
+        """
+        result = []
+        result.append("Phase                            Seconds    Records/s     Peak RSS (MB)")
+        result.append("-----------------------------------------------------------------------")
+        for phase in self.phases:
+            records_per_second = "-" if phase.records_per_second is None else f"{phase.records_per_second:.0f}"
+            peak_rss = "-" if phase.peak_rss_bytes is None else f"{phase.peak_rss_bytes / 2**20:.1f}"
+            result.append(f"{phase.name:<32} {phase.seconds:<10.4f} {records_per_second:<13} {peak_rss}")
+        return "\n".join(result)
@@ -0,0 +1,112 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from model import TrafficRecord, TrafficRecords
+from sliding_window import window_size
+from timestamps import SLOTS_PER_DAY
+
+
+class PrefixSumIndex:
+    """
+    Class to answer time range totals over loaded traffic data in O(log n) per query.
+    Keeps the half hour slots sorted with the running total of cars up to each of them,
+    a range total is then the difference of two running totals found by binary search.
+    Running totals in input order also give the sum of any run of records in O(1).
+
+    The records are also split once into segments, the runs of contiguous half hours
+    between gaps, stored as the index of the first record of each segment. Windows
+    are only looked for inside segments long enough to hold them, so gaps are skipped
+    in O(1) and no pair of timestamps is compared again per query.
+    """
+
+    def __init__(self, records):
+        if isinstance(records, TrafficRecords):
+            self.slots, self.car_counts = records.slots, records.car_counts
+        else:
+            self.slots, self.car_counts = array("q"), array("q")
+            for record in records:
+                self.slots.append(record.slot)
+                self.car_counts.append(record.car_count)
+
+        self.running_counts = array("q", accumulate(self.car_counts, initial=0))
+        self.segment_starts = array("q", (i for i in range(len(self.slots))
+                                          if i == 0 or self.slots[i] != self.slots[i - 1] + 1))
+        self.segment_starts.append(len(self.slots))
+        if all(previous <= current for previous, current in zip(self.slots, self.slots[1:])):
+            self.sorted_slots, self.sorted_running_counts = self.slots, self.running_counts
+        else:
+            order = sorted(range(len(self.slots)), key=self.slots.__getitem__)
+            self.sorted_slots = array("q", (self.slots[i] for i in order))
+            self.sorted_running_counts = array("q", accumulate((self.car_counts[i] for i in order), initial=0))
+
+    def __len__(self):
+        return len(self.slots)
+
+    def range_total(self, start_slot: int, end_slot: int) -> int:
+        """
+        Function to count the cars seen in the half hours from start_slot up to, excluding, end_slot.
+        """
+        if end_slot <= start_slot:
+            return 0
+        start = bisect_left(self.sorted_slots, start_slot)
+        end = bisect_left(self.sorted_slots, end_slot, lo=start)
+        return self.sorted_running_counts[end] - self.sorted_running_counts[start]
+
+    def day_total(self, day: int) -> int:
+        """
+        Function to count the cars seen on a day, given as days since 1970-01-01.
+        """
+        return self.range_total(day * SLOTS_PER_DAY, (day + 1) * SLOTS_PER_DAY)
+
+    def window_total(self, start_slot: int, window_mins: int = 90) -> int:
+        """
+        Function to count the cars seen in the window_mins starting at start_slot.
+        """
+        return self.range_total(start_slot, start_slot + window_size(window_mins))
+
+    def window_extremes(self, window_mins: int = 90):
+        """
+        Function to find the contiguous windows of window_mins with least and most cars, in input order.
+        Returns a (least, most) tuple of TrafficRecord, N/A records when no window is contiguous.
+        """
+        size = window_size(window_mins)
+        least = most = None
+        least_count = most_count = 0
+        running_counts = self.running_counts
+        for segment_start, segment_end in zip(self.segment_starts, self.segment_starts[1:]):
+            for i in range(segment_start, segment_end - size + 1):
+                car_count = running_counts[i + size] - running_counts[i]
+                if least is None or car_count < least_count:
+                    least, least_count = i, car_count
+                if most is None or car_count > most_count:
+                    most, most_count = i, car_count
+        return self._window_record(least, size, window_mins), self._window_record(most, size, window_mins)
+
+    def segments(self) -> list[TrafficRecord]:
+        """
+        Function to get the segments of contiguous half hours, in input order, each as a TrafficRecord
+        of its first half hour, the cars seen in the whole segment and its length in duration_mins.
+        The gaps are the time between the end of a segment and the start of the next one.
+        """
+        return [
+            TrafficRecord.from_slot(self.slots[start], self.running_counts[end] - self.running_counts[start],
+                                    (end - start) * 30)
+            for start, end in zip(self.segment_starts, self.segment_starts[1:])
+        ]
+
+    def contiguous_records(self, i: int) -> int:
+        """
+        Function to count the contiguous records from index i to the end of its segment, O(log segments).
+        """
+        if not 0 <= i < len(self.slots):
+            return 0
+        return self.segment_starts[bisect_right(self.segment_starts, i)] - i
+
+    def _window_record(self, i: int | None, size: int, window_mins: int) -> TrafficRecord:
+        """
+        Function to get the window of size records starting at index i as TrafficRecord.
+        """
+        if i is None:
+            return TrafficRecord(timestamp="N/A", car_count=0, duration_mins=window_mins)
+        return TrafficRecord.from_slot(self.slots[i], self.running_counts[i + size] - self.running_counts[i], window_mins)
+
@@ -0,0 +1,171 @@
+import mmap
+import os
+from decompression import compression_format, iter_line_chunks, open_data_file
+from model import TrafficRecord
+from time_filter import TimeFilter
+from timestamps import parse_slot_at
+
+TIMESTAMP_WIDTH = len("yyyy-mm-ddThh:mm:ss")
+COUNT_OFFSET = TIMESTAMP_WIDTH + 1
+GALLOP_BYTES = 1024
+
+
+def read_records(file_path: str):
+    """
+    Function to read a data file, which may be compressed, lazily as a generator of TrafficRecord.
+    """
+    with open_data_file(file_path, "r") as data_file:
+        for line in data_file:
+            if line.strip():
+                timestamp, car_count = line.split()
+                yield TrafficRecord(timestamp=timestamp, car_count=int(car_count))
+
+
+def parse_line(line: bytes) -> TrafficRecord | None:
+    """
+    Function to parse a line of a data file read as bytes, None for a blank line.
+    """
+    if not line.strip():
+        return None
+    timestamp, car_count = line.split()
+    return TrafficRecord(timestamp=timestamp.decode(), car_count=int(car_count))
+
+
+def read_slots_mmap(file_path: str, time_filter: TimeFilter = TimeFilter()):
+    """
+    Function to scan a memory mapped data file as bytes, yielding (slot, car_count) per line.
+    The fixed width layout lets the timestamp fields and the count be read at known offsets
+    of the mapped buffer, so no line, split or decoded string objects are created.
+    With a time_filter only the byte ranges of the selected half hours, found by binary search,
+    are scanned, which needs the file in time order, as counters write it.
+    A compressed file cannot be mapped, its decompressed chunks of whole lines are scanned
+    and filtered instead.
+    """
+    if os.path.getsize(file_path) == 0:
+        return
+    if compression_format(file_path):
+        offset = 0
+        for chunk in iter_line_chunks(file_path):
+            for slot, car_count in scan_slots(chunk, file_path, offset=offset):
+                if not time_filter or time_filter.contains(slot):
+                    yield slot, car_count
+            offset += len(chunk)
+        return
+    with open(file_path, "rb") as data_file, mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        if not time_filter:
+            yield from scan_slots(buffer, file_path)
+            return
+        previous_slot = None
+        for start, end in find_byte_ranges(buffer, time_filter):
+            for slot, car_count in scan_slots(buffer, file_path, start, end):
+                if previous_slot is not None and slot < previous_slot:
+                    raise ValueError(f"{file_path} is not in time order, a time range needs a file in time order")
+                previous_slot = slot
+                yield slot, car_count
+
+
+def find_byte_ranges(buffer, time_filter: TimeFilter) -> list[tuple[int, int]]:
+    """
+    Function to find the (start, end) byte ranges of the lines selected by time_filter in a buffer
+    of lines in time order, by binary search, so the lines between the ranges are never read.
+    """
+    first_line = find_line(buffer, 0)
+    if first_line == len(buffer):
+        return []
+    first_slot, last_slot = parse_slot_at(buffer, first_line), last_line_slot(buffer)
+    if first_slot > last_slot:
+        raise ValueError("The lines are not in time order, a time range needs a file in time order")
+    byte_ranges, position = [], 0
+    for start_slot, end_slot in time_filter.slot_ranges(first_slot, last_slot):
+        start = bisect_lines(buffer, start_slot, position)
+        position = bisect_lines(buffer, end_slot, start)
+        if start < position:
+            byte_ranges.append((start, position))
+    return byte_ranges
+
+
+def find_file_byte_ranges(file_path: str, time_filter: TimeFilter) -> list[tuple[int, int]]:
+    """
+    Function to find the (start, end) byte ranges of the lines selected by time_filter in a data file in time order.
+    """
+    if os.path.getsize(file_path) == 0:
+        return []
+    with open(file_path, "rb") as data_file, mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return find_byte_ranges(buffer, time_filter)
+
+
+def bisect_lines(buffer, slot: int, low: int = 0) -> int:
+    """
+    Function to find the start of the first line from byte low on with a half hour at or after slot,
+    in a buffer of lines in time order, len(buffer) if there is none. The search gallops from low,
+    doubling its step, before it bisects, so finding a line close to low only reads a few lines.
+    """
+    size, step = len(buffer), GALLOP_BYTES
+    high = low
+    while high < size:
+        line = find_line(buffer, high)
+        if line == size or parse_slot_at(buffer, line) >= slot:
+            break
+        low, high, step = line + 1, line + 1 + step, step * 2
+    high = min(high, size)
+    while low < high:
+        middle = (low + high) // 2
+        line = find_line(buffer, middle)
+        if line == size or parse_slot_at(buffer, line) >= slot:
+            high = middle
+        else:
+            low = line + 1
+    return find_line(buffer, low)
+
+
+def find_line(buffer, position: int) -> int:
+    """
+    Function to find the start of the first non blank line starting at or after position, len(buffer) if there is none.
+    """
+    size = len(buffer)
+    if position > 0:
+        newline = buffer.find(b"\n", position - 1)
+        position = size if newline == -1 else newline + 1
+    while position < size:
+        end = buffer.find(b"\n", position)
+        if end == -1:
+            end = size
+        if buffer[position:end].strip():
+            return position
+        position = end + 1
+    return size
+
+
+def last_line_slot(buffer) -> int:
+    """
+    Function to decode the half hour of the last non blank line of a buffer.
+    """
+    end = len(buffer)
+    while buffer[end - 1:end].isspace():
+        end -= 1
+    return parse_slot_at(buffer, buffer.rfind(b"\n", 0, end) + 1)
+
+
+def scan_slots(buffer, file_path: str, start: int = 0, end: int | None = None, offset: int = 0):
+    """
+    Function to scan the lines of buffer[start:end] of a bytes-like buffer, yielding (slot, car_count) per line.
+    offset is the position of the buffer in the data file, for the error messages.
+    """
+    size = len(buffer) if end is None else end
+    while start < size:
+        end = buffer.find(b"\n", start, size)
+        if end == -1:
+            end = size
+        if end - start > COUNT_OFFSET:
+            yield parse_slot_at(buffer, start), int(buffer[start + COUNT_OFFSET:end])
+        elif buffer[start:end].strip():
+            raise ValueError(f"Invalid line at byte {offset + start} of {file_path}")
+        start = end + 1
+
+
+def read_records_mmap(file_path: str, time_filter: TimeFilter = TimeFilter()):
+    """
+    Function to read a memory mapped data file as a generator of TrafficRecord.
+    """
+    for slot, car_count in read_slots_mmap(file_path, time_filter):
+        yield TrafficRecord.from_slot(slot, car_count)
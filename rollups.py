@@ -0,0 +1,174 @@
+from array import array
+from dataclasses import dataclass, field
+from datetime import timedelta
+from timestamps import EPOCH, date_of_day
+
+HOURS_PER_DAY = 24
+SLOTS_PER_HOUR = 2
+DAYS_OF_WEEK = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+
+
+def _zeros(n: int) -> array:
+    """
+    Function to create an int64 array of n zeros.
+    """
+    return array("q", bytes(8 * n))
+
+
+@dataclass
+class Rollup:
+    """
+    Class to hold the cars and the number of records of consecutive periods, e.g. hours or days,
+    as two int64 arrays indexed by period - start. Periods without records are kept as zeros,
+    so a period is found by its index instead of a lookup.
+    """
+    start: int = 0
+    car_counts: array = field(default_factory=lambda: array("q"))
+    record_counts: array = field(default_factory=lambda: array("q"))
+
+    def add(self, period: int, car_count: int, record_count: int = 1):
+        """
+        Function to add cars to a period, growing the arrays when the period is out of their range.
+        """
+        if not self.car_counts:
+            self.start = period
+        offset = period - self.start
+        if offset < 0:
+            self.car_counts[0:0] = _zeros(-offset)
+            self.record_counts[0:0] = _zeros(-offset)
+            self.start, offset = period, 0
+        elif offset >= len(self.car_counts):
+            self.car_counts.extend(_zeros(offset - len(self.car_counts) + 1))
+            self.record_counts.extend(_zeros(offset - len(self.record_counts) + 1))
+        self.car_counts[offset] += car_count
+        self.record_counts[offset] += record_count
+
+    @classmethod
+    def from_slots(cls, slots_and_counts, slots_per_period: int, first_slot: int | None = None,
+                   last_slot: int | None = None):
+        """
+        Function to sum (slot, car_count) pairs into periods of slots_per_period half hours, e.g. hours or days.
+        With the first and last slot known, e.g. the min and max of loaded slots, the arrays are allocated
+        once and filled in place. Otherwise consecutive slots of the same period are summed before they
+        are added, growing the arrays.
+        """
+        if first_slot is not None:
+            start = first_slot // slots_per_period
+            size = last_slot // slots_per_period - start + 1
+            rollup = cls(start, _zeros(size), _zeros(size))
+            car_counts, record_counts = rollup.car_counts, rollup.record_counts
+            for slot, car_count in slots_and_counts:
+                car_counts[slot // slots_per_period - start] += car_count
+                record_counts[slot // slots_per_period - start] += 1
+            return rollup
+        rollup = cls()
+        period, car_count, record_count = None, 0, 0
+        for slot, slot_car_count in slots_and_counts:
+            if slot // slots_per_period != period:
+                if record_count:
+                    rollup.add(period, car_count, record_count)
+                period, car_count, record_count = slot // slots_per_period, 0, 0
+            car_count += slot_car_count
+            record_count += 1
+        if record_count:
+            rollup.add(period, car_count, record_count)
+        return rollup
+
+    def periods(self):
+        """
+        Function to iterate over (period, car_count, record_count) of the periods with records, in time order.
+        """
+        for offset, (car_count, record_count) in enumerate(zip(self.car_counts, self.record_counts)):
+            if record_count:
+                yield self.start + offset, car_count, record_count
+
+
+@dataclass
+class Rollups:
+    """
+    Class to hold the pre-aggregated totals of half hour data at every coarser granularity.
+    1. Hourly totals, built in a single pass over the records
+    2. Daily totals, built from the hourly totals
+    3. Weekly totals of weeks starting on Monday, built from the daily totals
+    4. Monthly totals, built from the daily totals
+    5. Totals per day of the week, Monday first, built from the daily totals
+
+    Each level is built from the level below, so only the hourly level reads the records
+    and queries of any level never touch them. Years of data take a few arrays of one
+    int64 per hour, day, week or month.
+    """
+    hourly: Rollup = field(default_factory=Rollup)
+    daily: Rollup = field(default_factory=Rollup)
+    weekly: Rollup = field(default_factory=Rollup)
+    monthly: Rollup = field(default_factory=Rollup)
+    day_of_week: array = field(default_factory=lambda: _zeros(len(DAYS_OF_WEEK)))
+
+    @classmethod
+    def from_slots(cls, slots_and_counts, first_slot: int | None = None, last_slot: int | None = None):
+        """
+        Function to build every rollup from (slot, car_count) pairs, in a single pass over them.
+        """
+        return cls.from_hourly(Rollup.from_slots(slots_and_counts, SLOTS_PER_HOUR, first_slot, last_slot))
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Function to build every rollup from TrafficRecord objects.
+        """
+        return cls.from_slots((record.slot, record.car_count) for record in records)
+
+    @classmethod
+    def from_hourly(cls, hourly: Rollup):
+        """
+        Function to build the coarser rollups from the hourly rollup.
+        """
+        rollups = cls(hourly=hourly)
+        if hourly.car_counts:
+            first_day = hourly.start // HOURS_PER_DAY
+            last_day = (hourly.start + len(hourly.car_counts) - 1) // HOURS_PER_DAY
+            rollups.daily = Rollup(first_day, _zeros(last_day - first_day + 1), _zeros(last_day - first_day + 1))
+            for offset, day in enumerate(range(first_day, last_day + 1)):
+                start = max(day * HOURS_PER_DAY - hourly.start, 0)
+                end = (day + 1) * HOURS_PER_DAY - hourly.start
+                rollups.daily.car_counts[offset] = sum(hourly.car_counts[start:end])
+                rollups.daily.record_counts[offset] = sum(hourly.record_counts[start:end])
+        for day, car_count, record_count in rollups.daily.periods():
+            date = EPOCH + timedelta(days=day)
+            rollups.weekly.add((day + EPOCH_WEEKDAY) // 7, car_count, record_count)
+            rollups.monthly.add(date.year * 12 + date.month - 1, car_count, record_count)
+            rollups.day_of_week[(day + EPOCH_WEEKDAY) % 7] += car_count
+        return rollups
+
+    def hourly_traffic(self) -> dict:
+        """
+        Function to get the cars seen in each hour with records, keyed by its yyyy-mm-ddThh:00:00 timestamp.
+        """
+        return {
+            f"{date_of_day(hour // HOURS_PER_DAY)}T{hour % HOURS_PER_DAY:02d}:00:00": car_count
+            for hour, car_count, _ in self.hourly.periods()
+        }
+
+    def daily_traffic(self) -> dict:
+        """
+        Function to get the cars seen on each day with records, keyed by yyyy-mm-dd date.
+        """
+        return {date_of_day(day): car_count for day, car_count, _ in self.daily.periods()}
+
+    def weekly_traffic(self) -> dict:
+        """
+        Function to get the cars seen in each week with records, keyed by the yyyy-mm-dd date of its Monday.
+        """
+        return {date_of_day(week * 7 - EPOCH_WEEKDAY): car_count for week, car_count, _ in self.weekly.periods()}
+
+    def monthly_traffic(self) -> dict:
+        """
+        Function to get the cars seen in each month with records, keyed by yyyy-mm.
+        """
+        return {f"{month // 12:04d}-{month % 12 + 1:02d}": car_count for month, car_count, _ in self.monthly.periods()}
+
+    def day_of_week_traffic(self) -> dict:
+        """
+        Function to get the cars seen on each day of the week over all weeks, Monday first.
+        """
+        return dict(zip(DAYS_OF_WEEK, self.day_of_week))
@@ -0,0 +1,116 @@
+from collections import deque
+from model import TrafficRecord
+
+
+def window_size(window_mins: int) -> int:
+    """
+    Function to convert a window length in minutes into a number of half hour records.
+    """
+    if window_mins <= 0 or window_mins % 30 != 0:
+        raise ValueError(f"window_mins must be a positive multiple of 30, got {window_mins}")
+    return window_mins // 30
+
+
+class SlidingWindow:
+    """
+    Class to find the contiguous windows with least and most cars in a single pass.
+    Keeps a running sum over the last window_mins worth of half hours and restarts
+    it at every gap, so each record is added and removed exactly once.
+
+    The first and last window_mins - 30 minutes of records are kept as boundary fragments
+    (head and tail), so windows of consecutive shards can be combined through TrafficAnalysisPartial.
+    """
+
+    def __init__(self, window_mins: int = 90):
+        self.window_mins = window_mins
+        self.size = window_size(window_mins)
+        self.least: TrafficRecord | None = None
+        self.most: TrafficRecord | None = None
+        self._window = deque()
+        self._car_count = 0
+        self._last_slot: int | None = None
+        self.head = []
+        self.record_count = 0
+
+    def add(self, slot: int, record: TrafficRecord):
+        """
+        Function to slide the window by one record, records are expected in input order.
+        The record continues the window only if its half hour slot follows the previous one.
+        """
+        if self._last_slot is None or slot != self._last_slot + 1:
+            self._window.clear()
+            self._car_count = 0
+        self._last_slot = slot
+        if len(self.head) < self.size - 1:
+            self.head.append(record)
+        self.record_count += 1
+
+        self._window.append(record)
+        self._car_count += record.car_count
+        if len(self._window) > self.size:
+            self._car_count -= self._window.popleft().car_count
+        if len(self._window) == self.size:
+            self._update_extremes()
+
+    def least_record(self):
+        """
+        Function to get the window with least cars, or a N/A record when there is none.
+        """
+        return self.least or TrafficRecord(timestamp="N/A", car_count=0, duration_mins=self.window_mins)
+
+    def most_record(self):
+        """
+        Function to get the window with most cars, or a N/A record when there is none.
+        """
+        return self.most or TrafficRecord(timestamp="N/A", car_count=0, duration_mins=self.window_mins)
+
+    @classmethod
+    def restore(cls, window_mins, least, most, head, tail, record_count):
+        """
+        Function to rebuild a SlidingWindow from its extremes and boundary fragments,
+        so records can keep being added after the tail.
+        """
+        sliding_window = cls(window_mins)
+        for record in tail:
+            sliding_window.add(record.slot, record)
+        sliding_window.least, sliding_window.most = least, most
+        sliding_window.head = list(head)
+        sliding_window.record_count = record_count
+        return sliding_window
+
+    def tail(self):
+        """
+        Function to get the last records of the current contiguous run that can start a window.
+        """
+        return list(self._window)[max(len(self._window) - self.size + 1, 0):] if self.size > 1 else []
+
+    def _update_extremes(self):
+        """
+        Function to compare the current window with the least and most seen so far.
+        The first window wins ties, same as min() and max() over all windows.
+        """
+        if self.least is None or self._car_count < self.least.car_count:
+            self.least = self._current_window()
+        if self.most is None or self._car_count > self.most.car_count:
+            self.most = self._current_window()
+
+    def _current_window(self):
+        """
+        Function to get the current window as TrafficRecord starting at its first half hour.
+        """
+        return TrafficRecord.from_slot(
+            self._window[0].slot,
+            car_count=self._car_count,
+            duration_mins=self.window_mins
+        )
+
+
+def find_window_extremes(records: list[TrafficRecord], window_mins: int = 90):
+    """
+    Function to find the contiguous windows with least and most cars among the given records.
+    Returns a (least, most) tuple of TrafficRecord, N/A records when no window is contiguous.
+    """
+    sliding_window = SlidingWindow(window_mins)
+    for record in records:
+        sliding_window.add(record.slot, record)
+    return sliding_window.least_record(), sliding_window.most_record()
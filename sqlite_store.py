@@ -0,0 +1,168 @@
+import os
+import sqlite3
+from itertools import islice
+from arrow_io import arrow_format, iter_arrow_slots
+from model import TrafficRecord
+from readers import read_slots_mmap
+from sliding_window import window_size
+from time_filter import TimeFilter
+from timestamps import SLOTS_PER_DAY, date_of_day
+
+BATCH_ROWS = 100_000
+MIN_SLOT = -2 ** 62
+MAX_SLOT = 2 ** 62
+
+WINDOW_QUERY = """
+WITH flagged AS (
+    SELECT rowid AS position, slot, car_count,
+           CASE WHEN slot = LAG(slot) OVER (ORDER BY rowid) + 1 THEN 0 ELSE 1 END AS segment_start
+    FROM traffic WHERE {selection}
+), windows AS MATERIALIZED (
+    SELECT position, slot, SUM(car_count) OVER window AS window_count, COUNT(*) OVER window AS row_count,
+           SUM(segment_start) OVER window - segment_start AS breaks
+    FROM flagged WINDOW window AS (ORDER BY position ROWS BETWEEN CURRENT ROW AND :following FOLLOWING)
+), contiguous AS MATERIALIZED (
+    SELECT position, slot, window_count FROM windows WHERE row_count = :following + 1 AND breaks = 0
+)
+SELECT * FROM (SELECT slot, window_count FROM contiguous ORDER BY window_count ASC, position LIMIT 1)
+UNION ALL
+SELECT * FROM (SELECT slot, window_count FROM contiguous ORDER BY window_count DESC, position LIMIT 1)
+"""
+
+
+class SQLiteTrafficData:
+    """
+    Class to hold traffic data in a local SQLite database instead of in memory.
+    Records are stored as (slot, car_count) rows in input order, the rowid, with an index on the
+    half hour slot, so every analysis runs as SQL over the rows selected by a TimeFilter, its time
+    range found through the index, and only the results are read into Python.
+    The database remembers the size and modification time of the data file it was loaded from,
+    so later runs reuse it without parsing the file again, until the file changes.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, time_filter: TimeFilter = TimeFilter()):
+        self.connection = connection
+        self.selection = "slot >= :start_slot AND slot < :end_slot"
+        self.parameters = {
+            "start_slot": MIN_SLOT if time_filter.start_slot is None else time_filter.start_slot,
+            "end_slot": MAX_SLOT if time_filter.end_slot is None else time_filter.end_slot
+        }
+        if time_filter.first_slot_of_day is not None:
+            self.selection += (f" AND ((slot - :first_slot_of_day) % {SLOTS_PER_DAY} + {SLOTS_PER_DAY})"
+                               f" % {SLOTS_PER_DAY} < :slots_of_day")
+            self.parameters.update(first_slot_of_day=time_filter.first_slot_of_day, slots_of_day=time_filter.slots_of_day)
+
+    @classmethod
+    def open(cls, database_path: str, data_file_path: str, time_filter: TimeFilter = TimeFilter()):
+        """
+        Function to open the database, loading the data file into it first unless it was loaded
+        from the same, unchanged file. A database can also be used once the data file is gone.
+        """
+        connection = sqlite3.connect(database_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+        source = dict(connection.execute("SELECT key, value FROM meta").fetchall())
+        if os.path.exists(data_file_path):
+            stat = os.stat(data_file_path)
+            if source != {"path": os.path.abspath(data_file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}:
+                load_file(connection, data_file_path, stat)
+        elif not source:
+            connection.close()
+            raise FileNotFoundError(f"No such data file or loaded database: {data_file_path}")
+        return cls(connection, time_filter)
+
+    def __len__(self):
+        return self._scalar("SELECT COUNT(*) FROM traffic")
+
+    def close(self):
+        """
+        Function to close the database connection.
+        """
+        self.connection.close()
+
+    def calculate_traffic(self):
+        """
+        Function to calculate total traffic.
+        """
+        return self._scalar("SELECT COALESCE(SUM(car_count), 0) FROM traffic")
+
+    def get_daily_traffic(self):
+        """
+        Function to calculate daily traffic ordered by date, grouped in SQL by day slot.
+        """
+        rows = self.connection.execute(
+            f"SELECT slot / {SLOTS_PER_DAY} AS day, SUM(car_count) FROM traffic WHERE {self.selection} "
+            "GROUP BY day ORDER BY day",
+            self.parameters
+        )
+        return {date_of_day(day): car_count for day, car_count in rows}
+
+    def get_top_n_half_hours(self, n=3, largest=True):
+        """
+        Function to get top (or bottom) n half hours with highest (or lowest) traffic,
+        ties keep the input order like a stable sort of all records.
+        """
+        rows = self.connection.execute(
+            f"SELECT slot, car_count FROM traffic WHERE {self.selection} "
+            f"ORDER BY car_count {'DESC' if largest else 'ASC'}, rowid LIMIT :n",
+            {**self.parameters, "n": max(n, 0)}
+        )
+        return [TrafficRecord.from_slot(slot, car_count) for slot, car_count in rows]
+
+    def least_cars_in_ninety_mins(self):
+        """
+        Function to find the timestamp with least number of cars seen in next 90 minutes.
+        """
+        return self.get_window_extremes(window_mins=90)[0]
+
+    def get_window_extremes(self, window_mins=90):
+        """
+        Function to find the contiguous windows of window_mins with least and most cars seen.
+        Window functions flag the rows which do not follow the half hour before them and sum each
+        window, a window is contiguous when it has no flagged row after its first, and both
+        extremes are selected from the same materialized windows.
+        """
+        rows = self.connection.execute(
+            WINDOW_QUERY.format(selection=self.selection), {**self.parameters, "following": window_size(window_mins) - 1}
+        ).fetchall()
+        if not rows:
+            empty = TrafficRecord(timestamp="N/A", car_count=0, duration_mins=window_mins)
+            return empty, empty
+        return tuple(TrafficRecord.from_slot(slot, car_count, window_mins) for slot, car_count in rows)
+
+    def iter_records(self):
+        """
+        Function to iterate over the rows in input order as TrafficRecord.
+        """
+        rows = self.connection.execute(
+            f"SELECT slot, car_count FROM traffic WHERE {self.selection} ORDER BY rowid", self.parameters
+        )
+        for slot, car_count in rows:
+            yield TrafficRecord.from_slot(slot, car_count)
+
+    def _scalar(self, query: str):
+        """
+        Function to run a query over the selected rows which returns a single value.
+        """
+        return self.connection.execute(f"{query} WHERE {self.selection}", self.parameters).fetchone()[0]
+
+
+def load_file(connection: sqlite3.Connection, data_file_path: str, source_stat: os.stat_result | None = None):
+    """
+    Function to bulk load a data file into the database, replacing its rows, in one transaction.
+    Rows are inserted with executemany in batches of BATCH_ROWS and the slot index is built
+    once all rows are in, which is faster than updating it on every insert.
+    """
+    stat = source_stat or os.stat(data_file_path)
+    with connection:
+        connection.execute("DROP TABLE IF EXISTS traffic")
+        connection.execute("CREATE TABLE traffic (slot INTEGER NOT NULL, car_count INTEGER NOT NULL)")
+        rows = iter_arrow_slots(data_file_path) if arrow_format(data_file_path) else read_slots_mmap(data_file_path)
+        while batch := list(islice(rows, BATCH_ROWS)):
+            connection.executemany("INSERT INTO traffic (slot, car_count) VALUES (?, ?)", batch)
+        connection.execute("CREATE INDEX traffic_slot ON traffic (slot)")
+        connection.execute("DELETE FROM meta")
+        connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("path", os.path.abspath(data_file_path)), ("size", stat.st_size), ("mtime_ns", stat.st_mtime_ns)
+        ])
@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import os
+
+from arrow_io import (arrow_format, iter_arrow_records, pa, pq, read_arrow_records, records_to_arrow, result_to_arrow,
+                      write_result, write_table)
+from columnar import np
+from model import TrafficAnalysisResult, TrafficRecord, TrafficRecords
+from traffic_analyzer import TrafficAnalyzer
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestArrowIO(unittest.TestCase):
+    """Test cases for reading and writing Parquet and Arrow files."""
+
+    def setUp(self):
+        """Set up the same records as a text, Parquet and Arrow IPC file."""
+        self.records = TrafficRecords.from_records([
+            TrafficRecord("2021-12-01T05:00:00", 5),
+            TrafficRecord("2021-12-01T05:30:00", 12),
+            TrafficRecord("2021-12-01T06:00:00", 14),
+            TrafficRecord("2021-12-01T06:30:00", 15),
+            TrafficRecord("2021-12-05T09:30:00", 18),
+            TrafficRecord("2021-12-05T10:30:00", 15),
+            TrafficRecord("2021-12-08T18:00:00", 33),
+            TrafficRecord("2021-12-08T18:30:00", 28)
+        ])
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.text_file_path = self.path("data.txt")
+        with open(self.text_file_path, "w") as data_file:
+            data_file.write("".join(f"{record.timestamp} {record.car_count}\n" for record in self.records))
+        table = records_to_arrow(self.records).append_column("counter", pa.array(["A1"] * len(self.records)))
+        self.parquet_file_path = self.path("data.parquet")
+        pq.write_table(table, self.parquet_file_path, row_group_size=2)
+        self.arrow_file_path = self.path("data.arrow")
+        write_table(table, self.arrow_file_path)
+
+    def path(self, name):
+        """Get the path of a file in the temporary directory."""
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_arrow_format(self):
+        """Test the file format is detected from the first bytes of the file."""
+        self.assertEqual(arrow_format(self.parquet_file_path), "parquet")
+        self.assertEqual(arrow_format(self.arrow_file_path), "arrow")
+        self.assertIsNone(arrow_format(self.text_file_path))
+        self.assertIsNone(arrow_format(self.path("missing.parquet")))
+
+    def test_read_records(self):
+        """Test records round trip through Parquet and Arrow files."""
+        for file_path in (self.parquet_file_path, self.arrow_file_path):
+            with self.subTest(file_path=file_path):
+                self.assertEqual(read_arrow_records(file_path), self.records)
+
+    def test_read_records_in_range(self):
+        """Test only the records from the start slot up to, excluding, the end slot are read."""
+        start_slot, end_slot = self.records.slots[2], self.records.slots[6]
+        for file_path in (self.parquet_file_path, self.arrow_file_path):
+            with self.subTest(file_path=file_path):
+                self.assertEqual(read_arrow_records(file_path, start_slot, end_slot), self.records[2:6])
+
+    def test_streaming_skips_row_groups(self):
+        """Test Parquet row groups out of the range are never read when the records are streamed."""
+        start_slot, end_slot = self.records.slots[2], self.records.slots[6]
+
+        with patch.object(pq.ParquetFile, "iter_batches", autospec=True,
+                          side_effect=pq.ParquetFile.iter_batches) as mock_iter_batches:
+            self.assertEqual(list(iter_arrow_records(self.parquet_file_path, start_slot, end_slot)),
+                             list(self.records[2:6]))
+            self.assertEqual(list(iter_arrow_records(self.parquet_file_path, start_slot=self.records.slots[7])),
+                             list(self.records[7:]))
+
+        self.assertEqual([call.kwargs["row_groups"] for call in mock_iter_batches.call_args_list], [[1, 2], [3]])
+
+    def test_string_timestamps(self):
+        """Test timestamps stored as yyyy-mm-ddThh:mm:ss strings are read like Arrow timestamps."""
+        pq.write_table(pa.table({
+            "timestamp": [record.timestamp for record in self.records],
+            "car_count": pa.array(list(self.records.car_counts), pa.int32())
+        }), self.parquet_file_path)
+
+        self.assertEqual(read_arrow_records(self.parquet_file_path), self.records)
+        self.assertEqual(read_arrow_records(self.parquet_file_path, start_slot=self.records.slots[6]), self.records[6:])
+
+    def test_records_to_arrow(self):
+        """Test records export as timestamp and car_count columns."""
+        table = records_to_arrow(self.records[:2])
+
+        self.assertEqual(table.schema.names, ["timestamp", "car_count"])
+        self.assertEqual(table.column("car_count").to_pylist(), [5, 12])
+        self.assertEqual(str(table.column("timestamp")[1]), "2021-12-01 05:30:00")
+
+    def test_records_grow_after_export(self):
+        """Test records can still be appended to while a table exported from them is alive."""
+        records = self.records[:2]
+        table = records_to_arrow(records)
+        records.append(TrafficRecord("2021-12-01T06:00:00", 14))
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(table.column("car_count").to_pylist(), [5, 12])
+
+    def test_result_to_arrow(self):
+        """Test each section of the report exports as its own table, rollups only when set."""
+        result = TrafficAnalysisResult(
+            total_traffic=140,
+            daily_traffic={"2021-12-01": 46, "2021-12-05": 33},
+            top_n_half_hours=[TrafficRecord("2021-12-08T18:00:00", 33)],
+            least_ninety_mins_traffic=TrafficRecord("N/A", 0, 90),
+            monthly_traffic={"2021-12": 140}
+        )
+
+        tables = result_to_arrow(result)
+
+        self.assertEqual(list(tables), ["total_traffic", "daily_traffic", "top_n_half_hours",
+                                        "least_ninety_mins_traffic", "monthly_traffic"])
+        self.assertEqual(tables["total_traffic"].to_pylist(), [{"car_count": 140}])
+        self.assertEqual(str(tables["daily_traffic"].column("date")[1]), "2021-12-05")
+        self.assertEqual(tables["top_n_half_hours"].column("duration_mins").to_pylist(), [30])
+        self.assertEqual(tables["least_ninety_mins_traffic"].num_rows, 0)
+        self.assertEqual(tables["monthly_traffic"].to_pylist(), [{"month": "2021-12", "car_count": 140}])
+
+        paths = write_result(result, self.path("report"))
+        self.assertEqual(pa.ipc.open_file(paths[1]).read_all(), tables["daily_traffic"])
+
+    def test_traffic_analyzer_reads_arrow_files(self):
+        """Test every mode gives the same results for a Parquet or Arrow file as for the text file."""
+        expected = TrafficAnalyzer(self.text_file_path)
+        modes = [{}, {"streaming": True}, {"database": self.path("traffic.db")}]
+        modes += [{"columnar": True}] if np is not None else []
+        for file_path in (self.parquet_file_path, self.arrow_file_path):
+            for options in modes:
+                with self.subTest(file_path=file_path, options=options):
+                    analyzer = TrafficAnalyzer(file_path, **options)
+
+                    self.assertEqual(analyzer.calculate_traffic(), expected.calculate_traffic())
+                    self.assertEqual(analyzer.get_daily_traffic(), expected.get_daily_traffic())
+                    self.assertEqual(analyzer.get_top_n_half_hours(), expected.get_top_n_half_hours())
+                    self.assertEqual(analyzer.least_cars_in_ninety_mins(), expected.least_cars_in_ninety_mins())
+                    self.assertEqual(analyzer.to_arrow(), expected.to_arrow())
+                    if "database" in options:
+                        analyzer.store.close()
+
+    def test_traffic_analyzer_detects_format_on_first_load(self):
+        """Test creating an analyzer does not read the file, its format is detected by the first query."""
+        with patch('traffic_analyzer.arrow_format', wraps=arrow_format) as mock_arrow_format:
+            analyzer = TrafficAnalyzer(self.parquet_file_path)
+            mock_arrow_format.assert_not_called()
+
+            self.assertEqual(analyzer.calculate_traffic(), sum(self.records.car_counts))
+            mock_arrow_format.assert_called_once_with(self.parquet_file_path)
+
+    def test_traffic_analyzer_time_range(self):
+        """Test a time range filters a Parquet file while it is read, the end date included."""
+        analyzer = TrafficAnalyzer(self.parquet_file_path, start="2021-12-05", end="2021-12-05")
+
+        self.assertEqual(analyzer.get_daily_traffic(), {"2021-12-05": 33})
+        with self.assertRaises(ValueError):
+            TrafficAnalyzer(self.parquet_file_path, state_file=self.path("state.json")).calculate_traffic()
+
+
+if __name__ == '__main__':
+    unittest.main()
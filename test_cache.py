@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import os
+
+from cache import cache_file_path, default_cache_dir, evict_cached, load_cached, register_cache_dir, save_cached
+from columnar import np
+from model import TrafficRecord, TrafficRecords
+from traffic_analyzer import TrafficAnalyzer
+
+
+class TestCache(unittest.TestCase):
+    """Test cases for the binary cache of parsed data files."""
+
+    def setUp(self):
+        """Set up a data file in a temporary directory."""
+        self.sample_file_content = """2021-12-01T05:00:00 5
+2021-12-01T05:30:00 12
+2021-12-01T06:00:00 14
+2021-12-05T09:30:00 1234
+"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file_path = os.path.join(self.temp_dir.name, "data.txt")
+        self.cache_dir = os.path.join(self.temp_dir.name, ".traffic_cache")
+        registry_patcher = patch('cache.CACHE_REGISTRY_PATH', os.path.join(self.temp_dir.name, "cache_dirs.txt"))
+        registry_patcher.start()
+        self.addCleanup(registry_patcher.stop)
+        with open(self.data_file_path, "w") as data_file:
+            data_file.write(self.sample_file_content)
+        self.records = TrafficRecords.from_records([
+            TrafficRecord("2021-12-01T05:00:00", 5),
+            TrafficRecord("2021-12-01T05:30:00", 12),
+            TrafficRecord("2021-12-01T06:00:00", 14),
+            TrafficRecord("2021-12-05T09:30:00", 1234)
+        ])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cache_file_path(self):
+        """Test cache files are kept in a folder next to the data file."""
+        self.assertEqual(default_cache_dir(self.data_file_path), self.cache_dir)
+        self.assertTrue(cache_file_path(self.data_file_path).startswith(os.path.join(self.cache_dir, "data.txt.")))
+        self.assertNotEqual(cache_file_path(self.data_file_path),
+                            cache_file_path(os.path.join(self.temp_dir.name, "other", "data.txt")))
+
+    def test_save_and_load(self):
+        """Test records round trip through the cache file."""
+        self.assertIsNone(load_cached(self.data_file_path))
+
+        save_cached(self.data_file_path, self.records)
+
+        self.assertEqual(load_cached(self.data_file_path), self.records)
+        self.assertEqual(os.path.getsize(cache_file_path(self.data_file_path)), 32 + 16 * 4)
+
+    def test_changed_data_file_invalidates_cache(self):
+        """Test the cache is not used once the size or modification time of the data file change."""
+        save_cached(self.data_file_path, self.records)
+
+        stat = os.stat(self.data_file_path)
+        os.utime(self.data_file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNone(load_cached(self.data_file_path))
+
+        save_cached(self.data_file_path, self.records)
+        with open(self.data_file_path, "a") as data_file:
+            data_file.write("2021-12-05T10:00:00 7\n")
+        self.assertIsNone(load_cached(self.data_file_path))
+
+    def test_invalid_cache_file(self):
+        """Test a truncated or foreign cache file is ignored."""
+        save_cached(self.data_file_path, self.records)
+        cache_path = cache_file_path(self.data_file_path)
+        for content in (b"", b"not a cache file", open(cache_path, "rb").read()[0:-8]):
+            with self.subTest(content=content):
+                with open(cache_path, "wb") as cache_file:
+                    cache_file.write(content)
+                self.assertIsNone(load_cached(self.data_file_path))
+
+    def test_least_recently_used_files_are_evicted(self):
+        """Test the oldest cache files are removed once the cache outgrows its cap."""
+        data_file_paths = []
+        for i in range(4):
+            data_file_path = os.path.join(self.temp_dir.name, f"data-{i}.txt")
+            with open(data_file_path, "w") as data_file:
+                data_file.write(self.sample_file_content)
+            save_cached(data_file_path, self.records)
+            cache_path = cache_file_path(data_file_path)
+            os.utime(cache_path, ns=(i * 1_000_000_000, i * 1_000_000_000))
+            data_file_paths.append(data_file_path)
+        cache_file_size = os.path.getsize(cache_path)
+
+        load_cached(data_file_paths[0])
+        evict_cached(self.cache_dir, max_bytes=2 * cache_file_size)
+
+        self.assertEqual(
+            [os.path.exists(cache_file_path(data_file_path)) for data_file_path in data_file_paths],
+            [True, False, False, True]
+        )
+
+    def test_cap_applies_across_cache_directories(self):
+        """Test the cap counts the cache files of every registered cache directory, not only the one written to."""
+        data_file_paths = []
+        for i in range(3):
+            data_file_path = os.path.join(self.temp_dir.name, f"dir-{i}", "data.txt")
+            os.makedirs(os.path.dirname(data_file_path))
+            with open(data_file_path, "w") as data_file:
+                data_file.write(self.sample_file_content)
+            data_file_paths.append(data_file_path)
+        cache_file_size = 32 + 16 * len(self.records)
+
+        for i, data_file_path in enumerate(data_file_paths):
+            save_cached(data_file_path, self.records, max_bytes=2 * cache_file_size)
+            os.utime(cache_file_path(data_file_path), ns=(i * 1_000_000_000, i * 1_000_000_000))
+
+        self.assertEqual(
+            [os.path.exists(cache_file_path(data_file_path)) for data_file_path in data_file_paths],
+            [False, True, True]
+        )
+        self.assertEqual(register_cache_dir(self.cache_dir), [default_cache_dir(path) for path in data_file_paths])
+
+    def test_traffic_analyzer_cache(self):
+        """Test TrafficAnalyzer parses the data file once, then loads the cache."""
+        analyzer = TrafficAnalyzer(self.data_file_path, cache=True).load()
+
+        self.assertTrue(os.path.exists(cache_file_path(self.data_file_path)))
+        with patch.object(TrafficAnalyzer, '_transform_data') as mock_transform:
+            cached_analyzer = TrafficAnalyzer(self.data_file_path, cache=True).load()
+
+        mock_transform.assert_not_called()
+        self.assertEqual(cached_analyzer.traffic_data, analyzer.traffic_data)
+        self.assertEqual(cached_analyzer.get_daily_traffic(), analyzer.get_daily_traffic())
+        self.assertEqual(cached_analyzer.get_top_n_half_hours(), analyzer.get_top_n_half_hours())
+        self.assertEqual(cached_analyzer.least_cars_in_ninety_mins(), analyzer.least_cars_in_ninety_mins())
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_traffic_analyzer_columnar_cache(self):
+        """Test the columnar backend shares the cache with the default backend."""
+        analyzer = TrafficAnalyzer(self.data_file_path, cache=True).load()
+        with patch('columnar.ColumnarTrafficData.from_file') as mock_from_file:
+            columnar_analyzer = TrafficAnalyzer(self.data_file_path, columnar=True, cache=True).load()
+
+        mock_from_file.assert_not_called()
+        self.assertEqual(columnar_analyzer.calculate_traffic(), analyzer.calculate_traffic())
+        self.assertEqual(columnar_analyzer.get_daily_traffic(), analyzer.get_daily_traffic())
+        self.assertEqual(columnar_analyzer.get_top_n_half_hours(), analyzer.get_top_n_half_hours())
+        self.assertEqual(columnar_analyzer.least_cars_in_ninety_mins(), analyzer.least_cars_in_ninety_mins())
+        self.assertEqual(columnar_analyzer.columns.to_traffic_records(), self.records)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_traffic_analyzer_reports_uncacheable_file(self):
+        """Test a file with timestamps off the half hour is analyzed but not cached, with a warning."""
+        with open(self.data_file_path, "a") as data_file:
+            data_file.write("2021-12-05T09:45:00 3\n")
+
+        with self.assertLogs("traffic_analyzer", "WARNING") as logs:
+            analyzer = TrafficAnalyzer(self.data_file_path, columnar=True, cache=True)
+            self.assertEqual(analyzer.calculate_traffic(), 1268)
+
+        self.assertIn(self.data_file_path, logs.output[0])
+        self.assertFalse(os.path.exists(cache_file_path(self.data_file_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
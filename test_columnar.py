@@ -0,0 +1,158 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import os
+
+from columnar import ColumnarTrafficData, np
+from traffic_analyzer import TrafficAnalyzer
+from model import TrafficRecord
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestColumnarTrafficData(unittest.TestCase):
+    """Test cases for ColumnarTrafficData class."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.sample_file_content = """2021-12-01T05:00:00 5
+2021-12-01T05:30:00 12
+2021-12-01T06:00:00 14
+2021-12-01T06:30:00 15
+2021-12-01T07:00:00 25
+2021-12-01T07:30:00 46
+2021-12-01T08:00:00 42
+2021-12-05T09:30:00 18
+2021-12-05T10:30:00 15
+2021-12-08T18:00:00 33
+"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
+            temp_file.write(self.sample_file_content)
+            self.temp_file_path = temp_file.name
+
+    def tearDown(self):
+        os.unlink(self.temp_file_path)
+
+    def test_from_file_column_types(self):
+        """Test columns are stored as int64 epoch seconds and int32 counts."""
+        columns = ColumnarTrafficData.from_file(self.temp_file_path)
+
+        self.assertEqual(len(columns), 10)
+        self.assertEqual(columns.timestamps.dtype, np.int64)
+        self.assertEqual(columns.car_counts.dtype, np.int32)
+        self.assertEqual(columns.timestamps[1] - columns.timestamps[0], 30 * 60)
+
+    def test_results_match_list_backend(self):
+        """Test every analysis gives the same result as the list backend."""
+        analyzer = TrafficAnalyzer(self.temp_file_path)
+        columnar_analyzer = TrafficAnalyzer(self.temp_file_path, columnar=True)
+
+        self.assertEqual(columnar_analyzer.traffic_data, [])
+        self.assertEqual(columnar_analyzer.calculate_traffic(), analyzer.calculate_traffic())
+        self.assertEqual(columnar_analyzer.get_daily_traffic(), analyzer.get_daily_traffic())
+        for n in (0, 1, 3, 20):
+            with self.subTest(n=n):
+                self.assertEqual(columnar_analyzer.get_top_n_half_hours(n), analyzer.get_top_n_half_hours(n))
+        self.assertEqual(columnar_analyzer.least_cars_in_ninety_mins(), analyzer.least_cars_in_ninety_mins())
+
+    def test_top_n_half_hours_ties_keep_input_order(self):
+        """Test ties at the n-th position are resolved like a stable sort."""
+        columns = ColumnarTrafficData.from_records([
+            TrafficRecord("2021-12-01T05:00:00", 7),
+            TrafficRecord("2021-12-01T05:30:00", 9),
+            TrafficRecord("2021-12-01T06:00:00", 7),
+            TrafficRecord("2021-12-01T06:30:00", 7)
+        ])
+
+        self.assertEqual(columns.get_top_n_half_hours(2), [
+            TrafficRecord("2021-12-01T05:30:00", 9),
+            TrafficRecord("2021-12-01T05:00:00", 7)
+        ])
+
+    def test_bottom_and_per_day_match_list_backend(self):
+        """Test bottom n and per day selections give the same result as the list backend."""
+        analyzer = TrafficAnalyzer(self.temp_file_path)
+        columnar_analyzer = TrafficAnalyzer(self.temp_file_path, columnar=True)
+
+        for n in (1, 3, 20):
+            with self.subTest(n=n):
+                self.assertEqual(columnar_analyzer.get_bottom_n_half_hours(n), analyzer.get_bottom_n_half_hours(n))
+                self.assertEqual(columnar_analyzer.get_top_n_half_hours_per_day(n),
+                                 analyzer.get_top_n_half_hours_per_day(n))
+
+    def test_empty_columns(self):
+        """Test analyses on empty columns."""
+        columns = ColumnarTrafficData.from_records([])
+
+        self.assertEqual(columns.calculate_traffic(), 0)
+        self.assertEqual(columns.get_daily_traffic(), {})
+        self.assertEqual(columns.get_top_n_half_hours(), [])
+        self.assertEqual(
+            columns.least_cars_in_ninety_mins(),
+            TrafficRecord(timestamp="N/A", car_count=0, duration_mins=90)
+        )
+
+    def test_least_cars_in_ninety_mins_no_contiguous_intervals(self):
+        """Test least 90 minutes interval when no 3 records are contiguous."""
+        columns = ColumnarTrafficData.from_records([
+            TrafficRecord("2021-12-01T05:00:00", 5),
+            TrafficRecord("2021-12-01T06:00:00", 12),
+            TrafficRecord("2021-12-01T07:30:00", 14)
+        ])
+
+        self.assertEqual(
+            columns.least_cars_in_ninety_mins(),
+            TrafficRecord(timestamp="N/A", car_count=0, duration_mins=90)
+        )
+
+    def test_invalid_data_format(self):
+        """Test invalid counts raise ValueError like the list backend."""
+        with open(self.temp_file_path, "w") as data_file:
+            data_file.write("2021-12-01T05:00:00 abc\n")
+
+        with self.assertRaises(ValueError):
+            ColumnarTrafficData.from_file(self.temp_file_path)
+
+    def test_streaming_and_columnar_cannot_be_combined(self):
+        """Test TrafficAnalyzer rejects both modes at once."""
+        with self.assertRaises(ValueError):
+            TrafficAnalyzer(self.temp_file_path, streaming=True, columnar=True)
+
+    def test_from_mmap_matches_from_file(self):
+        """Test the memory mapped reader decodes the same columns as the text reader."""
+        columns = ColumnarTrafficData.from_file(self.temp_file_path)
+        mapped_columns = ColumnarTrafficData.from_mmap(self.temp_file_path)
+
+        self.assertEqual(mapped_columns.timestamps.tolist(), columns.timestamps.tolist())
+        self.assertEqual(mapped_columns.car_counts.tolist(), columns.car_counts.tolist())
+        self.assertEqual(mapped_columns.timestamps.dtype, np.int64)
+        self.assertEqual(mapped_columns.car_counts.dtype, np.int32)
+
+    def test_from_mmap_across_chunks(self):
+        """Test lines split across chunk boundaries are decoded once and whole."""
+        columns = ColumnarTrafficData.from_file(self.temp_file_path)
+
+        with patch('columnar.CHUNK_BYTES', 50):
+            mapped_columns = ColumnarTrafficData.from_mmap(self.temp_file_path)
+
+        self.assertEqual(mapped_columns.timestamps.tolist(), columns.timestamps.tolist())
+        self.assertEqual(mapped_columns.car_counts.tolist(), columns.car_counts.tolist())
+
+    def test_from_mmap_invalid_data_format(self):
+        """Test malformed lines raise ValueError."""
+        for content in ("2021-12-01T05:00:00 abc\n", "invalid_timestamp abc\n", "2021-12-01 05:00:00 5\n"):
+            with self.subTest(content=content):
+                with open(self.temp_file_path, "w") as data_file:
+                    data_file.write(content)
+                with self.assertRaises(ValueError):
+                    ColumnarTrafficData.from_mmap(self.temp_file_path)
+
+    def test_from_mmap_empty_file(self):
+        """Test an empty file gives empty columns."""
+        with open(self.temp_file_path, "w"):
+            pass
+
+        self.assertEqual(len(ColumnarTrafficData.from_mmap(self.temp_file_path)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import unittest
+import tempfile
+import os
+
+from counters import (DEFAULT_COUNTER, SHARD_MANIFEST_NAME, CounterAggregator, aggregate_counters,
+                      counter_shard_path, parse_counter_line, read_counter_records)
+from traffic_aggregator import TrafficAggregator
+from traffic_analyzer import TrafficAnalyzer
+from model import TrafficRecord
+
+
+class TestCounters(unittest.TestCase):
+    """Test cases for multi-counter data files and per counter shards."""
+
+    def setUp(self):
+        """Set up a data file of two interleaved counters."""
+        self.counter_lines = {
+            "A1": ["2021-12-01T05:00:00 5", "2021-12-01T05:30:00 12", "2021-12-01T06:00:00 14",
+                   "2021-12-01T06:30:00 15", "2021-12-02T00:00:00 42"],
+            "B2": ["2021-12-01T05:30:00 3", "2021-12-01T06:00:00 1", "2021-12-01T06:30:00 2",
+                   "2021-12-01T07:00:00 25"]
+        }
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file_path = os.path.join(self.temp_dir.name, "counters.txt")
+        self.shard_dir = os.path.join(self.temp_dir.name, "shards")
+        lines = sorted(f"{line} {counter_id}" for counter_id, lines in self.counter_lines.items() for line in lines)
+        with open(self.data_file_path, "w") as data_file:
+            data_file.write("\n".join(lines) + "\n\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _counter_aggregator(self, counter_id):
+        aggregator = TrafficAggregator()
+        for line in self.counter_lines[counter_id]:
+            aggregator.add(parse_counter_line(line)[1])
+        return aggregator
+
+    def test_parse_counter_line(self):
+        """Test the counter id column is optional."""
+        self.assertEqual(parse_counter_line("2021-12-01T05:00:00 5 A1\n"),
+                         ("A1", TrafficRecord("2021-12-01T05:00:00", 5)))
+        self.assertEqual(parse_counter_line("2021-12-01T05:00:00 5\n"),
+                         (DEFAULT_COUNTER, TrafficRecord("2021-12-01T05:00:00", 5)))
+        self.assertIsNone(parse_counter_line("  \n"))
+        with self.assertRaises(ValueError):
+            parse_counter_line("2021-12-01T05:00:00 5 A1 extra\n")
+
+    def test_counter_shard_path(self):
+        """Test shard files are named after the counter id, which cannot leave the shard directory."""
+        self.assertEqual(counter_shard_path(self.shard_dir, "A1"), os.path.join(self.shard_dir, "A1.txt"))
+        for counter_id in ("../A1", ".hidden", ""):
+            with self.subTest(counter_id=counter_id):
+                with self.assertRaises(ValueError):
+                    counter_shard_path(self.shard_dir, counter_id)
+
+    def test_per_counter_aggregates(self):
+        """Test each counter is aggregated from its own records only."""
+        aggregator = aggregate_counters([self.data_file_path])
+
+        self.assertEqual(list(aggregator.counters), ["A1", "B2"])
+        for counter_id, result in aggregator.counter_results().items():
+            with self.subTest(counter_id=counter_id):
+                expected = self._counter_aggregator(counter_id)
+                self.assertEqual(result.total_traffic, expected.total_traffic)
+                self.assertEqual(result.daily_traffic, expected.get_daily_traffic())
+                self.assertEqual(result.top_n_half_hours, expected.get_top_n_half_hours())
+                self.assertEqual(result.least_ninety_mins_traffic, expected.least_cars_in_ninety_mins())
+        self.assertEqual(aggregator.counter_results()["B2"].least_ninety_mins_traffic,
+                         TrafficRecord("2021-12-01T05:30:00", 6, 90))
+
+    def test_global_aggregates(self):
+        """Test global aggregates sum the counters per half hour."""
+        global_aggregator = aggregate_counters([self.data_file_path]).global_aggregator()
+
+        self.assertEqual(global_aggregator.total_traffic, 119)
+        self.assertEqual(global_aggregator.get_daily_traffic(), {"2021-12-01": 77, "2021-12-02": 42})
+        self.assertEqual(global_aggregator.get_top_n_half_hours(), [
+            TrafficRecord("2021-12-02T00:00:00", 42),
+            TrafficRecord("2021-12-01T07:00:00", 25),
+            TrafficRecord("2021-12-01T06:30:00", 17)
+        ])
+        self.assertEqual(global_aggregator.least_cars_in_ninety_mins(), TrafficRecord("2021-12-01T05:00:00", 35, 90))
+
+    def test_counters_may_be_interleaved_in_any_order(self):
+        """Test counters stored one after the other give the same aggregates as interleaved counters."""
+        by_counter_path = os.path.join(self.temp_dir.name, "by_counter.txt")
+        with open(by_counter_path, "w") as data_file:
+            for counter_id in ("B2", "A1"):
+                data_file.write("".join(f"{line} {counter_id}\n" for line in self.counter_lines[counter_id]))
+
+        interleaved, by_counter = aggregate_counters([self.data_file_path]), aggregate_counters([by_counter_path])
+
+        self.assertEqual(list(by_counter.global_records()), list(interleaved.global_records()))
+        self.assertEqual(by_counter.counter_results(), interleaved.counter_results())
+
+    def test_shards(self):
+        """Test the records of each counter are written to its own single counter data file."""
+        aggregate_counters([self.data_file_path], shard_dir=self.shard_dir)
+
+        self.assertEqual(sorted(os.listdir(self.shard_dir)), [SHARD_MANIFEST_NAME, "A1.txt", "B2.txt"])
+        for counter_id, lines in self.counter_lines.items():
+            with open(counter_shard_path(self.shard_dir, counter_id)) as shard_file:
+                self.assertEqual(shard_file.read(), "".join(f"{line}\n" for line in lines))
+        self.assertEqual(TrafficAnalyzer(self.shard_dir).calculate_traffic(), 119)
+
+    def test_stale_shards_are_removed(self):
+        """Test the shards of counters no longer in the input are removed, other files are kept."""
+        aggregate_counters([self.data_file_path], shard_dir=self.shard_dir)
+        other_file_path = os.path.join(self.shard_dir, "notes.txt")
+        open(other_file_path, "w").close()
+        data_file_path = os.path.join(self.temp_dir.name, "b2.txt")
+        with open(data_file_path, "w") as data_file:
+            data_file.write("".join(f"{line} B2\n" for line in self.counter_lines["B2"]))
+
+        aggregate_counters([data_file_path], shard_dir=self.shard_dir)
+
+        self.assertEqual(sorted(os.listdir(self.shard_dir)), [SHARD_MANIFEST_NAME, "B2.txt", "notes.txt"])
+
+    def test_failed_pass_removes_temporary_shards(self):
+        """Test an invalid counter id partway through a pass leaves no temporary file and keeps the previous shards."""
+        aggregate_counters([self.data_file_path], shard_dir=self.shard_dir)
+        with open(self.data_file_path, "a") as data_file:
+            data_file.write("2021-12-02T05:00:00 1 ../escape\n")
+
+        with self.assertRaises(ValueError):
+            aggregate_counters([self.data_file_path], shard_dir=self.shard_dir)
+
+        self.assertEqual(sorted(os.listdir(self.shard_dir)), [SHARD_MANIFEST_NAME, "A1.txt", "B2.txt"])
+
+    def test_single_counter_file(self):
+        """Test a file without counter id column is a single default counter."""
+        data_file_path = os.path.join(self.temp_dir.name, "single.txt")
+        with open(data_file_path, "w") as data_file:
+            data_file.write("".join(f"{line}\n" for line in self.counter_lines["A1"]))
+
+        self.assertEqual([counter_id for counter_id, _ in read_counter_records(data_file_path)],
+                         [DEFAULT_COUNTER] * 5)
+        self.assertEqual(list(aggregate_counters([data_file_path]).counter_results()), [DEFAULT_COUNTER])
+
+    def test_traffic_analyzer_counters(self):
+        """Test TrafficAnalyzer answers globally in counters mode, and per counter from the shards."""
+        analyzer = TrafficAnalyzer(self.data_file_path, counters=True, shard_dir=self.shard_dir)
+        global_aggregator = CounterAggregator()
+        for counter_id, record in read_counter_records(self.data_file_path):
+            global_aggregator.add(counter_id, record)
+        global_aggregator = global_aggregator.global_aggregator()
+
+        self.assertEqual(analyzer.calculate_traffic(), 119)
+        self.assertEqual(analyzer.get_daily_traffic(), global_aggregator.get_daily_traffic())
+        self.assertEqual(analyzer.get_top_n_half_hours(n=2), global_aggregator.get_top_n_half_hours(2))
+        self.assertEqual(analyzer.least_cars_in_ninety_mins(), global_aggregator.least_cars_in_ninety_mins())
+        self.assertEqual(analyzer.get_traffic_between("2021-12-01T05:30:00", "2021-12-01T06:30:00"), 30)
+        self.assertEqual(list(analyzer.get_counter_results()), ["A1", "B2"])
+
+        for counter_id in ("A1", "B2"):
+            with self.subTest(counter_id=counter_id):
+                counter_analyzer = TrafficAnalyzer(self.shard_dir, counter=counter_id)
+                self.assertEqual(counter_analyzer.calculate_traffic(), self._counter_aggregator(counter_id).total_traffic)
+                self.assertEqual(counter_analyzer.get_counter_results()[DEFAULT_COUNTER],
+                                 analyzer.get_counter_results()[counter_id])
+
+    def test_traffic_analyzer_counters_mode_combinations(self):
+        """Test counters mode cannot be combined with modes which read the two column format only."""
+        for options in ({"columnar": True}, {"memory_map": True}, {"state_file": "state.json"}):
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    TrafficAnalyzer(self.data_file_path, counters=True, **options)
+
+
+if __name__ == '__main__':
+    unittest.main()
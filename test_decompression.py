@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import patch
+import gzip
+import lzma
+import tempfile
+import os
+
+from columnar import np
+from decompression import compression_format, iter_line_chunks, open_data_file, zstandard
+from readers import read_slots_mmap
+from traffic_analyzer import TrafficAnalyzer
+
+
+class TestDecompression(unittest.TestCase):
+    """Test cases for reading gzip, Zstandard and xz compressed data files."""
+
+    def setUp(self):
+        """Set up a data file and its compressed copies."""
+        self.sample_file_content = """2021-12-01T05:00:00 5
+2021-12-01T05:30:00 12
+2021-12-01T06:00:00 14
+2021-12-01T06:30:00 15
+2021-12-05T09:30:00 18
+2021-12-05T10:00:00 15
+2021-12-05T10:30:00 7
+2021-12-08T18:00:00 33
+"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.data_file_path = self.write("data.txt", self.sample_file_content.encode())
+        self.compressed_file_paths = {
+            "gz": self.write("data.txt.gz", gzip.compress(self.sample_file_content.encode())),
+            "xz": self.write("data.txt.xz", lzma.compress(self.sample_file_content.encode()))
+        }
+        if zstandard is not None:
+            self.compressed_file_paths["zst"] = self.write(
+                "data.txt.zst", zstandard.ZstdCompressor().compress(self.sample_file_content.encode()))
+
+    def write(self, name, content):
+        """Write a file in the temporary directory and return its path."""
+        file_path = os.path.join(self.temp_dir.name, name)
+        with open(file_path, "wb") as data_file:
+            data_file.write(content)
+        return file_path
+
+    def test_compression_format(self):
+        """Test the compression is detected from the first bytes, not from the file name."""
+        for file_format, file_path in self.compressed_file_paths.items():
+            renamed_path = os.path.join(self.temp_dir.name, f"renamed-{file_format}.txt")
+            os.rename(file_path, renamed_path)
+            self.assertEqual(compression_format(renamed_path), file_format)
+        self.assertIsNone(compression_format(self.data_file_path))
+        self.assertIsNone(compression_format(os.path.join(self.temp_dir.name, "missing.gz")))
+
+    def test_open_data_file(self):
+        """Test compressed files read as the same text and bytes as the uncompressed file."""
+        for file_format, file_path in self.compressed_file_paths.items():
+            with self.subTest(file_format=file_format):
+                with open_data_file(file_path) as data_file:
+                    self.assertEqual(data_file.readlines(), self.sample_file_content.splitlines(keepends=True))
+                with open_data_file(file_path, "rb") as data_file:
+                    self.assertEqual(data_file.read(), self.sample_file_content.encode())
+
+    @patch('decompression.READ_BYTES', 16)
+    def test_iter_line_chunks(self):
+        """Test lines split across decompressed chunks are joined, every chunk but the last ends a line."""
+        chunks = list(iter_line_chunks(self.compressed_file_paths["gz"]))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), self.sample_file_content.encode())
+        self.assertTrue(all(chunk.endswith(b"\n") for chunk in chunks))
+        self.assertEqual(list(read_slots_mmap(self.compressed_file_paths["gz"])),
+                         list(read_slots_mmap(self.data_file_path)))
+
+    def test_corrupt_file(self):
+        """Test an error of the background thread is raised by the read which reaches it."""
+        content = gzip.compress(self.sample_file_content.encode())
+        file_path = self.write("corrupt.gz", content[:len(content) // 2])
+
+        with self.assertRaises(EOFError), open_data_file(file_path) as data_file:
+            data_file.read()
+
+    @patch('decompression.QUEUE_CHUNKS', 1)
+    @patch('decompression.READ_BYTES', 16)
+    def test_close_before_the_end(self):
+        """Test closing a stream read in part stops its background thread."""
+        data_file = open_data_file(self.compressed_file_paths["gz"])
+        data_file.readline()
+        thread = data_file.buffer.raw._thread
+
+        data_file.close()
+
+        self.assertFalse(thread.is_alive())
+
+    def test_traffic_analyzer_reads_compressed_files(self):
+        """Test every mode gives the same results for a compressed file as for the uncompressed file."""
+        expected = TrafficAnalyzer(self.data_file_path)
+        modes = [{}, {"memory_map": True}, {"streaming": True}, {"counters": True}]
+        modes += [{"columnar": True}, {"columnar": True, "memory_map": True}] if np is not None else []
+        for file_format, file_path in self.compressed_file_paths.items():
+            for options in modes:
+                with self.subTest(file_format=file_format, options=options):
+                    analyzer = TrafficAnalyzer(file_path, **options)
+
+                    self.assertEqual(analyzer.calculate_traffic(), expected.calculate_traffic())
+                    self.assertEqual(analyzer.get_daily_traffic(), expected.get_daily_traffic())
+                    self.assertEqual(analyzer.get_top_n_half_hours(), expected.get_top_n_half_hours())
+                    self.assertEqual(analyzer.least_cars_in_ninety_mins(), expected.least_cars_in_ninety_mins())
+
+    def test_incremental_mode_needs_uncompressed_file(self):
+        """Test incremental mode, which resumes at a byte offset of the file, rejects compressed files on the first query."""
+        analyzer = TrafficAnalyzer(self.compressed_file_paths["gz"], state_file=os.path.join(self.temp_dir.name, "state"))
+
+        with self.assertRaises(ValueError):
+            analyzer.calculate_traffic()
+
+
+if __name__ == '__main__':
+    unittest.main()
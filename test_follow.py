@@ -0,0 +1,154 @@
+import unittest
+import asyncio
+import tempfile
+import time
+import os
+
+from follow import FollowedFile, PartialTree, follow_files, follow_result
+from model import TrafficAnalysisPartial
+from time_filter import TimeFilter
+from traffic_analyzer import TrafficAnalyzer
+
+
+class TestFollow(unittest.TestCase):
+    """Test cases for following data files as lines are appended."""
+
+    def setUp(self):
+        """Set up a data file."""
+        self.lines = [
+            "2021-12-01T05:00:00 5\n",
+            "2021-12-01T05:30:00 12\n",
+            "2021-12-01T06:00:00 14\n",
+            "2021-12-01T23:30:00 15\n",
+            "2021-12-02T00:00:00 25\n",
+            "2021-12-02T00:30:00 1\n",
+            "2021-12-05T09:30:00 18\n"
+        ]
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file_path = os.path.join(self.temp_dir.name, "data.txt")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, content, mode="w", file_path=None):
+        with open(file_path or self.data_file_path, mode) as data_file:
+            data_file.write(content)
+
+    def _assert_same_results(self, result, file_path=None, **options):
+        analyzer = TrafficAnalyzer(file_path or self.data_file_path, streaming=True, **options)
+        self.assertEqual(result.total_traffic, analyzer.calculate_traffic())
+        self.assertEqual(result.daily_traffic, analyzer.get_daily_traffic())
+        self.assertEqual(result.top_n_half_hours, analyzer.get_top_n_half_hours())
+        self.assertEqual(result.least_ninety_mins_traffic, analyzer.least_cars_in_ninety_mins())
+
+    def test_read_appended(self):
+        """Test only the appended lines are read and a line without newline waits for it."""
+        followed_file = FollowedFile(self.data_file_path)
+        self.assertFalse(followed_file.read_appended())
+
+        self._write("".join(self.lines[0:2]) + self.lines[2][0:10])
+        self.assertTrue(followed_file.read_appended())
+        self.assertEqual(followed_file.aggregator.total_traffic, 17)
+        self.assertEqual(followed_file.partial().total_traffic, 17)
+        self.assertFalse(followed_file.read_appended())
+
+        self._write(self.lines[2][10:] + "".join(self.lines[3:]).rstrip("\n"), mode="a")
+        self.assertTrue(followed_file.read_appended())
+        self.assertEqual(followed_file.aggregator.total_traffic, 72)
+        self._assert_same_results(follow_result([followed_file]))
+
+    def test_truncated_file_is_read_again(self):
+        """Test a file which shrank or was replaced is read again from its start."""
+        followed_file = FollowedFile(self.data_file_path)
+        self._write("".join(self.lines))
+        followed_file.read_appended()
+
+        self._write("".join(self.lines[0:2]))
+        self.assertTrue(followed_file.read_appended())
+        self._assert_same_results(follow_result([followed_file]))
+
+        replaced_path = os.path.join(self.temp_dir.name, "replaced.txt")
+        self._write("".join(self.lines[3:]), file_path=replaced_path)
+        os.replace(replaced_path, self.data_file_path)
+        self.assertTrue(followed_file.read_appended())
+        self._assert_same_results(follow_result([followed_file]))
+
+    def test_time_filter(self):
+        """Test only the half hours of the time filter are added, the last line without newline included."""
+        options = {"start": "2021-12-01T05:30:00", "hours": "23:00-06:00"}
+        followed_file = FollowedFile(self.data_file_path, time_filter=TimeFilter.parse(**options))
+        self._write("".join(self.lines).rstrip("\n"))
+        followed_file.read_appended()
+
+        self.assertEqual(followed_file.partial().total_traffic, 53)
+        self._assert_same_results(follow_result([followed_file]), **options)
+
+        followed_file = FollowedFile(self.data_file_path, time_filter=TimeFilter.parse(start="2022-01-01"))
+        followed_file.read_appended()
+        self.assertEqual(follow_result([followed_file]).total_traffic, 0)
+
+    def test_follow_result_merges_files_in_order(self):
+        """Test several followed files report the same as the multi-file analysis."""
+        for i, lines in enumerate((self.lines[0:3], self.lines[3:5], self.lines[5:])):
+            self._write("".join(lines), file_path=os.path.join(self.temp_dir.name, f"counter-{i}.txt"))
+        followed_files = [FollowedFile(os.path.join(self.temp_dir.name, f"counter-{i}.txt")) for i in range(3)]
+        for followed_file in followed_files:
+            followed_file.read_appended()
+
+        self._assert_same_results(follow_result(followed_files), file_path=self.temp_dir.name)
+
+    def test_follow_files_reports_appended_lines(self):
+        """Test the report is updated within 100 ms of a line being appended."""
+        self._write("".join(self.lines[0:3]))
+        results = []
+        latencies = []
+
+        async def follow_and_append():
+            task = asyncio.create_task(follow_files([self.data_file_path], results.append))
+            try:
+                await self._wait_for(lambda: results)
+                for line in self.lines[3:]:
+                    report_count = len(results)
+                    written = time.perf_counter()
+                    self._write(line, mode="a")
+                    await self._wait_for(lambda: len(results) > report_count)
+                    latencies.append(time.perf_counter() - written)
+            finally:
+                task.cancel()
+
+        asyncio.run(follow_and_append())
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0].total_traffic, 31)
+        self._assert_same_results(results[-1])
+        self.assertLess(sum(latencies) / len(latencies), 0.1)
+
+    async def _wait_for(self, condition, timeout=5):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            self.assertLess(time.perf_counter(), deadline)
+            await asyncio.sleep(0.001)
+
+    def test_partial_tree_update(self):
+        """Test the merged partial follows updates of any partial."""
+        followed_files = []
+        for i, line in enumerate(self.lines):
+            file_path = os.path.join(self.temp_dir.name, f"counter-{i}.txt")
+            self._write(line, file_path=file_path)
+            followed_files.append(FollowedFile(file_path))
+            followed_files[-1].read_appended()
+        partials = PartialTree([followed_file.partial() for followed_file in followed_files],
+                               TrafficAnalysisPartial())
+
+        self._assert_same_results(partials.merged().to_result(), file_path=self.temp_dir.name)
+
+        self._write("2021-12-01T06:30:00 40\n", mode="a", file_path=followed_files[2].file_path)
+        followed_files[2].read_appended()
+        partials.update(2, followed_files[2].partial())
+
+        self._assert_same_results(partials.merged().to_result(), file_path=self.temp_dir.name)
+        self.assertEqual(PartialTree([], TrafficAnalysisPartial()).merged(), TrafficAnalysisPartial())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import json
+import os
+
+from incremental import aggregate_appended, read_state, update_state
+from traffic_analyzer import TrafficAnalyzer
+from model import TrafficRecord
+
+
+class TestIncremental(unittest.TestCase):
+    """Test cases for incremental analysis of append only data files."""
+
+    def setUp(self):
+        """Set up a data file and a state file path."""
+        self.lines = [
+            "2021-12-01T05:00:00 5\n",
+            "2021-12-01T05:30:00 12\n",
+            "2021-12-01T06:00:00 14\n",
+            "2021-12-01T23:30:00 15\n",
+            "2021-12-02T00:00:00 25\n",
+            "2021-12-02T00:30:00 1\n",
+            "2021-12-05T09:30:00 18\n"
+        ]
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file_path = os.path.join(self.temp_dir.name, "data.txt")
+        self.state_file_path = os.path.join(self.temp_dir.name, "state.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, content, mode="w"):
+        with open(self.data_file_path, mode) as data_file:
+            data_file.write(content)
+
+    def _assert_same_results(self, aggregator):
+        analyzer = TrafficAnalyzer(self.data_file_path, streaming=True)
+        self.assertEqual(aggregator.total_traffic, analyzer.calculate_traffic())
+        self.assertEqual(aggregator.get_daily_traffic(), analyzer.get_daily_traffic())
+        self.assertEqual(aggregator.get_top_n_half_hours(), analyzer.get_top_n_half_hours())
+        self.assertEqual(aggregator.get_window_extremes(), analyzer.get_window_extremes())
+
+    def test_first_run_saves_state(self):
+        """Test the first run analyzes the whole file and saves the state."""
+        self._write("".join(self.lines))
+
+        aggregator = update_state(self.data_file_path, self.state_file_path)
+
+        self._assert_same_results(aggregator)
+        state = read_state(self.state_file_path)
+        self.assertEqual(state["offset"], len("".join(self.lines)))
+        self.assertEqual(state["last_line"], self.lines[-1])
+        self.assertEqual(state["partial"]["total_traffic"], 90)
+
+    def test_appended_lines_only_are_parsed(self):
+        """Test a run after lines were appended only parses the new lines."""
+        self._write("".join(self.lines[0:3]))
+        update_state(self.data_file_path, self.state_file_path)
+        self._write("".join(self.lines[3:]), mode="a")
+
+        with patch('readers.TrafficRecord', wraps=TrafficRecord) as mock_record:
+            aggregator = update_state(self.data_file_path, self.state_file_path)
+
+        self.assertEqual(mock_record.call_count, 4)
+        self._assert_same_results(aggregator)
+
+    def test_unchanged_file_parses_nothing(self):
+        """Test a run on an unchanged file only reads the saved state."""
+        self._write("".join(self.lines))
+        update_state(self.data_file_path, self.state_file_path)
+
+        with patch('readers.TrafficRecord', wraps=TrafficRecord) as mock_record:
+            aggregator = update_state(self.data_file_path, self.state_file_path)
+
+        mock_record.assert_not_called()
+        self._assert_same_results(aggregator)
+
+    def test_last_line_without_newline(self):
+        """Test a last line without newline is reported but read again on the next run."""
+        self._write("".join(self.lines).rstrip("\n"))
+
+        aggregator = update_state(self.data_file_path, self.state_file_path)
+
+        self._assert_same_results(aggregator)
+        self.assertEqual(read_state(self.state_file_path)["offset"], len("".join(self.lines[0:-1])))
+
+        self._write("\n2021-12-05T10:00:00 7\n", mode="a")
+        self._assert_same_results(update_state(self.data_file_path, self.state_file_path))
+
+    def test_line_being_written_is_skipped(self):
+        """Test a partially written last line is ignored until it is complete."""
+        self._write("".join(self.lines) + "2021-12-05T10:0")
+
+        aggregator = update_state(self.data_file_path, self.state_file_path)
+
+        self.assertEqual(aggregator.total_traffic, 90)
+        self._write("0:00 7\n", mode="a")
+        self._assert_same_results(update_state(self.data_file_path, self.state_file_path))
+
+    def test_rewritten_file_rebuilds_state(self):
+        """Test the state is rebuilt when the file was truncated or rewritten."""
+        self._write("".join(self.lines))
+        update_state(self.data_file_path, self.state_file_path)
+
+        for content in ("".join(self.lines[0:2]), "".join(self.lines[1:]) + "2021-12-06T10:00:00 3\n"):
+            with self.subTest(content=content):
+                self._write(content)
+                self._assert_same_results(update_state(self.data_file_path, self.state_file_path))
+
+    def test_invalid_state_file_rebuilds_state(self):
+        """Test an unreadable state file is ignored."""
+        self._write("".join(self.lines))
+        with open(self.state_file_path, "w") as state_file:
+            state_file.write("{not json")
+
+        self.assertIsNone(read_state(self.state_file_path))
+        self._assert_same_results(update_state(self.data_file_path, self.state_file_path))
+        self.assertIsNotNone(read_state(self.state_file_path))
+
+    def test_larger_top_n_rebuilds_state(self):
+        """Test a state saved with fewer top half hours than asked for is rebuilt."""
+        self._write("".join(self.lines))
+        update_state(self.data_file_path, self.state_file_path, top_n=3)
+
+        aggregator = update_state(self.data_file_path, self.state_file_path, top_n=5)
+
+        self.assertEqual(len(aggregator.get_top_n_half_hours(5)), 5)
+        with open(self.state_file_path) as state_file:
+            self.assertEqual(json.load(state_file)["partial"]["top_n"], 5)
+
+    def test_aggregate_appended_from_offset(self):
+        """Test aggregating from a byte offset."""
+        self._write("".join(self.lines))
+        offset = len(self.lines[0])
+
+        appended, end, last_line, pending = aggregate_appended(self.data_file_path, offset)
+
+        self.assertEqual(appended.total_traffic, 85)
+        self.assertEqual(appended.record_count, 6)
+        self.assertEqual(end, len("".join(self.lines)))
+        self.assertEqual(last_line, self.lines[-1].encode())
+        self.assertEqual(pending.record_count, 0)
+
+    def test_traffic_analyzer_state_file(self):
+        """Test TrafficAnalyzer analyzes incrementally with a state_file."""
+        self._write("".join(self.lines[0:4]))
+        TrafficAnalyzer(self.data_file_path, state_file=self.state_file_path).calculate_traffic()
+        self._write("".join(self.lines[4:]), mode="a")
+
+        analyzer = TrafficAnalyzer(self.data_file_path, state_file=self.state_file_path)
+        expected = TrafficAnalyzer(self.data_file_path)
+
+        self.assertTrue(analyzer.streaming)
+        self.assertEqual(analyzer.calculate_traffic(), expected.calculate_traffic())
+        self.assertEqual(analyzer.get_daily_traffic(), expected.get_daily_traffic())
+        self.assertEqual(analyzer.get_top_n_half_hours(), expected.get_top_n_half_hours())
+        self.assertEqual(analyzer.least_cars_in_ninety_mins(), expected.least_cars_in_ninety_mins())
+        with self.assertRaises(ValueError):
+            TrafficAnalyzer(self.data_file_path, columnar=True, state_file=self.state_file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
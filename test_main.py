@@ -2,9 +2,11 @@ import unittest
 from unittest.mock import patch, mock_open, MagicMock
 import tempfile
 import os
+from io import StringIO
 
 from main import main
 from model import TrafficRecord, TrafficAnalysisResult
+from time_filter import TimeFilter
 
 
 class TestMain(unittest.TestCase):
@@ -28,7 +30,7 @@ class TestMain(unittest.TestCase):
             TrafficRecord(timestamp="2021-12-01T07:30:00", car_count=46)
         ]
 
-    @patch('traffic_analyzer.open', new_callable=mock_open, read_data="2021-12-01T05:00:00 5\n2021-12-01T05:30:00 12\n2021-12-01T06:00:00 14\n")
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open, read_data="2021-12-01T05:00:00 5\n2021-12-01T05:30:00 12\n2021-12-01T06:00:00 14\n")
     @patch('sys.argv', ['main.py'])
     def test_main_default_file(self, mock_file):
         """Test main function with default file path."""
@@ -39,7 +41,7 @@ class TestMain(unittest.TestCase):
             self.assertTrue(mock_print.called)
             self.assertEqual(mock_print.call_count, 4)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open, read_data="2021-12-01T05:00:00 5\n2021-12-01T05:30:00 12\n2021-12-01T06:00:00 14\n")
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open, read_data="2021-12-01T05:00:00 5\n2021-12-01T05:30:00 12\n2021-12-01T06:00:00 14\n")
     @patch('sys.argv', ['main.py', '--inputfile', 'custom_data.txt'])
     def test_main_custom_file(self, mock_file):
         """Test main function with custom file path."""
@@ -80,6 +82,258 @@ class TestMain(unittest.TestCase):
 
         mock_analyzer_class.assert_called_once_with("/path/to/custom/file.txt")
 
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--stream'])
+    def test_main_creates_streaming_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main creates a streaming TrafficAnalyzer with --stream."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", streaming=True)
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--columnar'])
+    def test_main_creates_columnar_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main creates a columnar TrafficAnalyzer with --columnar."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", columnar=True)
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--inputfile', 'data/*.txt', '--workers', '4'])
+    def test_main_creates_traffic_analyzer_with_workers(self, mock_result_class, mock_analyzer_class):
+        """Test that main passes a glob pattern and --workers to TrafficAnalyzer."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("data/*.txt", workers=4)
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--mmap'])
+    def test_main_creates_memory_mapped_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main creates a memory mapped TrafficAnalyzer with --mmap."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", memory_map=True)
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--state', 'state.json'])
+    def test_main_creates_incremental_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main creates an incremental TrafficAnalyzer with --state."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", state_file="state.json")
+
+    @patch('main.follow_files')
+    @patch('main.TrafficAnalyzer')
+    @patch('sys.argv', ['main.py', '--follow'])
+    def test_main_follows_input_files(self, mock_analyzer_class, mock_follow_files):
+        """Test that main follows the input files with --follow instead of analyzing them once."""
+        async def follow_files(file_paths, on_update, time_filter):
+            on_update("report")
+
+        mock_follow_files.side_effect = follow_files
+
+        with patch('builtins.print') as mock_print:
+            main()
+
+        mock_analyzer_class.assert_not_called()
+        mock_follow_files.assert_called_once()
+        self.assertEqual(mock_follow_files.call_args.args[0], ["./data/data.txt"])
+        self.assertFalse(mock_follow_files.call_args.kwargs["time_filter"])
+        mock_print.assert_any_call("report", flush=True)
+
+    @patch('main.follow_files')
+    @patch('sys.argv', ['main.py', '--follow', '--from', '2021-12-05', '--hours', '07:00-10:00'])
+    def test_main_follows_time_range(self, mock_follow_files):
+        """Test that main follows the input files filtered by --from, --to and --hours."""
+        async def follow_files(file_paths, on_update, time_filter):
+            on_update("report")
+
+        mock_follow_files.side_effect = follow_files
+
+        with patch('builtins.print'):
+            main()
+
+        self.assertEqual(mock_follow_files.call_args.kwargs["time_filter"],
+                         TimeFilter.parse("2021-12-05", hours="07:00-10:00"))
+
+    @patch('main.follow_files')
+    def test_main_rejects_options_ignored_by_follow(self, mock_follow_files):
+        """Test that main exits with an error for options --follow does not apply instead of ignoring them."""
+        for option in (["--stream"], ["--rollups"], ["--export", "report"], ["--profile"], ["--hours", "7-10"],
+                       ["--counters"], ["--counter", "counter-7"]):
+            with self.subTest(option=option), patch('sys.argv', ['main.py', '--follow', *option]), \
+                    patch('sys.stderr'), self.assertRaises(SystemExit):
+                main()
+        mock_follow_files.assert_not_called()
+
+    @patch('main.print')
+    def test_main_rejects_invalid_options(self, mock_print):
+        """Test that main exits with a usage error for an invalid time range or options which conflict."""
+        for options in (["--hours", "7-10"], ["--from", "2021-13-01"], ["--stream", "--columnar"],
+                        ["--database", "traffic.db", "--cache"]):
+            with self.subTest(options=options), patch('sys.argv', ['main.py', *options]), \
+                    patch('sys.stderr'), self.assertRaises(SystemExit) as context:
+                main()
+            self.assertEqual(context.exception.code, 2)
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--cache'])
+    def test_main_creates_cached_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main creates a TrafficAnalyzer using the binary cache with --cache."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", cache=True)
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--counters', '--shards', 'shards'])
+    def test_main_creates_counters_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main creates a multi-counter TrafficAnalyzer with --counters and --shards."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", counters=True, shard_dir="shards")
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--inputfile', 'shards', '--counter', 'A1'])
+    def test_main_creates_single_counter_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main analyzes a single counter of a shard directory with --counter."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("shards", counter="A1")
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--profile'])
+    def test_main_creates_profiled_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main creates a profiled TrafficAnalyzer with --profile."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", profile=True)
+
+    @patch('main.cProfile.Profile')
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--profile-output', 'main.prof'])
+    def test_main_dumps_cprofile_stats(self, mock_result_class, mock_analyzer_class, mock_profile_class):
+        """Test that main profiles the analysis and dumps the stats with --profile-output."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_profile_class.return_value.enable.assert_called_once()
+        mock_profile_class.return_value.disable.assert_called_once()
+        mock_profile_class.return_value.dump_stats.assert_called_once_with("main.prof")
+
+    @patch('main.write_table')
+    @patch('main.write_result')
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--export', 'report'])
+    def test_main_exports_arrow_files(self, mock_result_class, mock_analyzer_class, mock_write_result,
+                                      mock_write_table):
+        """Test that main writes the report and the records to Arrow files with --export."""
+        mock_analyzer_instance = MagicMock()
+        mock_analyzer_class.return_value = mock_analyzer_instance
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_write_result.assert_called_once_with(mock_result_class.return_value, "report")
+        mock_write_table.assert_called_once_with(mock_analyzer_instance.to_arrow.return_value,
+                                                 os.path.join("report", "records.arrow"))
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--rollups'])
+    def test_main_adds_rollup_sections(self, mock_result_class, mock_analyzer_class):
+        """Test that main adds the rollups to the report with --rollups."""
+        mock_analyzer_instance = MagicMock()
+        mock_analyzer_class.return_value = mock_analyzer_instance
+        mock_result_instance = MagicMock()
+        mock_result_class.return_value = mock_result_instance
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt")
+        self.assertIs(mock_result_instance.hourly_traffic, mock_analyzer_instance.get_hourly_traffic.return_value)
+        self.assertIs(mock_result_instance.weekly_traffic, mock_analyzer_instance.get_weekly_traffic.return_value)
+        self.assertIs(mock_result_instance.monthly_traffic, mock_analyzer_instance.get_monthly_traffic.return_value)
+        self.assertIs(mock_result_instance.day_of_week_traffic,
+                      mock_analyzer_instance.get_day_of_week_traffic.return_value)
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--database', 'traffic.db', '--from', '2021-12-01', '--to', '2021-12-05'])
+    def test_main_creates_database_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main creates a SQLite backed TrafficAnalyzer over a time range with --database, --from and --to."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", database="traffic.db", start="2021-12-01", end="2021-12-05")
+
+    @patch('main.TrafficAnalyzer')
+    @patch('main.TrafficAnalysisResult')
+    @patch('sys.argv', ['main.py', '--from', '2021-12-01', '--to', '2021-12-05T12:00:00', '--hours', '07:00-10:00'])
+    def test_main_creates_time_filtered_traffic_analyzer(self, mock_result_class, mock_analyzer_class):
+        """Test that main limits the analysis to a time range and time of day range with --from, --to and --hours."""
+        mock_analyzer_class.return_value = MagicMock()
+        mock_result_class.return_value = MagicMock()
+
+        with patch('builtins.print'):
+            main()
+
+        mock_analyzer_class.assert_called_once_with("./data/data.txt", start="2021-12-01", end="2021-12-05T12:00:00", hours="07:00-10:00")
+
     @patch('main.TrafficAnalyzer')
     @patch('main.TrafficAnalysisResult')
     @patch('sys.argv', ['main.py'])
@@ -190,10 +444,10 @@ class TestMain(unittest.TestCase):
         # Make TrafficAnalyzer raise an exception
         mock_analyzer_class.side_effect = ValueError("Invalid data format")
         
-        with self.assertRaises(ValueError) as context:
+        with patch('sys.stderr', new_callable=StringIO) as mock_stderr, self.assertRaises(SystemExit):
             main()
         
-        self.assertEqual(str(context.exception), "Invalid data format")
+        self.assertIn("Invalid data format", mock_stderr.getvalue())
 
     def test_main_flow_integration(self):
         """Test the complete flow of main function with minimal mocking."""
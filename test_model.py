@@ -1,8 +1,13 @@
 import unittest
 from unittest.mock import patch
 from io import StringIO
+from dataclasses import dataclass
+import pickle
+import json
+import tracemalloc
 
-from model import TrafficRecord, TrafficAnalysisResult
+from model import TrafficRecord, TrafficRecords, TrafficAnalysisResult, TrafficAnalysisPartial
+from timestamps import parse_slot, slot_to_timestamp
 
 
 class TestTrafficRecord(unittest.TestCase):
@@ -39,6 +44,110 @@ class TestTrafficRecord(unittest.TestCase):
         self.assertIsInstance(record.car_count, int)
         self.assertIsInstance(record.duration_mins, int)
 
+    def test_traffic_record_slot(self):
+        """Test TrafficRecord decodes its timestamp into a half hour slot once, when created."""
+        expected_slot = parse_slot("2021-12-01T05:30:00")
+        with patch('model.parse_slot', wraps=parse_slot) as mock_parse:
+            record = TrafficRecord("2021-12-01T05:30:00", 15)
+            self.assertEqual(record.slot, expected_slot)
+            self.assertEqual(record.timestamp, "2021-12-01T05:30:00")
+            self.assertEqual(record.slot, expected_slot)
+
+        mock_parse.assert_called_once_with("2021-12-01T05:30:00")
+        self.assertEqual(record.slot, TrafficRecord("2021-12-01T05:00:00", 5).slot + 1)
+
+    def test_traffic_record_from_slot(self):
+        """Test records created from a slot equal records created from the timestamp."""
+        record = TrafficRecord("2021-12-01T05:30:00", 15, 90)
+
+        with patch('model.slot_to_timestamp') as mock_format:
+            from_slot = TrafficRecord.from_slot(record.slot, 15, 90)
+
+        mock_format.assert_not_called()
+        self.assertEqual(from_slot, record)
+        self.assertNotEqual(TrafficRecord.from_slot(record.slot, 15), record)
+
+    def test_traffic_record_not_available(self):
+        """Test the N/A timestamp of a window that was not found."""
+        record = TrafficRecord(timestamp="N/A", car_count=0, duration_mins=90)
+
+        self.assertIsNone(record.slot)
+        self.assertEqual(record.timestamp, "N/A")
+        self.assertEqual(record, TrafficRecord("N/A", 0, 90))
+        self.assertEqual(repr(record), "TrafficRecord(timestamp='N/A', car_count=0, duration_mins=90)")
+
+    def test_traffic_record_invalid_timestamp(self):
+        """Test timestamps which are not on a half hour raise ValueError."""
+        for timestamp in ("invalid_timestamp", "2021-12-01T05:15:00", "2021-12-01T05:30:01", "2021-12-01 05:30:00"):
+            with self.subTest(timestamp=timestamp):
+                with self.assertRaises(ValueError):
+                    TrafficRecord(timestamp, 5)
+
+    def test_traffic_record_has_no_dict(self):
+        """Test TrafficRecord uses __slots__ instead of a __dict__ per record."""
+        record = TrafficRecord("2021-12-01T05:30:00", 15)
+
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+
+class TestTrafficRecords(unittest.TestCase):
+    """Test cases for the TrafficRecords array of structs."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.records = [
+            TrafficRecord("2021-12-01T05:00:00", 5),
+            TrafficRecord("2021-12-01T05:30:00", 12),
+            TrafficRecord("2021-12-01T06:00:00", 14),
+            TrafficRecord("2021-12-05T09:30:00", 1234)
+        ]
+
+    def test_sequence_of_records(self):
+        """Test TrafficRecords reads back as the packed TrafficRecord objects."""
+        traffic_records = TrafficRecords.from_records(self.records)
+
+        self.assertEqual(len(traffic_records), 4)
+        self.assertEqual(list(traffic_records), self.records)
+        self.assertEqual(traffic_records, self.records)
+        self.assertEqual(self.records, traffic_records)
+        self.assertEqual(traffic_records[-1], self.records[-1])
+        self.assertEqual(traffic_records[1:3], self.records[1:3])
+        self.assertIsInstance(traffic_records[1:3], TrafficRecords)
+        self.assertNotEqual(traffic_records, self.records[0:3])
+        self.assertEqual(TrafficRecords(), [])
+
+    def test_from_slots(self):
+        """Test TrafficRecords packs (slot, car_count) pairs."""
+        traffic_records = TrafficRecords.from_slots((record.slot, record.car_count) for record in self.records)
+
+        self.assertEqual(traffic_records, TrafficRecords.from_records(self.records))
+
+    def test_memory_per_record(self):
+        """Test a record takes at least 3 times less memory than a dataclass holding the timestamp string."""
+        @dataclass
+        class DictTrafficRecord:
+            timestamp: str
+            car_count: int
+            duration_mins: int = 30
+
+        lines = [f"{slot_to_timestamp(900000 + i)} {i % 500}\n" for i in range(10000)]
+
+        def traced_memory(load):
+            tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]
+                records = load(line.split() for line in lines)
+                return tracemalloc.get_traced_memory()[0] - before
+            finally:
+                tracemalloc.stop()
+
+        dict_memory = traced_memory(lambda data: [DictTrafficRecord(k, int(v)) for k, v in data])
+        slots_memory = traced_memory(lambda data: [TrafficRecord(k, int(v)) for k, v in data])
+        array_memory = traced_memory(lambda data: TrafficRecords.from_records(TrafficRecord(k, int(v)) for k, v in data))
+
+        self.assertLess(slots_memory, dict_memory)
+        self.assertGreaterEqual(dict_memory, 3 * array_memory)
 
 class TestTrafficAnalysisResult(unittest.TestCase):
     """Test cases for TrafficAnalysisResult dataclass."""
@@ -256,5 +365,115 @@ class TestTrafficAnalysisResult(unittest.TestCase):
         self.assertIn("2021-12-01\t100", printed_output)
         self.assertIn("2021-12-01T05:00:00 50", printed_output)
 
+class TestTrafficAnalysisPartial(unittest.TestCase):
+    """Test cases for TrafficAnalysisPartial dataclass."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.records = [
+            TrafficRecord("2021-12-01T05:00:00", 5),
+            TrafficRecord("2021-12-01T05:30:00", 12),
+            TrafficRecord("2021-12-01T06:00:00", 14),
+            TrafficRecord("2021-12-01T06:30:00", 15),
+            TrafficRecord("2021-12-01T07:00:00", 25),
+            TrafficRecord("2021-12-01T07:30:00", 46),
+            TrafficRecord("2021-12-01T08:00:00", 42),
+            TrafficRecord("2021-12-05T09:30:00", 18),
+            TrafficRecord("2021-12-05T10:00:00", 1),
+            TrafficRecord("2021-12-05T10:30:00", 1)
+        ]
+
+    def _partial(self, records, window_mins=90):
+        """Build the partial of the given records, one shard per record."""
+        partial = TrafficAnalysisPartial(window_mins=window_mins)
+        fragment_size = window_mins // 30 - 1
+        for record in records:
+            partial = partial + TrafficAnalysisPartial(
+                window_mins=window_mins,
+                total_traffic=record.car_count,
+                daily_traffic={record.timestamp[0:10]: record.car_count},
+                top_n_half_hours=[record],
+                least_window=record if fragment_size == 0 else None,
+                most_window=record if fragment_size == 0 else None,
+                head=[record][0:fragment_size],
+                tail=[record][0:fragment_size],
+                record_count=1
+            )
+        return partial
+
+    def test_empty_partial_is_identity(self):
+        """Test adding an empty partial on either side changes nothing."""
+        partial = self._partial(self.records)
+
+        self.assertEqual(partial + TrafficAnalysisPartial(), partial)
+        self.assertEqual(TrafficAnalysisPartial() + partial, partial)
+
+    def test_merge_is_associative(self):
+        """Test shards can be reduced in any grouping."""
+        first, second, third = (self._partial(self.records[0:2]), self._partial(self.records[2:5]),
+                                self._partial(self.records[5:]))
+
+        self.assertEqual((first + second) + third, first + (second + third))
+
+    def test_merge_of_single_record_shards(self):
+        """Test windows crossing shard boundaries are found from head and tail fragments."""
+        partial = self._partial(self.records)
+
+        self.assertEqual(partial.total_traffic, 179)
+        self.assertEqual(partial.daily_traffic, {"2021-12-01": 159, "2021-12-05": 20})
+        self.assertEqual([record.car_count for record in partial.top_n_half_hours], [46, 42, 25])
+        self.assertEqual(partial.least_window, TrafficRecord("2021-12-05T09:30:00", 20, 90))
+        self.assertEqual(partial.most_window, TrafficRecord("2021-12-01T07:00:00", 113, 90))
+        self.assertEqual(partial.head, self.records[0:2])
+        self.assertEqual(partial.tail, self.records[-2:])
+        self.assertEqual(partial.record_count, 10)
+
+    def test_merge_with_longer_window(self):
+        """Test boundary fragments grow with the window length."""
+        partial = self._partial(self.records, window_mins=180)
+
+        self.assertEqual(partial.head, self.records[0:5])
+        self.assertEqual(partial.least_window, TrafficRecord("2021-12-01T05:00:00", 117, 180))
+        self.assertEqual(partial.most_window, TrafficRecord("2021-12-01T05:30:00", 154, 180))
+
+    def test_merge_with_half_hour_window(self):
+        """Test a 30 minutes window needs no boundary fragments."""
+        partial = self._partial(self.records, window_mins=30)
+
+        self.assertEqual(partial.head, [])
+        self.assertEqual(partial.tail, [])
+        self.assertEqual(partial.least_window, TrafficRecord("2021-12-05T10:00:00", 1))
+
+    def test_merge_different_settings(self):
+        """Test partials with different top_n or window_mins cannot be merged."""
+        with self.assertRaises(ValueError):
+            TrafficAnalysisPartial(top_n=3) + TrafficAnalysisPartial(top_n=5)
+        with self.assertRaises(ValueError):
+            TrafficAnalysisPartial(window_mins=90) + TrafficAnalysisPartial(window_mins=60)
+
+    def test_to_result(self):
+        """Test the partial becomes the final TrafficAnalysisResult."""
+        result = self._partial(self.records).to_result()
+
+        self.assertIsInstance(result, TrafficAnalysisResult)
+        self.assertEqual(result.total_traffic, 179)
+        self.assertEqual(list(result.daily_traffic), ["2021-12-01", "2021-12-05"])
+        self.assertEqual(result.least_ninety_mins_traffic, TrafficRecord("2021-12-05T09:30:00", 20, 90))
+
+    def test_to_result_without_window(self):
+        """Test the report shows N/A when no window is contiguous."""
+        result = TrafficAnalysisPartial().to_result()
+
+        self.assertEqual(result.least_ninety_mins_traffic, TrafficRecord("N/A", 0, 90))
+
+    def test_to_dict_round_trip(self):
+        """Test a partial survives a JSON round trip through to_dict and from_dict."""
+        for partial in (self._partial(self.records), TrafficAnalysisPartial()):
+            with self.subTest(partial=partial):
+                values = json.loads(json.dumps(partial.to_dict()))
+
+                self.assertEqual(TrafficAnalysisPartial.from_dict(values), partial)
+
+
 if __name__ == '__main__':
     unittest.main()
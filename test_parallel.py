@@ -0,0 +1,91 @@
+import unittest
+import tempfile
+import os
+
+from parallel import aggregate_files, find_data_files, is_multi_file_path
+from traffic_analyzer import TrafficAnalyzer
+from model import TrafficRecord
+
+
+class TestParallel(unittest.TestCase):
+    """Test cases for multi-file parallel aggregation."""
+
+    def setUp(self):
+        """Set up one data file per day, with 90 minutes windows crossing midnight."""
+        self.file_contents = {
+            "counter-2021-12-01.txt": "2021-12-01T22:30:00 5\n2021-12-01T23:00:00 12\n2021-12-01T23:30:00 14\n",
+            "counter-2021-12-02.txt": "2021-12-02T00:00:00 1\n2021-12-02T00:30:00 2\n2021-12-02T07:00:00 46\n",
+            "counter-2021-12-03.txt": "2021-12-03T09:30:00 18\n"
+        }
+        self.temp_dir = tempfile.TemporaryDirectory()
+        for name, content in self.file_contents.items():
+            with open(os.path.join(self.temp_dir.name, name), "w") as data_file:
+                data_file.write(content)
+        self.all_data_path = os.path.join(self.temp_dir.name, "all.txt.data")
+        with open(self.all_data_path, "w") as data_file:
+            data_file.write("".join(self.file_contents.values()))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_is_multi_file_path(self):
+        """Test directories and glob patterns are detected."""
+        self.assertTrue(is_multi_file_path(self.temp_dir.name))
+        self.assertTrue(is_multi_file_path(os.path.join(self.temp_dir.name, "*.txt")))
+        self.assertFalse(is_multi_file_path(self.all_data_path))
+        self.assertFalse(is_multi_file_path("nonexistent_file.txt"))
+
+    def test_find_data_files(self):
+        """Test data files are listed in sorted order for a directory and a glob."""
+        expected = [os.path.join(self.temp_dir.name, name) for name in sorted(self.file_contents)]
+
+        self.assertEqual(find_data_files(os.path.join(self.temp_dir.name, "counter-*.txt")), expected)
+        self.assertEqual(find_data_files(self.temp_dir.name), sorted(expected + [self.all_data_path]))
+        self.assertEqual(find_data_files(self.all_data_path), [self.all_data_path])
+
+    def test_aggregate_files_matches_single_file(self):
+        """Test merged partial aggregates equal the aggregate of the concatenated files."""
+        file_paths = find_data_files(os.path.join(self.temp_dir.name, "counter-*.txt"))
+
+        merged = aggregate_files(file_paths, top_n=3, max_workers=2)
+        single = aggregate_files([self.all_data_path], top_n=3)
+
+        self.assertEqual(merged.total_traffic, single.total_traffic)
+        self.assertEqual(merged.get_daily_traffic(), single.get_daily_traffic())
+        self.assertEqual(merged.get_top_n_half_hours(), single.get_top_n_half_hours())
+        self.assertEqual(merged.get_window_extremes(), single.get_window_extremes())
+
+    def test_windows_crossing_file_boundary(self):
+        """Test windows spanning two files are found after merging."""
+        file_paths = find_data_files(os.path.join(self.temp_dir.name, "counter-*.txt"))
+
+        least, most = aggregate_files(file_paths, max_workers=2).get_window_extremes()
+
+        self.assertEqual(least, TrafficRecord(timestamp="2021-12-01T23:30:00", car_count=17, duration_mins=90))
+        self.assertEqual(most, TrafficRecord(timestamp="2021-12-01T22:30:00", car_count=31, duration_mins=90))
+
+    def test_traffic_analyzer_with_glob(self):
+        """Test TrafficAnalyzer analyzes every file matching a glob pattern."""
+        analyzer = TrafficAnalyzer(os.path.join(self.temp_dir.name, "counter-*.txt"), workers=2)
+        single_file_analyzer = TrafficAnalyzer(self.all_data_path)
+
+        self.assertTrue(analyzer.streaming)
+        self.assertEqual(analyzer.calculate_traffic(), single_file_analyzer.calculate_traffic())
+        self.assertEqual(analyzer.get_daily_traffic(), single_file_analyzer.get_daily_traffic())
+        self.assertEqual(analyzer.get_top_n_half_hours(), single_file_analyzer.get_top_n_half_hours())
+        self.assertEqual(analyzer.least_cars_in_ninety_mins(), single_file_analyzer.least_cars_in_ninety_mins())
+        self.assertEqual(analyzer.get_bottom_n_half_hours(), single_file_analyzer.get_bottom_n_half_hours())
+
+    def test_traffic_analyzer_with_no_matching_files(self):
+        """Test TrafficAnalyzer raises when a glob pattern matches nothing."""
+        with self.assertRaises(FileNotFoundError):
+            TrafficAnalyzer(os.path.join(self.temp_dir.name, "*.csv"))
+
+    def test_traffic_analyzer_columnar_with_directory(self):
+        """Test the columnar backend rejects multiple files."""
+        with self.assertRaises(ValueError):
+            TrafficAnalyzer(self.temp_dir.name, columnar=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import os
+
+from profiling import AnalyzerStats, PhaseStats, peak_rss_bytes
+from traffic_analyzer import TrafficAnalyzer
+
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for the timing instrumentation of TrafficAnalyzer."""
+
+    def setUp(self):
+        """Set up a data file."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
+            temp_file.write("2021-12-01T05:00:00 5\n2021-12-01T05:30:00 12\n2021-12-01T06:00:00 14\n"
+                            "2021-12-01T06:30:00 15\n2021-12-05T09:30:00 18\n")
+        self.data_file_path = temp_file.name
+        self.addCleanup(os.unlink, self.data_file_path)
+
+    def test_phase(self):
+        """Test a phase records its wall time, records and the peak RSS."""
+        stats = AnalyzerStats()
+
+        with patch('profiling.time.perf_counter', side_effect=[10.0, 12.5]):
+            with stats.phase("load", lambda: 1000):
+                pass
+
+        self.assertEqual(len(stats.phases), 1)
+        self.assertEqual(stats.phases[0].name, "load")
+        self.assertEqual(stats.phases[0].seconds, 2.5)
+        self.assertEqual(stats.phases[0].records_per_second, 400)
+        self.assertEqual(stats.phases[0].peak_rss_bytes, peak_rss_bytes())
+
+    def test_records_per_second_without_records(self):
+        """Test the throughput of a phase without known number of records."""
+        self.assertIsNone(PhaseStats("calculate_traffic", 1.0).records_per_second)
+
+    def test_stats_representation(self):
+        """Test the stats print as a table and export as a dict."""
+        stats = AnalyzerStats([PhaseStats("load", 2.0, 1000, 2**21), PhaseStats("calculate_traffic", 0.5)])
+
+        self.assertEqual(repr(stats).splitlines()[2:], [
+            "load                             2.0000     500           2.0",
+            "calculate_traffic                0.5000     -             -"
+        ])
+        self.assertEqual(stats.to_dict()["phases"][0], {
+            "name": "load", "seconds": 2.0, "records": 1000, "records_per_second": 500.0, "peak_rss_bytes": 2**21
+        })
+
+    def test_traffic_analyzer_stats(self):
+        """Test a profiled TrafficAnalyzer times loading and each query not answered from the cache."""
+        analyzer = TrafficAnalyzer(self.data_file_path, profile=True)
+        analyzer.calculate_traffic()
+        analyzer.calculate_traffic()
+        analyzer.least_cars_in_ninety_mins()
+
+        self.assertEqual([phase.name for phase in analyzer.stats.phases],
+                         ["load", "calculate_traffic", "get_window_extremes", "least_cars_in_ninety_mins"])
+        self.assertEqual([phase.records for phase in analyzer.stats.phases], [5, 5, 5, 5])
+
+    def test_traffic_analyzer_stats_when_streaming(self):
+        """Test a streaming analysis has nothing to load and no number of records."""
+        analyzer = TrafficAnalyzer(self.data_file_path, streaming=True, profile=True)
+        analyzer.get_daily_traffic()
+
+        self.assertEqual([(phase.name, phase.records) for phase in analyzer.stats.phases],
+                         [("get_daily_traffic", None)])
+
+    def test_traffic_analyzer_without_profile(self):
+        """Test nothing is measured unless profiling."""
+        analyzer = TrafficAnalyzer(self.data_file_path)
+        analyzer.calculate_traffic()
+
+        self.assertEqual(analyzer.stats.phases, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import tempfile
+import os
+
+from range_index import PrefixSumIndex
+from sliding_window import find_window_extremes
+from traffic_analyzer import TrafficAnalyzer
+from model import TrafficRecord, TrafficRecords
+from timestamps import day_of_date, parse_slot
+
+
+class TestPrefixSumIndex(unittest.TestCase):
+    """Test cases for the prefix sum index of range totals."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.records = [
+            TrafficRecord("2021-12-01T05:00:00", 5),
+            TrafficRecord("2021-12-01T05:30:00", 12),
+            TrafficRecord("2021-12-01T06:00:00", 14),
+            TrafficRecord("2021-12-01T06:30:00", 15),
+            TrafficRecord("2021-12-01T07:00:00", 25),
+            TrafficRecord("2021-12-01T23:30:00", 46),
+            TrafficRecord("2021-12-02T00:00:00", 42),
+            TrafficRecord("2021-12-05T09:30:00", 18),
+            TrafficRecord("2021-12-05T10:30:00", 15),
+            TrafficRecord("2021-12-08T18:00:00", 33)
+        ]
+        self.index = PrefixSumIndex(self.records)
+
+    def _brute_force_total(self, records, start_slot, end_slot):
+        return sum(record.car_count for record in records if start_slot <= record.slot < end_slot)
+
+    def test_range_total(self):
+        """Test range totals include the start and exclude the end half hour."""
+        test_cases = [
+            ("2021-12-01T05:00:00", "2021-12-01T06:00:00", 17),
+            ("2021-12-01T05:30:00", "2021-12-02T00:30:00", 154),
+            ("2021-11-01T00:00:00", "2022-01-01T00:00:00", 225),
+            ("2021-12-03T00:00:00", "2021-12-05T00:00:00", 0),
+            ("2021-12-05T10:30:00", "2021-12-05T10:30:00", 0),
+            ("2021-12-08T18:00:00", "2021-12-01T05:00:00", 0)
+        ]
+
+        for start, end, expected in test_cases:
+            with self.subTest(start=start, end=end):
+                self.assertEqual(self.index.range_total(parse_slot(start), parse_slot(end)), expected)
+
+    def test_range_total_matches_brute_force(self):
+        """Test every range over the records against summing them."""
+        first, last = self.records[0].slot - 2, self.records[-1].slot + 2
+        for start_slot in range(first, last, 7):
+            for end_slot in range(start_slot, last, 5):
+                self.assertEqual(self.index.range_total(start_slot, end_slot),
+                                 self._brute_force_total(self.records, start_slot, end_slot))
+
+    def test_unsorted_records(self):
+        """Test range totals of records which are not in time order."""
+        records = self.records[5:] + self.records[0:5]
+        index = PrefixSumIndex(records)
+
+        for start_slot, end_slot in ((self.records[0].slot, self.records[6].slot), (0, 2 ** 40)):
+            self.assertEqual(index.range_total(start_slot, end_slot),
+                             self._brute_force_total(records, start_slot, end_slot))
+
+    def test_day_and_window_totals(self):
+        """Test per day and window totals."""
+        self.assertEqual(self.index.day_total(day_of_date("2021-12-01")), 117)
+        self.assertEqual(self.index.day_total(day_of_date("2021-12-02")), 42)
+        self.assertEqual(self.index.day_total(day_of_date("2021-12-03")), 0)
+        self.assertEqual(self.index.window_total(parse_slot("2021-12-01T05:30:00")), 41)
+        self.assertEqual(self.index.window_total(parse_slot("2021-12-01T23:30:00"), 60), 88)
+        self.assertEqual(self.index.window_total(parse_slot("2021-12-05T09:30:00"), 90), 33)
+
+    def test_window_extremes_match_sliding_window(self):
+        """Test windows of any length match the sliding window, also without contiguous window."""
+        for window_mins in (30, 60, 90, 150, 300):
+            with self.subTest(window_mins=window_mins):
+                self.assertEqual(self.index.window_extremes(window_mins),
+                                 find_window_extremes(self.records, window_mins))
+
+    def test_traffic_records_arrays_are_shared(self):
+        """Test the index reuses the arrays of TrafficRecords instead of copying them."""
+        traffic_records = TrafficRecords.from_records(self.records)
+        index = PrefixSumIndex(traffic_records)
+
+        self.assertIs(index.slots, traffic_records.slots)
+        self.assertEqual(index.range_total(0, 2 ** 40), 225)
+
+    def test_empty_index(self):
+        """Test an index without records."""
+        index = PrefixSumIndex([])
+
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.range_total(0, 2 ** 40), 0)
+        self.assertEqual(index.window_extremes(90), (TrafficRecord("N/A", 0, 90), TrafficRecord("N/A", 0, 90)))
+
+    def test_traffic_analyzer_range_queries(self):
+        """Test the range queries of TrafficAnalyzer in every mode."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
+            temp_file.write("".join(f"{record.timestamp} {record.car_count}\n" for record in self.records))
+        self.addCleanup(os.unlink, temp_file.name)
+
+        for options in ({}, {"streaming": True}):
+            with self.subTest(options=options):
+                analyzer = TrafficAnalyzer(temp_file.name, **options)
+
+                self.assertEqual(analyzer.get_traffic_between("2021-12-01T05:30:00", "2021-12-02T00:30:00"), 154)
+                self.assertEqual(analyzer.get_day_traffic("2021-12-01"), 117)
+                self.assertEqual(analyzer.get_window_traffic("2021-12-01T05:30:00"), 41)
+                self.assertEqual(analyzer.get_window_traffic("2021-12-01T23:30:00", window_mins=60), 88)
+                self.assertIs(analyzer.get_range_index(), analyzer.get_range_index())
+                with self.assertRaises(ValueError):
+                    analyzer.get_traffic_between("2021-12-01", "2021-12-02")
+
+    def test_segments(self):
+        """Test records are split into segments of contiguous half hours at every gap."""
+        self.assertEqual(list(self.index.segment_starts), [0, 5, 7, 8, 9, 10])
+        self.assertEqual(self.index.segments(), [
+            TrafficRecord("2021-12-01T05:00:00", 71, 150),
+            TrafficRecord("2021-12-01T23:30:00", 88, 60),
+            TrafficRecord("2021-12-05T09:30:00", 18, 30),
+            TrafficRecord("2021-12-05T10:30:00", 15, 30),
+            TrafficRecord("2021-12-08T18:00:00", 33, 30)
+        ])
+        self.assertEqual(PrefixSumIndex([]).segments(), [])
+
+    def test_contiguous_records(self):
+        """Test the number of contiguous records from an index to the end of its segment."""
+        self.assertEqual([self.index.contiguous_records(i) for i in range(-1, 11)],
+                         [0, 5, 4, 3, 2, 1, 2, 1, 1, 1, 1, 0])
+
+    def test_traffic_analyzer_segments(self):
+        """Test TrafficAnalyzer exposes the segments and checks contiguity with them."""
+        analyzer = TrafficAnalyzer("unused.txt", streaming=True)
+        analyzer.streaming = False
+        analyzer.traffic_data = self.records
+
+        self.assertEqual(analyzer.segments(), self.index.segments())
+        self.assertEqual([analyzer._has_contiguous_records(i) for i in range(10)],
+                         [True, True, True, False, False, False, False, False, False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import tempfile
+import os
+
+from readers import read_records, read_records_mmap, read_slots_mmap
+from traffic_analyzer import TrafficAnalyzer
+from model import TrafficRecord
+from timestamps import parse_slot
+
+
+class TestReaders(unittest.TestCase):
+    """Test cases for the text and memory mapped readers."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.sample_file_content = """2021-12-01T05:00:00 5
+2021-12-01T05:30:00 12
+2021-12-01T06:00:00 14
+2021-12-05T09:30:00 1234
+"""
+        self.expected_records = [
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=5),
+            TrafficRecord(timestamp="2021-12-01T05:30:00", car_count=12),
+            TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=14),
+            TrafficRecord(timestamp="2021-12-05T09:30:00", car_count=1234)
+        ]
+
+    def _write_temp_file(self, content, mode='w'):
+        with tempfile.NamedTemporaryFile(mode=mode, delete=False, suffix='.txt') as temp_file:
+            temp_file.write(content)
+        self.addCleanup(os.unlink, temp_file.name)
+        return temp_file.name
+
+    def test_read_records(self):
+        """Test the text reader yields TrafficRecord per line."""
+        file_path = self._write_temp_file(self.sample_file_content)
+
+        self.assertEqual(list(read_records(file_path)), self.expected_records)
+
+    def test_read_slots_mmap(self):
+        """Test the memory mapped reader decodes slots and counts from bytes."""
+        file_path = self._write_temp_file(self.sample_file_content)
+
+        self.assertEqual(
+            list(read_slots_mmap(file_path)),
+            [(parse_slot(record.timestamp), record.car_count) for record in self.expected_records]
+        )
+
+    def test_read_records_mmap_matches_text_reader(self):
+        """Test both readers give the same records."""
+        file_path = self._write_temp_file(self.sample_file_content)
+
+        self.assertEqual(list(read_records_mmap(file_path)), list(read_records(file_path)))
+
+    def test_read_records_mmap_without_trailing_newline_and_crlf(self):
+        """Test the last line without newline and Windows line endings are read."""
+        file_path = self._write_temp_file(self.sample_file_content.strip().replace("\n", "\r\n").encode(), mode='wb')
+
+        self.assertEqual(list(read_records_mmap(file_path)), self.expected_records)
+
+    def test_read_records_mmap_empty_file(self):
+        """Test an empty file yields no record."""
+        file_path = self._write_temp_file("")
+
+        self.assertEqual(list(read_records_mmap(file_path)), [])
+
+    def test_read_records_mmap_invalid_data_format(self):
+        """Test malformed lines raise ValueError."""
+        for content in ("2021-12-01T05:00:00 abc\n", "invalid_timestamp abc\n", "2021-12-01 05:00:00 5\n"):
+            with self.subTest(content=content):
+                file_path = self._write_temp_file(content)
+                with self.assertRaises(ValueError):
+                    list(read_records_mmap(file_path))
+
+    def test_traffic_analyzer_memory_map(self):
+        """Test TrafficAnalyzer gives the same results with memory mapped files."""
+        file_path = self._write_temp_file(self.sample_file_content)
+
+        for options in ({}, {"streaming": True}):
+            with self.subTest(options=options):
+                analyzer = TrafficAnalyzer(file_path, **options)
+                mapped_analyzer = TrafficAnalyzer(file_path, memory_map=True, **options)
+
+                self.assertEqual(mapped_analyzer.traffic_data, analyzer.traffic_data)
+                self.assertEqual(mapped_analyzer.calculate_traffic(), analyzer.calculate_traffic())
+                self.assertEqual(mapped_analyzer.get_daily_traffic(), analyzer.get_daily_traffic())
+                self.assertEqual(mapped_analyzer.get_top_n_half_hours(), analyzer.get_top_n_half_hours())
+                self.assertEqual(mapped_analyzer.least_cars_in_ninety_mins(), analyzer.least_cars_in_ninety_mins())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import os
+
+from columnar import np
+from rollups import Rollup, Rollups
+from traffic_analyzer import TrafficAnalyzer
+from model import TrafficAnalysisResult, TrafficRecord, TrafficRecords
+
+
+class TestRollups(unittest.TestCase):
+    """Test cases for the hourly, daily, weekly and monthly rollups."""
+
+    def setUp(self):
+        """Set up test data over two weeks and two months."""
+        self.records = [
+            TrafficRecord("2021-11-30T23:00:00", 7),
+            TrafficRecord("2021-11-30T23:30:00", 3),
+            TrafficRecord("2021-12-01T05:00:00", 5),
+            TrafficRecord("2021-12-01T05:30:00", 12),
+            TrafficRecord("2021-12-01T06:00:00", 14),
+            TrafficRecord("2021-12-05T09:30:00", 18),
+            TrafficRecord("2021-12-06T00:00:00", 0),
+            TrafficRecord("2021-12-08T18:00:00", 33)
+        ]
+        self.rollups = Rollups.from_records(self.records)
+
+    def test_rollup_grows_in_both_directions(self):
+        """Test periods before and after the range of the arrays are added."""
+        rollup = Rollup()
+        rollup.add(10, 5)
+        rollup.add(13, 2)
+        rollup.add(8, 1, record_count=2)
+        rollup.add(10, 1)
+
+        self.assertEqual(rollup.start, 8)
+        self.assertEqual(list(rollup.car_counts), [1, 0, 6, 0, 0, 2])
+        self.assertEqual(list(rollup.periods()), [(8, 1, 2), (10, 6, 2), (13, 2, 1)])
+
+    def test_hourly_traffic(self):
+        """Test half hours are summed per hour, hours without records are left out."""
+        self.assertEqual(self.rollups.hourly_traffic(), {
+            "2021-11-30T23:00:00": 10,
+            "2021-12-01T05:00:00": 17,
+            "2021-12-01T06:00:00": 14,
+            "2021-12-05T09:00:00": 18,
+            "2021-12-06T00:00:00": 0,
+            "2021-12-08T18:00:00": 33
+        })
+
+    def test_daily_traffic(self):
+        """Test daily totals built from the hourly rollup keep days with records only."""
+        self.assertEqual(self.rollups.daily_traffic(), {
+            "2021-11-30": 10, "2021-12-01": 31, "2021-12-05": 18, "2021-12-06": 0, "2021-12-08": 33
+        })
+
+    def test_weekly_monthly_and_day_of_week_traffic(self):
+        """Test weeks start on Monday, months are calendar months and weekdays sum over all weeks."""
+        self.assertEqual(self.rollups.weekly_traffic(), {"2021-11-29": 59, "2021-12-06": 33})
+        self.assertEqual(self.rollups.monthly_traffic(), {"2021-11": 10, "2021-12": 82})
+        self.assertEqual(self.rollups.day_of_week_traffic(), {
+            "Monday": 0, "Tuesday": 10, "Wednesday": 64, "Thursday": 0, "Friday": 0, "Saturday": 0, "Sunday": 18
+        })
+
+    def test_unsorted_records(self):
+        """Test records out of time order give the same rollups."""
+        self.assertEqual(Rollups.from_records(self.records[::-1]), self.rollups)
+
+    def test_empty_rollups(self):
+        """Test rollups without records."""
+        rollups = Rollups.from_records([])
+
+        self.assertEqual(rollups.hourly_traffic(), {})
+        self.assertEqual(rollups.monthly_traffic(), {})
+        self.assertEqual(sum(rollups.day_of_week_traffic().values()), 0)
+
+    def test_result_rollup_sections(self):
+        """Test rollup sections are only reported when set."""
+        result = TrafficAnalysisResult(92, {}, [], TrafficRecord("N/A", 0, 90))
+        self.assertNotIn("Monthly traffic", str(result))
+
+        result.monthly_traffic = self.rollups.monthly_traffic()
+        self.assertTrue(str(result).endswith(
+            "Monthly traffic...\nMonth               Number of cars seen\n"
+            "---------------------------------------\n2021-11             10\n2021-12             82"
+        ))
+
+    def test_traffic_analyzer_rollups(self):
+        """Test TrafficAnalyzer builds the rollups once, the same way in every mode."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
+            temp_file.write("".join(f"{record.timestamp} {record.car_count}\n" for record in self.records))
+        self.addCleanup(os.unlink, temp_file.name)
+
+        modes = [{}, {"streaming": True}] + ([{"columnar": True}] if np is not None else [])
+        for options in modes:
+            with self.subTest(options=options):
+                analyzer = TrafficAnalyzer(temp_file.name, **options)
+
+                self.assertEqual(analyzer.get_rollups(), self.rollups)
+                self.assertIs(analyzer.get_rollups(), analyzer.get_rollups())
+                self.assertEqual(analyzer.get_hourly_traffic(), self.rollups.hourly_traffic())
+                self.assertEqual(analyzer.get_weekly_traffic(), self.rollups.weekly_traffic())
+                self.assertEqual(analyzer.get_monthly_traffic(), self.rollups.monthly_traffic())
+                self.assertEqual(analyzer.get_day_of_week_traffic(), self.rollups.day_of_week_traffic())
+                self.assertEqual(self.rollups.daily_traffic(), analyzer.get_daily_traffic())
+
+    def test_daily_traffic_is_read_from_rollups(self):
+        """Test daily traffic is summed by day alone, or read from the rollups once they are built."""
+        for queries in (("get_daily_traffic",), ("get_monthly_traffic", "get_daily_traffic")):
+            with self.subTest(queries=queries):
+                analyzer = TrafficAnalyzer("unused.txt")
+                analyzer.traffic_data = TrafficRecords.from_records(self.records)
+
+                with patch.object(Rollup, "from_slots", wraps=Rollup.from_slots) as mock_from_slots:
+                    for query in queries:
+                        getattr(analyzer, query)()
+                    self.assertEqual(analyzer.get_daily_traffic(), self.rollups.daily_traffic())
+
+                mock_from_slots.assert_called_once()
+                self.assertEqual(("get_rollups",) in analyzer._query_cache, len(queries) > 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from sliding_window import SlidingWindow, find_window_extremes, window_size
+from model import TrafficRecord
+
+
+class TestSlidingWindow(unittest.TestCase):
+    """Test cases for SlidingWindow class and find_window_extremes."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.records = [
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=5),
+            TrafficRecord(timestamp="2021-12-01T05:30:00", car_count=12),
+            TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=14),
+            TrafficRecord(timestamp="2021-12-01T06:30:00", car_count=15),
+            TrafficRecord(timestamp="2021-12-01T07:00:00", car_count=25),
+            TrafficRecord(timestamp="2021-12-01T07:30:00", car_count=46),
+            TrafficRecord(timestamp="2021-12-01T08:00:00", car_count=42),
+            TrafficRecord(timestamp="2021-12-05T09:30:00", car_count=18),
+            TrafficRecord(timestamp="2021-12-05T10:00:00", car_count=1),
+            TrafficRecord(timestamp="2021-12-05T10:30:00", car_count=1)
+        ]
+
+    def test_window_size(self):
+        """Test window lengths are converted into number of half hours."""
+        self.assertEqual(window_size(30), 1)
+        self.assertEqual(window_size(90), 3)
+        self.assertEqual(window_size(24 * 60), 48)
+
+    def test_window_size_invalid(self):
+        """Test window lengths that are not positive multiples of 30 minutes."""
+        for window_mins in (0, -30, 45):
+            with self.subTest(window_mins=window_mins):
+                with self.assertRaises(ValueError):
+                    window_size(window_mins)
+
+    def test_ninety_mins_extremes(self):
+        """Test least and most 90 minutes windows are found in one pass."""
+        least, most = find_window_extremes(self.records, window_mins=90)
+
+        self.assertEqual(least, TrafficRecord(timestamp="2021-12-05T09:30:00", car_count=20, duration_mins=90))
+        self.assertEqual(most, TrafficRecord(timestamp="2021-12-01T07:00:00", car_count=113, duration_mins=90))
+
+    def test_three_hours_extremes(self):
+        """Test a longer window only counts fully contiguous spans."""
+        least, most = find_window_extremes(self.records, window_mins=180)
+
+        self.assertEqual(least, TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=117, duration_mins=180))
+        self.assertEqual(most, TrafficRecord(timestamp="2021-12-01T05:30:00", car_count=154, duration_mins=180))
+
+    def test_no_contiguous_window(self):
+        """Test N/A records are returned when no window is contiguous."""
+        least, most = find_window_extremes(self.records, window_mins=24 * 60)
+
+        expected = TrafficRecord(timestamp="N/A", car_count=0, duration_mins=24 * 60)
+        self.assertEqual(least, expected)
+        self.assertEqual(most, expected)
+
+    def test_ties_keep_first_window(self):
+        """Test the first window wins ties like min() and max()."""
+        least, most = find_window_extremes([
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=3),
+            TrafficRecord(timestamp="2021-12-01T05:30:00", car_count=3),
+            TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=3)
+        ], window_mins=30)
+
+        self.assertEqual(least.timestamp, "2021-12-01T05:00:00")
+        self.assertEqual(most.timestamp, "2021-12-01T05:00:00")
+
+    def test_gap_restarts_running_sum(self):
+        """Test records before a gap are not counted in the next window."""
+        sliding_window = SlidingWindow(window_mins=60)
+        for record in [
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=100),
+            TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=1),
+            TrafficRecord(timestamp="2021-12-01T06:30:00", car_count=2)
+        ]:
+            sliding_window.add(record.slot, record)
+
+        self.assertEqual(sliding_window.least, TrafficRecord("2021-12-01T06:00:00", 3, 60))
+        self.assertEqual(sliding_window.most, TrafficRecord("2021-12-01T06:00:00", 3, 60))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import os
+
+from timestamps import parse_range_end, parse_range_start
+from traffic_analyzer import TrafficAnalyzer
+
+
+class TestSQLiteStore(unittest.TestCase):
+    """Test cases for the SQLite backend of TrafficAnalyzer."""
+
+    def setUp(self):
+        """Set up a data file with gaps and records out of time order, and a database path."""
+        self.sample_file_content = """2021-12-01T05:00:00 5
+2021-12-01T05:30:00 12
+2021-12-01T06:00:00 14
+2021-12-01T06:30:00 15
+2021-12-01T07:00:00 25
+2021-12-01T07:30:00 46
+2021-12-01T08:00:00 42
+2021-12-01T15:00:00 9
+2021-12-01T15:30:00 11
+2021-12-01T23:30:00 0
+2021-12-05T09:30:00 18
+2021-12-05T10:30:00 15
+2021-12-05T11:30:00 7
+2021-12-05T12:30:00 6
+2021-12-05T13:30:00 9
+2021-12-05T14:30:00 11
+2021-12-05T15:30:00 15
+2021-12-08T18:00:00 33
+2021-12-08T19:00:00 28
+2021-12-08T20:00:00 25
+2021-12-08T21:00:00 21
+2021-12-08T22:00:00 16
+2021-12-08T23:00:00 11
+2021-12-09T00:00:00 4
+2021-12-08T23:30:00 1
+2021-12-09T00:30:00 3
+"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.data_file_path = os.path.join(self.temp_dir.name, "data.txt")
+        self.database_path = os.path.join(self.temp_dir.name, "traffic.db")
+        with open(self.data_file_path, "w") as data_file:
+            data_file.write(self.sample_file_content)
+
+    def analyzer(self, **options):
+        """Create a database backed TrafficAnalyzer, closing its database after the test."""
+        analyzer = TrafficAnalyzer(self.data_file_path, database=self.database_path, **options)
+        self.addCleanup(lambda: "store" in analyzer.__dict__ and analyzer.store.close())
+        return analyzer
+
+    def test_same_results_as_in_memory(self):
+        """Test every query gives the same result as the in memory analysis, ties included."""
+        expected = TrafficAnalyzer(self.data_file_path)
+        analyzer = self.analyzer()
+
+        self.assertEqual(analyzer.calculate_traffic(), expected.calculate_traffic())
+        self.assertEqual(analyzer.get_daily_traffic(), expected.get_daily_traffic())
+        self.assertEqual(analyzer.get_top_n_half_hours(n=5), expected.get_top_n_half_hours(n=5))
+        self.assertEqual(analyzer.get_bottom_n_half_hours(n=5), expected.get_bottom_n_half_hours(n=5))
+        self.assertEqual(analyzer.least_cars_in_ninety_mins(), expected.least_cars_in_ninety_mins())
+        for window_mins in (30, 60, 150, 300):
+            with self.subTest(window_mins=window_mins):
+                self.assertEqual(analyzer.get_window_extremes(window_mins), expected.get_window_extremes(window_mins))
+
+    def test_time_range(self):
+        """Test a time range only analyzes the records in it, the end date included."""
+        analyzer = self.analyzer(start="2021-12-05", end="2021-12-08T22:00:00")
+
+        self.assertEqual(analyzer.calculate_traffic(), 81 + 33 + 28 + 25 + 21)
+        self.assertEqual(analyzer.get_daily_traffic(), {"2021-12-05": 81, "2021-12-08": 107})
+        self.assertEqual(analyzer.least_cars_in_ninety_mins().timestamp, "N/A")
+
+    def test_parse_range(self):
+        """Test a date starts a range at midnight and ends it at the next midnight."""
+        self.assertEqual(parse_range_end("2021-12-05") - parse_range_start("2021-12-05"), 48)
+        self.assertEqual(parse_range_start("2021-12-05T09:30:00"), parse_range_start("2021-12-05") + 19)
+        self.assertEqual(parse_range_end("2021-12-05T09:30:00"), parse_range_start("2021-12-05T09:30:00"))
+
+    def test_database_is_reused_until_the_file_changes(self):
+        """Test the file is only loaded into the database again once it changes."""
+        self.analyzer().calculate_traffic()
+
+        with patch('sqlite_store.load_file') as mock_load_file:
+            self.assertEqual(self.analyzer().calculate_traffic(), 402)
+            mock_load_file.assert_not_called()
+
+        with open(self.data_file_path, "a") as data_file:
+            data_file.write("2021-12-10T00:00:00 70\n")
+        self.assertEqual(self.analyzer().calculate_traffic(), 472)
+
+    def test_database_without_data_file(self):
+        """Test a loaded database is used once the data file is gone, and a missing one raises."""
+        self.analyzer().calculate_traffic()
+        os.unlink(self.data_file_path)
+
+        self.assertEqual(self.analyzer().calculate_traffic(), 402)
+        with self.assertRaises(FileNotFoundError):
+            TrafficAnalyzer(self.data_file_path, database=os.path.join(self.temp_dir.name, "other.db")).load()
+
+    def test_invalid_options(self):
+        """Test database mode does not combine with other backends."""
+        with self.assertRaises(ValueError):
+            TrafficAnalyzer(self.data_file_path, database=self.database_path, streaming=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import tempfile
+import os
+
+from columnar import ColumnarTrafficData, np
+from model import TrafficRecord, TrafficRecords
+from readers import find_file_byte_ranges, read_slots_mmap
+from time_filter import TimeFilter, parse_hours
+from traffic_analyzer import TrafficAnalyzer
+
+
+class TestTimeFilter(unittest.TestCase):
+    """Test cases for date range and time of day filters."""
+
+    def setUp(self):
+        """Set up a data file in time order."""
+        self.sample_file_content = """2021-12-01T05:00:00 5
+2021-12-01T05:30:00 12
+2021-12-01T06:00:00 14
+2021-12-01T23:30:00 9
+2021-12-02T00:00:00 4
+2021-12-05T07:00:00 18
+2021-12-05T07:30:00 15
+2021-12-05T10:00:00 7
+2021-12-08T07:30:00 33
+2021-12-08T18:00:00 28
+"""
+        self.records = TrafficRecords.from_records(
+            TrafficRecord(line.split()[0], int(line.split()[1])) for line in self.sample_file_content.splitlines())
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.data_file_path = self.write("data.txt", self.sample_file_content)
+
+    def write(self, name, content):
+        """Write a file in the temporary directory and return its path."""
+        file_path = os.path.join(self.temp_dir.name, name)
+        with open(file_path, "w") as data_file:
+            data_file.write(content)
+        return file_path
+
+    def expected_slots(self, time_filter):
+        """Get the slots of the sample records selected by checking every record."""
+        return [slot for slot in self.records.slots if time_filter.contains(slot)]
+
+    def test_parse_hours(self):
+        """Test a time of day range is decoded into its first slot of the day and number of half hours."""
+        self.assertEqual(parse_hours("07:00-10:00"), (14, 6))
+        self.assertEqual(parse_hours("22:00-02:00"), (44, 8))
+        self.assertEqual(parse_hours("00:00-24:00"), (0, 48))
+        for hours in ("07:00", "7:00-10:00", "07:15-10:00", "07:00-25:00", "10:00-10:00"):
+            with self.subTest(hours=hours), self.assertRaises(ValueError):
+                parse_hours(hours)
+
+    def test_contains(self):
+        """Test the end date is included and the time of day range runs past midnight."""
+        time_filter = TimeFilter.parse("2021-12-01", "2021-12-05", "23:00-01:00")
+
+        self.assertEqual(self.expected_slots(time_filter), [self.records.slots[3], self.records.slots[4]])
+        self.assertFalse(TimeFilter())
+        self.assertTrue(TimeFilter.parse(hours="07:00-10:00"))
+
+    def test_slot_ranges(self):
+        """Test a time of day range gives one range of slots per day, clipped to the time range."""
+        first_slot = TrafficRecord("2021-12-01T00:00:00", 0).slot
+
+        self.assertEqual(TimeFilter.parse(hours="07:00-10:00").slot_ranges(first_slot + 16, first_slot + 2 * 48 + 15),
+                         [(first_slot + 16, first_slot + 20), (first_slot + 62, first_slot + 68),
+                          (first_slot + 110, first_slot + 112)])
+        self.assertEqual(TimeFilter.parse("2021-12-03").slot_ranges(first_slot, first_slot + 10), [])
+
+    def test_select_records(self):
+        """Test records are selected the same whether they are in time order or not."""
+        time_filter = TimeFilter.parse("2021-12-02", hours="07:00-10:00")
+        unsorted_records = TrafficRecords.from_slots(
+            zip(reversed(self.records.slots), reversed(self.records.car_counts)), 30)
+
+        self.assertEqual(list(time_filter.select_records(self.records).slots), self.expected_slots(time_filter))
+        self.assertEqual(sorted(time_filter.select_records(unsorted_records).slots), self.expected_slots(time_filter))
+
+    def test_read_slots_mmap(self):
+        """Test only the byte ranges of the selected half hours are read from a file in time order."""
+        for time_filter in (TimeFilter.parse("2021-12-02", "2021-12-05"), TimeFilter.parse(hours="07:00-10:00"),
+                            TimeFilter.parse(end="2021-12-01T06:00:00", hours="22:00-06:00"),
+                            TimeFilter.parse("2022-01-01")):
+            with self.subTest(time_filter=time_filter):
+                self.assertEqual([slot for slot, _ in read_slots_mmap(self.data_file_path, time_filter)],
+                                 self.expected_slots(time_filter))
+
+        self.assertEqual(find_file_byte_ranges(self.data_file_path, TimeFilter.parse("2021-12-05", "2021-12-05")),
+                         [(self.sample_file_content.index("2021-12-05"), self.sample_file_content.index("2021-12-08"))])
+
+    def test_unsorted_file(self):
+        """Test a file not in time order is rejected rather than giving a wrong answer."""
+        lines = self.sample_file_content.splitlines(keepends=True)
+        data_file_path = self.write("unsorted.txt", "".join(lines[5:] + lines[:5]))
+
+        with self.assertRaises(ValueError):
+            list(read_slots_mmap(data_file_path, TimeFilter.parse(end="2021-12-06")))
+        if np is not None:
+            with self.assertRaises(ValueError):
+                ColumnarTrafficData.from_mmap(data_file_path, TimeFilter.parse(end="2021-12-06"))
+
+    def test_traffic_analyzer_modes(self):
+        """Test every mode gives the same results for a time filter."""
+        options = {"start": "2021-12-01T06:00:00", "end": "2021-12-08", "hours": "05:00-08:00"}
+        time_filter = TimeFilter.parse(**options)
+        expected = TrafficRecords.from_slots(
+            ((slot, car_count) for slot, car_count in zip(self.records.slots, self.records.car_counts)
+             if time_filter.contains(slot)), 30)
+        modes = [{}, {"memory_map": True}, {"streaming": True}, {"streaming": True, "memory_map": True},
+                 {"counters": True}, {"database": os.path.join(self.temp_dir.name, "traffic.db")}]
+        modes += [{"columnar": True}, {"columnar": True, "memory_map": True}] if np is not None else []
+        for mode in modes:
+            with self.subTest(mode=mode):
+                analyzer = TrafficAnalyzer(self.data_file_path, **mode, **options)
+
+                self.assertEqual(analyzer.calculate_traffic(), sum(expected.car_counts))
+                self.assertEqual(analyzer.get_daily_traffic(), {"2021-12-01": 14, "2021-12-05": 33, "2021-12-08": 33})
+                if "database" in mode:
+                    analyzer.store.close()
+
+    def test_incremental_mode_rejects_time_filter(self):
+        """Test incremental mode, which keeps totals of the whole file, rejects a time filter."""
+        with self.assertRaises(ValueError):
+            TrafficAnalyzer(self.data_file_path, state_file=os.path.join(self.temp_dir.name, "state"), hours="07:00-10:00")
+
+
+if __name__ == '__main__':
+    unittest.main()
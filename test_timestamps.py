@@ -0,0 +1,57 @@
+import unittest
+from datetime import datetime
+
+from timestamps import SLOTS_PER_DAY, parse_slot, parse_slot_at, slot_to_date, slot_to_timestamp
+
+
+class TestTimestamps(unittest.TestCase):
+    """Test cases for the fixed width timestamp decoder."""
+
+    def test_parse_slot_matches_datetime(self):
+        """Test slots count half hours since 1970-01-01T00:00:00."""
+        test_cases = [
+            "1970-01-01T00:00:00",
+            "2021-12-01T05:00:00",
+            "2021-12-01T05:30:00",
+            "2020-02-29T23:30:00",
+            "2016-11-23T12:00:00"
+        ]
+
+        for timestamp in test_cases:
+            with self.subTest(timestamp=timestamp):
+                expected = int(datetime.fromisoformat(timestamp).timestamp() - datetime(1970, 1, 1).timestamp()) // 1800
+                self.assertEqual(parse_slot(timestamp), expected)
+
+    def test_parse_slot_contiguous_half_hours(self):
+        """Test consecutive half hours, across a day boundary, are consecutive slots."""
+        self.assertEqual(parse_slot("2021-12-01T05:30:00") - parse_slot("2021-12-01T05:00:00"), 1)
+        self.assertEqual(parse_slot("2021-12-02T00:00:00") - parse_slot("2021-12-01T23:30:00"), 1)
+        self.assertEqual(parse_slot("2021-12-02T05:00:00") - parse_slot("2021-12-01T05:00:00"), SLOTS_PER_DAY)
+
+    def test_parse_slot_invalid(self):
+        """Test malformed timestamps raise ValueError."""
+        for timestamp in ("invalid_timestamp", "2021-12-01", "2021-12-01 05:00:00", "2021-13-01T05:00:00"):
+            with self.subTest(timestamp=timestamp):
+                with self.assertRaises(ValueError):
+                    parse_slot(timestamp)
+
+    def test_slot_round_trip(self):
+        """Test slots convert back to the same timestamp and date."""
+        for timestamp in ("2021-12-01T05:00:00", "2021-12-01T23:30:00", "2000-01-01T00:00:00"):
+            with self.subTest(timestamp=timestamp):
+                slot = parse_slot(timestamp)
+                self.assertEqual(slot_to_timestamp(slot), timestamp)
+                self.assertEqual(slot_to_date(slot), timestamp[0:10])
+
+    def test_parse_slot_at_reads_bytes(self):
+        """Test slots are decoded from a bytes buffer at an offset."""
+        buffer = b"2021-12-01T05:00:00 5\n2021-12-01T05:30:00 12\n"
+
+        self.assertEqual(parse_slot_at(buffer, 0), parse_slot("2021-12-01T05:00:00"))
+        self.assertEqual(parse_slot_at(buffer, 22), parse_slot("2021-12-01T05:30:00"))
+        with self.assertRaises(ValueError):
+            parse_slot_at(buffer, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
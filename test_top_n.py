@@ -0,0 +1,73 @@
+import unittest
+
+from top_n import TopN, select_top_n, select_top_n_per_day
+from model import TrafficRecord
+
+
+class TestTopN(unittest.TestCase):
+    """Test cases for TopN class and the top n selectors."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.records = [
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=5),
+            TrafficRecord(timestamp="2021-12-01T05:30:00", car_count=12),
+            TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=14),
+            TrafficRecord(timestamp="2021-12-01T06:30:00", car_count=12),
+            TrafficRecord(timestamp="2021-12-05T09:30:00", car_count=18),
+            TrafficRecord(timestamp="2021-12-05T10:30:00", car_count=5),
+            TrafficRecord(timestamp="2021-12-08T18:00:00", car_count=33)
+        ]
+
+    def test_select_top_n_matches_stable_sort(self):
+        """Test top n gives the same records as a stable sort of all records."""
+        for n in (0, 1, 3, 4, 10):
+            with self.subTest(n=n):
+                self.assertEqual(
+                    select_top_n(self.records, n),
+                    sorted(self.records, key=lambda x: x.car_count, reverse=True)[0:n]
+                )
+
+    def test_select_bottom_n_matches_stable_sort(self):
+        """Test bottom n gives the same records as a stable sort of all records."""
+        for n in (0, 1, 2, 3, 10):
+            with self.subTest(n=n):
+                self.assertEqual(
+                    select_top_n(self.records, n, largest=False),
+                    sorted(self.records, key=lambda x: x.car_count)[0:n]
+                )
+
+    def test_select_top_n_from_stream(self):
+        """Test top n accepts a generator and keeps only n records."""
+        top_n = TopN(n=2)
+        for record in (record for record in self.records):
+            top_n.add(record)
+
+        self.assertEqual(len(top_n._heap), 2)
+        self.assertEqual([record.car_count for record in top_n.records()], [33, 18])
+
+    def test_select_top_n_per_day(self):
+        """Test top n for each day is ordered by date."""
+        result = select_top_n_per_day(self.records, n=2)
+
+        self.assertEqual(list(result), ["2021-12-01", "2021-12-05", "2021-12-08"])
+        self.assertEqual(result["2021-12-01"], [
+            TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=14),
+            TrafficRecord(timestamp="2021-12-01T05:30:00", car_count=12)
+        ])
+        self.assertEqual([record.car_count for record in result["2021-12-05"]], [18, 5])
+        self.assertEqual([record.car_count for record in result["2021-12-08"]], [33])
+
+    def test_select_bottom_n_per_day(self):
+        """Test bottom n for each day."""
+        result = select_top_n_per_day(self.records, n=1, largest=False)
+
+        self.assertEqual(result, {
+            "2021-12-01": [TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=5)],
+            "2021-12-05": [TrafficRecord(timestamp="2021-12-05T10:30:00", car_count=5)],
+            "2021-12-08": [TrafficRecord(timestamp="2021-12-08T18:00:00", car_count=33)]
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+from traffic_aggregator import TrafficAggregator
+from model import TrafficRecord
+
+
+class TestTrafficAggregator(unittest.TestCase):
+    """Test cases for TrafficAggregator class."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.records = [
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=5),
+            TrafficRecord(timestamp="2021-12-01T05:30:00", car_count=12),
+            TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=14),
+            TrafficRecord(timestamp="2021-12-01T06:30:00", car_count=15),
+            TrafficRecord(timestamp="2021-12-01T07:00:00", car_count=25),
+            TrafficRecord(timestamp="2021-12-05T09:30:00", car_count=18),
+            TrafficRecord(timestamp="2021-12-05T10:30:00", car_count=15),
+            TrafficRecord(timestamp="2021-12-08T18:00:00", car_count=33)
+        ]
+
+    def _aggregate(self, records, top_n=3):
+        aggregator = TrafficAggregator(top_n=top_n)
+        for record in records:
+            aggregator.add(record)
+        return aggregator
+
+    def test_empty_aggregator(self):
+        """Test aggregator results when no record was added."""
+        aggregator = TrafficAggregator()
+
+        self.assertEqual(aggregator.total_traffic, 0)
+        self.assertEqual(aggregator.get_daily_traffic(), {})
+        self.assertEqual(aggregator.get_top_n_half_hours(), [])
+        self.assertEqual(
+            aggregator.least_cars_in_ninety_mins(),
+            TrafficRecord(timestamp="N/A", car_count=0, duration_mins=90)
+        )
+
+    def test_total_and_daily_traffic(self):
+        """Test running total and daily traffic."""
+        aggregator = self._aggregate(self.records)
+
+        self.assertEqual(aggregator.total_traffic, 137)
+        self.assertEqual(aggregator.get_daily_traffic(), {
+            "2021-12-01": 71,
+            "2021-12-05": 33,
+            "2021-12-08": 33
+        })
+
+    def test_top_n_half_hours(self):
+        """Test top n heap keeps the highest records in descending order."""
+        aggregator = self._aggregate(self.records)
+
+        self.assertEqual(
+            [record.car_count for record in aggregator.get_top_n_half_hours()],
+            [33, 25, 18]
+        )
+        self.assertEqual(len(aggregator.get_top_n_half_hours(2)), 2)
+
+    def test_top_n_half_hours_ties_keep_input_order(self):
+        """Test ties are resolved like a stable sort of the input."""
+        aggregator = self._aggregate(self.records, top_n=4)
+
+        self.assertEqual(
+            [record.timestamp for record in aggregator.get_top_n_half_hours()],
+            ["2021-12-08T18:00:00", "2021-12-01T07:00:00",
+             "2021-12-05T09:30:00", "2021-12-01T06:30:00"]
+        )
+
+    def test_least_cars_in_ninety_mins(self):
+        """Test least 90 minutes interval ignores non contiguous records."""
+        aggregator = self._aggregate(self.records)
+
+        self.assertEqual(
+            aggregator.least_cars_in_ninety_mins(),
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=31, duration_mins=90)
+        )
+
+    def test_least_cars_in_ninety_mins_no_contiguous_intervals(self):
+        """Test least 90 minutes interval when no 3 records are contiguous."""
+        aggregator = self._aggregate(self.records[4:])
+
+        self.assertEqual(
+            aggregator.least_cars_in_ninety_mins(),
+            TrafficRecord(timestamp="N/A", car_count=0, duration_mins=90)
+        )
+
+    def test_window_extremes_with_custom_window(self):
+        """Test least and most windows with a configurable window length."""
+        aggregator = TrafficAggregator(window_mins=60)
+        for record in self.records:
+            aggregator.add(record)
+
+        self.assertEqual(aggregator.get_window_extremes(), (
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=17, duration_mins=60),
+            TrafficRecord(timestamp="2021-12-01T06:30:00", car_count=40, duration_mins=60)
+        ))
+
+    def test_merge_matches_single_pass(self):
+        """Test merging aggregates of consecutive shards equals aggregating all records."""
+        expected = self._aggregate(self.records)
+        for cut in range(len(self.records) + 1):
+            with self.subTest(cut=cut):
+                merged = self._aggregate(self.records[:cut]).merge(self._aggregate(self.records[cut:]))
+
+                self.assertEqual(merged.total_traffic, expected.total_traffic)
+                self.assertEqual(merged.get_daily_traffic(), expected.get_daily_traffic())
+                self.assertEqual(merged.get_top_n_half_hours(), expected.get_top_n_half_hours())
+                self.assertEqual(merged.get_window_extremes(), expected.get_window_extremes())
+
+    def test_merge_different_settings(self):
+        """Test aggregates with different top_n cannot be merged."""
+        with self.assertRaises(ValueError):
+            TrafficAggregator(top_n=3).merge(TrafficAggregator(top_n=5))
+
+    def test_partial_round_trip_keeps_adding(self):
+        """Test an aggregate rebuilt from its partial continues like the original."""
+        expected = self._aggregate(self.records)
+        rebuilt = TrafficAggregator.from_partial(self._aggregate(self.records[:4]).to_partial())
+        for record in self.records[4:]:
+            rebuilt.add(record)
+
+        self.assertEqual(rebuilt.to_partial(), expected.to_partial())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 
 from traffic_analyzer import TrafficAnalyzer
 from model import TrafficRecord
+from range_index import PrefixSumIndex
 
 
 class TestTrafficAnalyzer(unittest.TestCase):
@@ -37,17 +38,19 @@ class TestTrafficAnalyzer(unittest.TestCase):
             TrafficRecord(timestamp="2021-12-08T18:00:00", car_count=33)
         ]
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_init_and_post_init(self, mock_file):
         """Test TrafficAnalyzer initialization and __post_init__ method."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n"
         ]
         
         analyzer = TrafficAnalyzer("test_file.txt")
         
-        # Verify file was opened correctly
+        # Verify the file is only read once the data is needed
+        mock_file.assert_not_called()
+        self.assertEqual(len(analyzer.traffic_data), 2)
         mock_file.assert_called_once_with("test_file.txt", "r")
         
         # Verify data was transformed correctly
@@ -78,20 +81,20 @@ class TestTrafficAnalyzer(unittest.TestCase):
         finally:
             os.unlink(temp_file_path)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_transform_data_empty_file(self, mock_file):
         """Test _transform_data with empty file."""
-        mock_file.return_value.readlines.return_value = []
+        mock_file.return_value.__enter__.return_value = []
         
         analyzer = TrafficAnalyzer("empty_file.txt")
         
         self.assertEqual(len(analyzer.traffic_data), 0)
         self.assertEqual(analyzer.traffic_data, [])
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_calculate_traffic(self, mock_file):
         """Test calculate_traffic method."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n",
             "2021-12-03T06:00:00 14\n"
@@ -102,20 +105,20 @@ class TestTrafficAnalyzer(unittest.TestCase):
         
         self.assertEqual(result, 31)  # 5 + 12 + 14
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_calculate_traffic_empty_data(self, mock_file):
         """Test calculate_traffic with empty data."""
-        mock_file.return_value.readlines.return_value = []
+        mock_file.return_value.__enter__.return_value = []
         
         analyzer = TrafficAnalyzer("empty_file.txt")
         result = analyzer.calculate_traffic()
         
         self.assertEqual(result, 0)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_daily_traffic(self, mock_file):
         """Test get_daily_traffic method."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n",
             "2021-12-01T06:00:00 14\n",
@@ -133,10 +136,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         
         self.assertEqual(result, expected)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_daily_traffic_single_day(self, mock_file):
         """Test get_daily_traffic with single day data."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n"
         ]
@@ -147,10 +150,25 @@ class TestTrafficAnalyzer(unittest.TestCase):
         expected = {"2021-12-01": 17}
         self.assertEqual(result, expected)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_get_daily_traffic_unsorted_input(self, mock_file):
+        """Test get_daily_traffic returns dates in ascending order for unsorted input."""
+        mock_file.return_value.__enter__.return_value = [
+            "2021-12-05T09:30:00 18\n",
+            "2021-12-01T05:00:00 5\n",
+            "2021-12-05T10:30:00 15\n",
+            "2021-12-01T05:30:00 12\n"
+        ]
+
+        analyzer = TrafficAnalyzer("test_file.txt")
+        result = analyzer.get_daily_traffic()
+
+        self.assertEqual(list(result.items()), [("2021-12-01", 17), ("2021-12-05", 33)])
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_top_n_half_hours_default(self, mock_file):
         """Test get_top_n_half_hours with default n=3."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n",
             "2021-12-01T06:00:00 14\n",
@@ -167,10 +185,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         self.assertEqual(result[1].car_count, 25)
         self.assertEqual(result[2].car_count, 14)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_top_n_half_hours_custom_n(self, mock_file):
         """Test get_top_n_half_hours with custom n."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n",
             "2021-12-01T06:00:00 14\n"
@@ -183,10 +201,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         self.assertEqual(result[0].car_count, 14)
         self.assertEqual(result[1].car_count, 12)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_top_n_half_hours_n_larger_than_data(self, mock_file):
         """Test get_top_n_half_hours when n is larger than available data."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n"
         ]
@@ -196,10 +214,47 @@ class TestTrafficAnalyzer(unittest.TestCase):
         
         self.assertEqual(len(result), 2)  # Should return only available records
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_get_bottom_n_half_hours(self, mock_file):
+        """Test get_bottom_n_half_hours returns lowest traffic first."""
+        mock_file.return_value.__enter__.return_value = [
+            "2021-12-01T05:00:00 5\n",
+            "2021-12-01T05:30:00 12\n",
+            "2021-12-01T06:00:00 14\n",
+            "2021-12-01T06:30:00 3\n"
+        ]
+
+        analyzer = TrafficAnalyzer("test_file.txt")
+        result = analyzer.get_bottom_n_half_hours(n=2)
+
+        self.assertEqual([record.car_count for record in result], [3, 5])
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_get_top_and_bottom_n_half_hours_per_day(self, mock_file):
+        """Test top and bottom n half hours for each day."""
+        mock_file.return_value.__enter__.return_value = [
+            "2021-12-01T05:00:00 5\n",
+            "2021-12-01T05:30:00 12\n",
+            "2021-12-01T06:00:00 14\n",
+            "2021-12-05T09:30:00 18\n",
+            "2021-12-05T10:30:00 15\n"
+        ]
+
+        analyzer = TrafficAnalyzer("test_file.txt")
+
+        self.assertEqual(analyzer.get_top_n_half_hours_per_day(n=1), {
+            "2021-12-01": [TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=14)],
+            "2021-12-05": [TrafficRecord(timestamp="2021-12-05T09:30:00", car_count=18)]
+        })
+        self.assertEqual(analyzer.get_bottom_n_half_hours_per_day(n=1), {
+            "2021-12-01": [TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=5)],
+            "2021-12-05": [TrafficRecord(timestamp="2021-12-05T10:30:00", car_count=15)]
+        })
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_date(self, mock_file):
         """Test _get_date method."""
-        mock_file.return_value.readlines.return_value = ["2021-12-01T05:00:00 5\n"]
+        mock_file.return_value.__enter__.return_value = ["2021-12-01T05:00:00 5\n"]
         
         analyzer = TrafficAnalyzer("test_file.txt")
         
@@ -215,10 +270,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
                 result = analyzer._get_date(timestamp)
                 self.assertEqual(result, expected_date)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_next_ts(self, mock_file):
         """Test _next_ts method."""
-        mock_file.return_value.readlines.return_value = ["2021-12-01T05:00:00 5\n"]
+        mock_file.return_value.__enter__.return_value = ["2021-12-01T05:00:00 5\n"]
         
         analyzer = TrafficAnalyzer("test_file.txt")
         
@@ -235,10 +290,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
                 result = analyzer._next_ts(timestamp, delta)
                 self.assertEqual(result, expected)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_has_contiguous_records_true(self, mock_file):
         """Test _has_contiguous_records when contiguous records exist."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n",
             "2021-12-01T06:00:00 14\n",
@@ -255,10 +310,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         result = analyzer._has_contiguous_records(1)
         self.assertTrue(result)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_has_contiguous_records_false_not_enough_records(self, mock_file):
         """Test _has_contiguous_records when not enough records available."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n"
         ]
@@ -273,10 +328,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         result = analyzer._has_contiguous_records(1)
         self.assertFalse(result)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_has_contiguous_records_false_non_contiguous(self, mock_file):
         """Test _has_contiguous_records when records are not contiguous."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T06:00:00 12\n",  # Missing 05:30:00
             "2021-12-01T07:00:00 14\n"
@@ -287,10 +342,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         result = analyzer._has_contiguous_records(0)
         self.assertFalse(result)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_next_records(self, mock_file):
         """Test _get_next_records method."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n",
             "2021-12-01T06:00:00 14\n",
@@ -321,10 +376,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         
         self.assertEqual(result, expected)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_contiguous_ninety_mins_traffic(self, mock_file):
         """Test _get_contiguous_ninety_mins_traffic method."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n",
             "2021-12-01T06:00:00 14\n",
@@ -343,10 +398,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         
         self.assertEqual(result, expected)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_get_contiguous_ninety_mins_traffic_no_contiguous(self, mock_file):
         """Test _get_contiguous_ninety_mins_traffic with no contiguous intervals."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T06:00:00 12\n",  # Missing 05:30:00
             "2021-12-01T07:30:00 14\n"  # Missing 06:30:00 and 07:00:00
@@ -357,10 +412,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         
         self.assertEqual(result, [])
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_least_cars_in_ninety_mins(self, mock_file):
         """Test least_cars_in_ninety_mins method."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T05:30:00 12\n",
             "2021-12-01T06:00:00 14\n",
@@ -375,10 +430,10 @@ class TestTrafficAnalyzer(unittest.TestCase):
         expected = TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=31, duration_mins=90)
         self.assertEqual(result, expected)
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_least_cars_in_ninety_mins_no_contiguous_intervals(self, mock_file):
         """Test least_cars_in_ninety_mins with no contiguous intervals."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "2021-12-01T05:00:00 5\n",
             "2021-12-01T06:00:00 12\n"  # Missing 05:30:00
         ]
@@ -389,21 +444,60 @@ class TestTrafficAnalyzer(unittest.TestCase):
         expected = TrafficRecord(timestamp="N/A", car_count=0, duration_mins=90)
         self.assertEqual(result, expected)
 
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_get_window_extremes(self, mock_file):
+        """Test get_window_extremes with a configurable window length."""
+        mock_file.return_value.__enter__.return_value = [
+            "2021-12-01T05:00:00 5\n",
+            "2021-12-01T05:30:00 12\n",
+            "2021-12-01T06:00:00 14\n",
+            "2021-12-01T06:30:00 15\n",
+            "2021-12-01T07:00:00 25\n"
+        ]
+
+        analyzer = TrafficAnalyzer("test_file.txt")
+
+        self.assertEqual(analyzer.get_window_extremes(), (
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=31, duration_mins=90),
+            TrafficRecord(timestamp="2021-12-01T06:00:00", car_count=54, duration_mins=90)
+        ))
+        self.assertEqual(analyzer.get_window_extremes(window_mins=120), (
+            TrafficRecord(timestamp="2021-12-01T05:00:00", car_count=46, duration_mins=120),
+            TrafficRecord(timestamp="2021-12-01T05:30:00", car_count=66, duration_mins=120)
+        ))
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_least_cars_in_ninety_mins_uses_single_pass(self, mock_file):
+        """Test least_cars_in_ninety_mins does not rebuild the interval list."""
+        mock_file.return_value.__enter__.return_value = [
+            "2021-12-01T05:00:00 5\n",
+            "2021-12-01T05:30:00 12\n",
+            "2021-12-01T06:00:00 14\n"
+        ]
+
+        analyzer = TrafficAnalyzer("test_file.txt")
+        with patch.object(analyzer, '_get_contiguous_ninety_mins_traffic') as mock_intervals:
+            analyzer.least_cars_in_ninety_mins()
+
+        mock_intervals.assert_not_called()
+
     def test_file_not_found_error(self):
         """Test TrafficAnalyzer behavior when file doesn't exist."""
+        analyzer = TrafficAnalyzer("nonexistent_file.txt")
+
         with self.assertRaises(FileNotFoundError):
-            TrafficAnalyzer("nonexistent_file.txt")
+            analyzer.calculate_traffic()
 
-    @patch('traffic_analyzer.open', new_callable=mock_open)
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
     def test_invalid_data_format(self, mock_file):
         """Test TrafficAnalyzer behavior with invalid data format."""
-        mock_file.return_value.readlines.return_value = [
+        mock_file.return_value.__enter__.return_value = [
             "invalid_timestamp abc\n",
             "2021-12-01T05:30:00 12\n"
         ]
         
         with self.assertRaises(ValueError):
-            TrafficAnalyzer("test_file.txt")
+            TrafficAnalyzer("test_file.txt").load()
 
     def test_integration_with_real_data(self):
         """Integration test with realistic data scenario."""
@@ -451,6 +545,149 @@ class TestTrafficAnalyzer(unittest.TestCase):
         finally:
             os.unlink(temp_file_path)
 
+    def test_streaming_mode_matches_in_memory_mode(self):
+        """Test streaming mode gives the same results as loading the file."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
+            temp_file.write(self.sample_file_content)
+            temp_file_path = temp_file.name
+
+        try:
+            analyzer = TrafficAnalyzer(temp_file_path)
+            streaming_analyzer = TrafficAnalyzer(temp_file_path, streaming=True)
+
+            self.assertEqual(streaming_analyzer.traffic_data, [])
+            self.assertEqual(streaming_analyzer.calculate_traffic(), analyzer.calculate_traffic())
+            self.assertEqual(streaming_analyzer.get_daily_traffic(), analyzer.get_daily_traffic())
+            self.assertEqual(streaming_analyzer.get_top_n_half_hours(), analyzer.get_top_n_half_hours())
+            self.assertEqual(streaming_analyzer.get_top_n_half_hours(n=5), analyzer.get_top_n_half_hours(n=5))
+            self.assertEqual(streaming_analyzer.least_cars_in_ninety_mins(), analyzer.least_cars_in_ninety_mins())
+        finally:
+            os.unlink(temp_file_path)
+
+    def test_streaming_mode_reads_file_once(self):
+        """Test streaming mode reuses its aggregate across queries."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
+            temp_file.write(self.sample_file_content)
+            temp_file_path = temp_file.name
+
+        try:
+            analyzer = TrafficAnalyzer(temp_file_path, streaming=True)
+            with patch.object(analyzer, '_read_records', wraps=analyzer._read_records) as mock_read:
+                analyzer.calculate_traffic()
+                analyzer.get_daily_traffic()
+                analyzer.get_top_n_half_hours(n=3)
+                analyzer.least_cars_in_ninety_mins()
+
+            mock_read.assert_called_once()
+        finally:
+            os.unlink(temp_file_path)
+
+    def test_streaming_mode_file_not_found_error(self):
+        """Test streaming mode raises on first query when file doesn't exist."""
+        analyzer = TrafficAnalyzer("nonexistent_file.txt", streaming=True)
+
+        with self.assertRaises(FileNotFoundError):
+            analyzer.calculate_traffic()
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_query_results_are_memoized(self, mock_file):
+        """Test each query is computed once per arguments and counted as hit or miss."""
+        mock_file.return_value.__enter__.return_value = self.sample_file_content.splitlines(keepends=True)
+        analyzer = TrafficAnalyzer("test_file.txt")
+
+        with patch.object(PrefixSumIndex, 'window_extremes', autospec=True,
+                          side_effect=PrefixSumIndex.window_extremes) as mock_windows:
+            least = analyzer.least_cars_in_ninety_mins()
+            self.assertEqual(analyzer.least_cars_in_ninety_mins(), least)
+            self.assertEqual(analyzer.get_window_extremes()[0], least)
+            analyzer.get_window_extremes(window_mins=60)
+
+        self.assertEqual(mock_windows.call_count, 2)
+        self.assertEqual(analyzer.get_top_n_half_hours(), analyzer.get_top_n_half_hours(n=3))
+        self.assertNotEqual(analyzer.get_top_n_half_hours(n=5), analyzer.get_top_n_half_hours(3))
+        self.assertEqual(analyzer.query_cache_misses, 5)
+        self.assertEqual(analyzer.query_cache_hits, 4)
+        self.assertEqual(analyzer, TrafficAnalyzer("test_file.txt"))
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_memoized_results_are_copies(self, mock_file):
+        """Test changing a returned result does not change the cached result."""
+        mock_file.return_value.__enter__.return_value = self.sample_file_content.splitlines(keepends=True)
+        analyzer = TrafficAnalyzer("test_file.txt")
+
+        analyzer.get_daily_traffic()["2021-12-01"] = 0
+        analyzer.get_top_n_half_hours().clear()
+
+        self.assertEqual(analyzer.get_daily_traffic()["2021-12-01"], 159)
+        self.assertEqual(len(analyzer.get_top_n_half_hours()), 3)
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_data_mutation_invalidates_memoized_results(self, mock_file):
+        """Test assigning the data, or invalidate_cache after an in place change, clears the results."""
+        mock_file.return_value.__enter__.return_value = self.sample_file_content.splitlines(keepends=True)
+        analyzer = TrafficAnalyzer("test_file.txt")
+        self.assertEqual(analyzer.calculate_traffic(), 225)
+
+        analyzer.traffic_data = self.expected_traffic_records[0:3]
+        self.assertEqual(analyzer.calculate_traffic(), 31)
+
+        analyzer.traffic_data.append(TrafficRecord("2021-12-01T06:30:00", 15))
+        self.assertEqual(analyzer.calculate_traffic(), 31)
+        analyzer.invalidate_cache()
+        self.assertEqual(analyzer.calculate_traffic(), 46)
+        self.assertEqual(analyzer.query_cache_misses, 3)
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_file_is_loaded_lazily_once(self, mock_file):
+        """Test the file is read on the first query only, or up front with load."""
+        mock_file.return_value.__enter__.return_value = self.sample_file_content.splitlines(keepends=True)
+
+        analyzer = TrafficAnalyzer("test_file.txt")
+        self.assertEqual(repr(analyzer), repr(TrafficAnalyzer("test_file.txt")))
+        self.assertEqual(analyzer, TrafficAnalyzer("test_file.txt"))
+        mock_file.assert_not_called()
+        self.assertEqual(analyzer.calculate_traffic(), 225)
+        self.assertEqual(analyzer.get_daily_traffic()["2021-12-01"], 159)
+        mock_file.assert_called_once_with("test_file.txt", "r")
+
+        self.assertEqual(len(TrafficAnalyzer("test_file.txt").load().traffic_data), 10)
+        self.assertEqual(mock_file.call_count, 2)
+
+    def test_prefetch_loads_in_background_thread(self):
+        """Test prefetch loads the file in another thread, and queries wait for it."""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as temp_file:
+            temp_file.write(self.sample_file_content)
+        self.addCleanup(os.unlink, temp_file.name)
+
+        with patch.object(TrafficAnalyzer, '_transform_data', autospec=True,
+                          side_effect=TrafficAnalyzer._transform_data) as mock_transform:
+            analyzer = TrafficAnalyzer(temp_file.name).prefetch()
+            self.assertIs(analyzer.prefetch(), analyzer)
+            self.assertEqual(analyzer.traffic_data, self.expected_traffic_records)
+            self.assertEqual(analyzer.calculate_traffic(), 225)
+            analyzer._prefetch_thread.join()
+
+        mock_transform.assert_called_once()
+        self.assertEqual(analyzer.query_cache_misses, 1)
+
+    def test_failed_prefetch_raises_on_query(self):
+        """Test an error of the prefetch thread is raised by the next query."""
+        analyzer = TrafficAnalyzer("nonexistent_file.txt").prefetch()
+        analyzer._prefetch_thread.join()
+
+        with self.assertRaises(FileNotFoundError):
+            analyzer.calculate_traffic()
+
+    @patch('traffic_analyzer.open_data_file', new_callable=mock_open)
+    def test_assigned_data_replaces_loading(self, mock_file):
+        """Test data assigned before the first query is analyzed instead of the file."""
+        analyzer = TrafficAnalyzer("test_file.txt")
+        analyzer.traffic_data = self.expected_traffic_records
+
+        self.assertEqual(analyzer.calculate_traffic(), 225)
+        self.assertIsNone(analyzer.columns)
+        mock_file.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,117 @@
+import operator
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import islice
+from model import TrafficRecords
+from timestamps import SLOT_MINS, SLOTS_PER_DAY, parse_range_end, parse_range_start
+
+
+def parse_hours(hours: str) -> tuple[int, int]:
+    """
+    Function to decode a hh:mm-hh:mm time of day range into the slot of the day of its first half hour
+    and its number of half hours. The end is excluded and a range ending before it starts runs past midnight.
+    """
+    try:
+        first, last = (slot_of_day(time) for time in hours.split("-"))
+    except ValueError:
+        raise ValueError(f"Invalid time of day range, expected hh:mm-hh:mm: {hours!r}") from None
+    if first == last:
+        raise ValueError(f"Empty time of day range: {hours!r}")
+    return first % SLOTS_PER_DAY, (last - first) % SLOTS_PER_DAY or SLOTS_PER_DAY
+
+
+def slot_of_day(time: str) -> int:
+    """
+    Function to decode a hh:mm time on a half hour, 00:00 to 24:00, into its slot of the day.
+    """
+    hour, minute = time.strip().split(":")
+    if len(hour) != 2 or len(minute) != 2 or int(minute) % SLOT_MINS or not 0 <= int(hour) * 60 + int(minute) <= 24 * 60:
+        raise ValueError(time)
+    return int(hour) * 2 + int(minute) // SLOT_MINS
+
+
+@dataclass(frozen=True)
+class TimeFilter:
+    """
+    Class to select the half hours of a time range and of a time of day range of every day.
+    start_slot is the first half hour of the range and end_slot the first half hour after it,
+    None for a range without start or end. first_slot_of_day and slots_of_day select slots_of_day
+    half hours of each day from the slot of the day first_slot_of_day on, running past midnight,
+    e.g. 14 and 6 for 07:00-10:00, None to select all half hours of the day.
+    An empty filter selects everything and is false.
+    """
+    start_slot: int | None = None
+    end_slot: int | None = None
+    first_slot_of_day: int | None = None
+    slots_of_day: int | None = None
+
+    @classmethod
+    def parse(cls, start: str | None = None, end: str | None = None, hours: str | None = None):
+        """
+        Function to build the filter of the start and end, dates or timestamps, and hours, hh:mm-hh:mm.
+        An end date is included, an end timestamp is excluded.
+        """
+        first_slot_of_day, slots_of_day = parse_hours(hours) if hours else (None, None)
+        return cls(parse_range_start(start) if start else None, parse_range_end(end) if end else None,
+                   first_slot_of_day, slots_of_day)
+
+    def __bool__(self):
+        return self.start_slot is not None or self.end_slot is not None or self.first_slot_of_day is not None
+
+    def contains(self, slot: int) -> bool:
+        """
+        Function to check if a half hour slot is selected.
+        """
+        if self.start_slot is not None and slot < self.start_slot:
+            return False
+        if self.end_slot is not None and slot >= self.end_slot:
+            return False
+        return self.first_slot_of_day is None or (slot - self.first_slot_of_day) % SLOTS_PER_DAY < self.slots_of_day
+
+    def slot_ranges(self, first_slot: int, last_slot: int) -> list[tuple[int, int]]:
+        """
+        Function to get the selected half hours from first_slot to last_slot, both included, as
+        (start, end) ranges of slots in time order, the end excluded. One range per day with a
+        time of day range, e.g. to search each of them in data sorted by time.
+        """
+        start = first_slot if self.start_slot is None else max(first_slot, self.start_slot)
+        end = last_slot + 1 if self.end_slot is None else min(last_slot + 1, self.end_slot)
+        if start >= end:
+            return []
+        if self.first_slot_of_day is None:
+            return [(start, end)]
+        ranges = []
+        range_start = start - (start - self.first_slot_of_day) % SLOTS_PER_DAY
+        while range_start < end:
+            if range_start + self.slots_of_day > start:
+                ranges.append((max(range_start, start), min(range_start + self.slots_of_day, end)))
+            range_start += SLOTS_PER_DAY
+        return ranges
+
+    def select_records(self, traffic_records: TrafficRecords) -> TrafficRecords:
+        """
+        Function to select the records of TrafficRecords, found by binary search on the slots when they
+        are in time order, else by checking every record.
+        """
+        if not self or not traffic_records:
+            return traffic_records
+        slots = traffic_records.slots
+        if not all(map(operator.le, slots, islice(slots, 1, None))):
+            return TrafficRecords.from_slots(
+                ((slot, car_count) for slot, car_count in zip(slots, traffic_records.car_counts) if self.contains(slot)),
+                traffic_records.duration_mins
+            )
+        selected = TrafficRecords(duration_mins=traffic_records.duration_mins)
+        for start, end in self.slot_ranges(slots[0], slots[-1]):
+            start_index, end_index = bisect_left(slots, start), bisect_left(slots, end)
+            selected.slots.extend(slots[start_index:end_index])
+            selected.car_counts.extend(traffic_records.car_counts[start_index:end_index])
+        return selected
+
+    def filter_records(self, records):
+        """
+        Function to select TrafficRecord objects from an iterable of them, lazily, every record is checked.
+        """
+        if not self:
+            return records
+        return (record for record in records if self.contains(record.slot))
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from functools import lru_cache
+
+SLOT_MINS = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINS
+EPOCH = date(1970, 1, 1)
+
+
+@lru_cache(maxsize=4096)
+def day_of_date(date_str: str) -> int:
+    """
+    Function to convert a date in yyyy-mm-dd format, as str or bytes, into days since 1970-01-01.
+    Dates repeat for every half hour of a day, so the result is cached.
+    """
+    return (date(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10])) - EPOCH).days
+
+
+@lru_cache(maxsize=4096)
+def date_of_day(day: int) -> str:
+    """
+    Function to convert days since 1970-01-01 into a date in yyyy-mm-dd format.
+    """
+    return (EPOCH + timedelta(days=day)).isoformat()
+
+
+def parse_slot(timestamp: str) -> int:
+    """
+    Function to decode a fixed width yyyy-mm-ddThh:mm:ss timestamp into a half hour slot,
+    the number of half hours since 1970-01-01T00:00:00.
+    Reads the fields at fixed offsets instead of going through datetime.fromisoformat.
+    """
+    if len(timestamp) < 16 or timestamp[10] != "T":
+        raise ValueError(f"Invalid timestamp: {timestamp!r}")
+    return (day_of_date(timestamp[0:10]) * SLOTS_PER_DAY +
+            int(timestamp[11:13]) * 2 + int(timestamp[14:16]) // SLOT_MINS)
+
+
+def parse_slot_at(buffer, offset: int) -> int:
+    """
+    Function to decode the timestamp starting at offset of a bytes-like buffer into a half hour slot,
+    reading the fields straight from the buffer without decoding the line into a string.
+    """
+    if buffer[offset + 10] != ord("T") or buffer[offset + 13] != ord(":"):
+        raise ValueError(f"Invalid timestamp at byte {offset}: {bytes(buffer[offset:offset + 19])!r}")
+    return (day_of_date(buffer[offset:offset + 10]) * SLOTS_PER_DAY +
+            int(buffer[offset + 11:offset + 13]) * 2 + int(buffer[offset + 14:offset + 16]) // SLOT_MINS)
+
+
+def slot_to_date(slot: int) -> str:
+    """
+    Function to convert a half hour slot into its date in yyyy-mm-dd format.
+    """
+    return date_of_day(slot // SLOTS_PER_DAY)
+
+
+def slot_to_timestamp(slot: int) -> str:
+    """
+    Function to convert a half hour slot back into a yyyy-mm-ddThh:mm:ss timestamp.
+    """
+    day, slot_of_day = divmod(slot, SLOTS_PER_DAY)
+    hours, half_hours = divmod(slot_of_day, 2)
+    return f"{date_of_day(day)}T{hours:02d}:{half_hours * SLOT_MINS:02d}:00"
+
+
+def parse_range_start(value: str) -> int:
+    """
+    Function to decode the start of a time range, a yyyy-mm-dd date or a yyyy-mm-ddThh:mm:ss
+    timestamp, into the first half hour slot it includes.
+    """
+    return day_of_date(value) * SLOTS_PER_DAY if len(value) == 10 else parse_slot(value)
+
+
+def parse_range_end(value: str) -> int:
+    """
+    Function to decode the end of a time range into the first half hour slot after it.
+    A yyyy-mm-dd date includes the whole day, a timestamp is excluded like the end of a slice.
+    """
+    return (day_of_date(value) + 1) * SLOTS_PER_DAY if len(value) == 10 else parse_slot(value)
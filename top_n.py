@@ -0,0 +1,73 @@
+import heapq
+from model import TrafficRecord
+from timestamps import SLOTS_PER_DAY, date_of_day
+
+
+class TopN:
+    """
+    Class to keep the top (or bottom) n records seen so far in a bounded heap.
+    Adding a record is O(log n) and memory is O(n), so it works on streams of any length.
+    Ties keep the input order, same as a stable sort of all records.
+    """
+
+    def __init__(self, n: int = 3, largest: bool = True):
+        self.n = n
+        self.largest = largest
+        self._heap = []
+        self._record_count = 0
+
+    def add(self, record: TrafficRecord):
+        """
+        Function to offer a record to the heap.
+        The heap root is the record that would be dropped first:
+        the lowest (or highest) count, and the latest record among equal counts.
+        """
+        if self.n > 0:
+            key = (record.car_count if self.largest else -record.car_count, -self._record_count)
+            if len(self._heap) < self.n:
+                heapq.heappush(self._heap, (key, record))
+            elif key > self._heap[0][0]:
+                heapq.heapreplace(self._heap, (key, record))
+        self._record_count += 1
+
+    def records(self):
+        """
+        Function to get the kept records, best first.
+        """
+        return [record for _, record in sorted(self._heap, key=lambda item: item[0], reverse=True)]
+
+    @classmethod
+    def from_records(cls, n: int, records: list[TrafficRecord], record_count: int):
+        """
+        Function to rebuild a TopN of the largest records from its kept records, best first.
+        Equal counts are added in list order, so they keep winning ties over later records.
+        """
+        top_n = cls(n)
+        for record in records:
+            top_n.add(record)
+        top_n._record_count = record_count
+        return top_n
+
+
+def select_top_n(records, n=3, largest=True):
+    """
+    Function to select the n records with most (or least) cars from a list or a stream.
+    """
+    top_n = TopN(n, largest)
+    for record in records:
+        top_n.add(record)
+    return top_n.records()
+
+
+def select_top_n_per_day(records, n=3, largest=True):
+    """
+    Function to select the n records with most (or least) cars for each day.
+    Returns a dict of date in yyyy-mm-dd format to records, ordered by date.
+    """
+    top_n_per_day = {}
+    for record in records:
+        day = record.slot // SLOTS_PER_DAY
+        if day not in top_n_per_day:
+            top_n_per_day[day] = TopN(n, largest)
+        top_n_per_day[day].add(record)
+    return {date_of_day(day): top_n_per_day[day].records() for day in sorted(top_n_per_day)}
@@ -0,0 +1,107 @@
+from dataclasses import dataclass, field
+from model import TrafficAnalysisPartial, TrafficRecord
+from sliding_window import SlidingWindow
+from timestamps import slot_to_date
+from top_n import TopN
+
+@dataclass
+class TrafficAggregator:
+    """
+    Class to aggregate traffic records incrementally, one record at a time.
+    Memory stays bounded by the number of days, top_n and window_mins,
+    independent of the number of records added.
+    1. Keeps running total traffic
+    2. Keeps running daily traffic
+    3. Keeps a heap of top n half hours with highest traffic
+    4. Keeps the contiguous window_mins intervals with least and most cars
+
+    Aggregates of consecutive shards of the data (e.g. one file per day) can be
+    combined with merge, or exported with to_partial and combined as TrafficAnalysisPartial,
+    so shards can be aggregated separately and in parallel.
+    """
+    top_n: int = 3
+    window_mins: int = 90
+    total_traffic: int = 0
+    daily_traffic: dict = field(default_factory=dict)
+    _top_n: TopN = field(init=False, repr=False)
+    _window: SlidingWindow = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._top_n = TopN(self.top_n)
+        self._window = SlidingWindow(self.window_mins)
+
+    def add(self, record: TrafficRecord):
+        """
+        Function to update all aggregates with the given record.
+        Records are expected in the same order as the input file.
+        """
+        date = slot_to_date(record.slot)
+
+        self.total_traffic += record.car_count
+        self.daily_traffic[date] = self.daily_traffic.get(date, 0) + record.car_count
+        self._top_n.add(record)
+        self._window.add(record.slot, record)
+
+    def merge(self, other: "TrafficAggregator"):
+        """
+        Function to combine with the aggregate of the records that follow this one's.
+        """
+        return TrafficAggregator.from_partial(self.to_partial() + other.to_partial())
+
+    def to_partial(self) -> TrafficAnalysisPartial:
+        """
+        Function to export the aggregate as a mergeable TrafficAnalysisPartial.
+        """
+        return TrafficAnalysisPartial(
+            top_n=self.top_n,
+            window_mins=self.window_mins,
+            total_traffic=self.total_traffic,
+            daily_traffic=dict(self.daily_traffic),
+            top_n_half_hours=self._top_n.records(),
+            least_window=self._window.least,
+            most_window=self._window.most,
+            head=list(self._window.head),
+            tail=self._window.tail(),
+            record_count=self._window.record_count
+        )
+
+    @classmethod
+    def from_partial(cls, partial: TrafficAnalysisPartial):
+        """
+        Function to rebuild an aggregate from a TrafficAnalysisPartial, records can keep being added.
+        """
+        aggregator = cls(top_n=partial.top_n, window_mins=partial.window_mins)
+        aggregator.total_traffic = partial.total_traffic
+        aggregator.daily_traffic = dict(partial.daily_traffic)
+        aggregator._top_n = TopN.from_records(partial.top_n, partial.top_n_half_hours, partial.record_count)
+        aggregator._window = SlidingWindow.restore(
+            partial.window_mins, partial.least_window, partial.most_window,
+            partial.head, partial.tail, partial.record_count
+        )
+        return aggregator
+
+    def get_daily_traffic(self):
+        """
+        Function to get daily traffic ordered by date.
+        """
+        return dict(sorted(self.daily_traffic.items()))
+
+    def get_top_n_half_hours(self, n=None):
+        """
+        Function to get top n half hours with highest traffic, n defaults to top_n.
+        Ties keep the input order, same as sorting the full record list.
+        """
+        n = self.top_n if n is None else min(n, self.top_n)
+        return self._top_n.records()[0:n]
+
+    def least_cars_in_ninety_mins(self):
+        """
+        Function to get the contiguous window_mins interval with least cars seen.
+        """
+        return self._window.least_record()
+
+    def get_window_extremes(self):
+        """
+        Function to get the contiguous window_mins intervals with least and most cars seen.
+        """
+        return self._window.least_record(), self._window.most_record()
@@ -1,87 +1,557 @@
+import copy
+import inspect
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from model import TrafficRecord
+from functools import wraps
+from arrow_io import arrow_format, columns_to_arrow, read_arrow_columns, read_arrow_records, records_to_arrow
+from cache import load_cached, save_cached
+from columnar import ColumnarTrafficData
+from counters import CounterAggregator, aggregate_counters, counter_shard_path
+from decompression import compression_format, open_data_file
+from incremental import update_state
+from model import TrafficRecord, TrafficRecords
+from parallel import aggregate_files, find_data_files, is_multi_file_path, read_file_records
+from profiling import AnalyzerStats
+from range_index import PrefixSumIndex
+from readers import read_slots_mmap
+from rollups import Rollup, Rollups
+from sliding_window import find_window_extremes
+from sqlite_store import SQLiteTrafficData
+from time_filter import TimeFilter
+from timestamps import SLOTS_PER_DAY, day_of_date, parse_slot, slot_to_date, slot_to_timestamp
+from top_n import select_top_n, select_top_n_per_day
+from traffic_aggregator import TrafficAggregator
+
+LAZY_ATTRIBUTES = ("traffic_data", "columns", "store")
+logger = logging.getLogger(__name__)
+
+
+def memoized_query(query):
+    """
+    Function to decorate a TrafficAnalyzer query so its result is computed once per arguments.
+    Results are kept in the analyzer's query cache, keyed by the query name and its arguments
+    with defaults applied, and a copy of dict and list results is returned so callers cannot
+    change the cached result.
+    """
+    signature = inspect.signature(query)
+
+    @wraps(query)
+    def memoized(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        key = (query.__name__, *tuple(arguments.arguments.values())[1:])
+        if key in self._query_cache:
+            self.query_cache_hits += 1
+        else:
+            self.query_cache_misses += 1
+            self.load()
+            with self._phase(query.__name__):
+                self._query_cache[key] = query(self, *args, **kwargs)
+        return copy.copy(self._query_cache[key])
+
+    return memoized
+
 
 @dataclass
 class TrafficAnalyzer:
     """
     Class to analyze traffic data from a given file.
-    1. Transforms the data into a list of TrafficRecord
+    1. Transforms the data into TrafficRecords, a compact sequence of TrafficRecord, on the first query
     2. Calculates total traffic
     3. Calculates daily traffic
     4. Finds top n half hours with highest traffic
     5. Finds contiguous 90 minutes intervals car counts
+    6. Finds contiguous windows of any length with least and most cars
+    7. Finds bottom n half hours and top or bottom n half hours for each day
+    8. Counts cars between two timestamps, on a day or in a window, with a prefix sum index
+    9. Calculates hourly, weekly, monthly and day of week traffic from rollups
+
+    Modes, described in the README:
+    - streaming: aggregates the records in bounded memory instead of loading them
+    - columnar: loads the file into numpy columns and analyzes them vectorized
+    - workers: number of processes aggregating a directory or glob pattern of files
+    - memory_map: scans memory mapped files as bytes
+    - state_file: analyzes an append only file incrementally
+    - cache: loads the parsed file from a binary cache file
+    - counters, shard_dir, counter: reports per counter for files with a counter id column
+    - database: loads the file into a SQLite database and analyzes it with SQL
+    - start, end, hours: limit every analysis to a time range and a time of day range
+    - profile: measures loading and every query in stats
     """
     data_file_path: str
-    traffic_data: list[TrafficRecord] = field(default_factory=list)
+    traffic_data: Sequence[TrafficRecord] = field(default_factory=list, repr=False, compare=False)
+    streaming: bool = False
+    columnar: bool = False
+    workers: int | None = None
+    memory_map: bool = False
+    state_file: str | None = None
+    cache: bool = False
+    counters: bool = False
+    counter: str | None = None
+    shard_dir: str | None = None
+    profile: bool = False
+    database: str | None = None
+    start: str | None = None
+    end: str | None = None
+    hours: str | None = None
+    time_filter: TimeFilter = field(default_factory=TimeFilter, init=False, repr=False)
+    stats: AnalyzerStats = field(default_factory=AnalyzerStats, init=False, repr=False, compare=False)
+    columns: ColumnarTrafficData | None = field(init=False, repr=False, compare=False)
+    store: SQLiteTrafficData | None = field(init=False, repr=False, compare=False)
+    data_files: list[str] = field(default_factory=list, init=False, repr=False)
+    _aggregator: TrafficAggregator | None = field(default=None, init=False, repr=False, compare=False)
+    _counter_aggregator: CounterAggregator | None = field(default=None, init=False, repr=False, compare=False)
+    query_cache_hits: int = field(default=0, init=False, repr=False, compare=False)
+    query_cache_misses: int = field(default=0, init=False, repr=False, compare=False)
+    _query_cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _loaded: bool = field(default=False, init=False, repr=False, compare=False)
+    _load_lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+    _prefetch_thread: threading.Thread | None = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        self._transform_data()
+        if self.counter is not None:
+            self.data_file_path = counter_shard_path(self.data_file_path, self.counter)
+        if is_multi_file_path(self.data_file_path):
+            self.data_files = find_data_files(self.data_file_path)
+            if not self.data_files:
+                raise FileNotFoundError(f"No data files found for {self.data_file_path}")
+            if self.columnar:
+                raise ValueError("columnar mode needs a single data file")
+            self.streaming = True
+        else:
+            self.data_files = [self.data_file_path]
+        if self.state_file:
+            if len(self.data_files) > 1 or self.columnar:
+                raise ValueError("incremental mode needs a single data file and no columnar mode")
+            self.streaming = True
+        if self.counters:
+            if self.columnar or self.memory_map or self.state_file:
+                raise ValueError("counters mode cannot be combined with columnar, memory mapped or incremental mode")
+            self.streaming = True
+        if self.streaming and self.columnar:
+            raise ValueError("streaming and columnar modes cannot be combined")
+        if self.database and (self.streaming or self.columnar or self.cache):
+            raise ValueError("database mode needs a single data file and no streaming, columnar or cache mode")
+        self.time_filter = TimeFilter.parse(self.start, self.end, self.hours)
+        if self.time_filter and self.state_file:
+            raise ValueError("a time range cannot be combined with incremental mode")
+        if not self.streaming:
+            del self.traffic_data
+        self._loaded = self.streaming
+
+    def __getattr__(self, name):
+        if name in LAZY_ATTRIBUTES:
+            self.load()
+            return self.__dict__.setdefault(name, [] if name == "traffic_data" else None)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
+    def __setattr__(self, name, value):
+        if not name.startswith("_") and not name.startswith("query_cache_"):
+            self.__dict__.get("_query_cache", {}).clear()
+        if name in LAZY_ATTRIBUTES:
+            self.__dict__["_loaded"] = True
+        super().__setattr__(name, value)
+
+    def load(self):
+        """
+        Function to load the data file into the backend in use, if not loaded yet, and return the analyzer.
+        Waits for a prefetch in progress instead of loading the file a second time.
+        """
+        with self._load_lock:
+            if not self._loaded:
+                with self._phase("load"):
+                    if self.cache:
+                        self._load_cached()
+                    else:
+                        self._load()
+                self._loaded = True
+        return self
+
+    def prefetch(self):
+        """
+        Function to start loading the data file in a background thread and return the analyzer,
+        so reading the file overlaps with other work, e.g. creating the analyzers of other files.
+        The first query waits for it to finish. A failed prefetch is retried, and raises, on that query.
+        """
+        if not self._loaded and self._prefetch_thread is None:
+            self._prefetch_thread = threading.Thread(target=self._prefetch, daemon=True)
+            self._prefetch_thread.start()
+        return self
+
+    def invalidate_cache(self):
+        """
+        Function to clear the memoized query results, after the data was changed in place.
+        """
+        self._query_cache.clear()
+
+    @memoized_query
     def calculate_traffic(self):
         """
         Function to calculate total traffic from the data dictionary.
         """
+        if self.streaming:
+            return self._stream_aggregate().total_traffic
+        if self.columnar:
+            return self.columns.calculate_traffic()
+        if self.database:
+            return self.store.calculate_traffic()
         return sum(record.car_count for record in self.traffic_data)
 
+    @memoized_query
     def get_daily_traffic(self):
         """
         Function to calculate daily traffic from the data dictionary.
+        Read from the daily rollup once the rollups are built, otherwise the records are summed
+        straight into one array per day, so only the distinct days are formatted as dates.
         """
+        if self.streaming:
+            return self._stream_aggregate().get_daily_traffic()
+        if self.database:
+            return self.store.get_daily_traffic()
+        if ("get_rollups",) in self._query_cache:
+            return self._query_cache[("get_rollups",)].daily_traffic()
+        if self.columnar:
+            return self.columns.get_daily_traffic()
+        if isinstance(self.traffic_data, TrafficRecords):
+            slots = self.traffic_data.slots
+            daily = Rollup.from_slots(zip(slots, self.traffic_data.car_counts), SLOTS_PER_DAY,
+                                      *((min(slots), max(slots)) if slots else ()))
+        else:
+            daily = Rollup.from_slots(((record.slot, record.car_count) for record in self._records()), SLOTS_PER_DAY)
+        return Rollups(daily=daily).daily_traffic()
 
-        date_set = {self._get_date(record.timestamp) for record in self.traffic_data}
-
-        return {
-            dd: sum(record.car_count for record in self.traffic_data if self._get_date(record.timestamp) == dd)
-            for dd in sorted(date_set)
-        }
-
+    @memoized_query
     def get_top_n_half_hours(self, n=3):
         """
         Function to get top n half hours with highest traffic.
+        Uses a bounded heap, O(records * log n) instead of sorting all records.
+        """
+        if self.streaming:
+            return self._stream_aggregate(n).get_top_n_half_hours(n)
+        if self.columnar:
+            return self.columns.get_top_n_half_hours(n)
+        if self.database:
+            return self.store.get_top_n_half_hours(n)
+        return select_top_n(self.traffic_data, n)
+
+    @memoized_query
+    def get_bottom_n_half_hours(self, n=3):
+        """
+        Function to get bottom n half hours with lowest traffic.
         """
-        return sorted(self.traffic_data, key=lambda x: x.car_count, reverse=True)[0:n]
-    
+        if self.columnar:
+            return self.columns.get_top_n_half_hours(n, largest=False)
+        if self.database:
+            return self.store.get_top_n_half_hours(n, largest=False)
+        return select_top_n(self._records(), n, largest=False)
+
+    @memoized_query
+    def get_top_n_half_hours_per_day(self, n=3):
+        """
+        Function to get top n half hours with highest traffic for each day.
+        """
+        return select_top_n_per_day(self._records(), n)
+
+    @memoized_query
+    def get_bottom_n_half_hours_per_day(self, n=3):
+        """
+        Function to get bottom n half hours with lowest traffic for each day.
+        """
+        return select_top_n_per_day(self._records(), n, largest=False)
+
+    @memoized_query
     def least_cars_in_ninety_mins(self):
         """
         Function to find the timestamp with least number of cars seen in next 90 minutes.
         """
-        if self._get_contiguous_ninety_mins_traffic() == []:
-            return TrafficRecord(timestamp="N/A", car_count=0, duration_mins=90)
-        return min(self._get_contiguous_ninety_mins_traffic(), key=lambda x: x.car_count)
+        if self.streaming:
+            return self._stream_aggregate().least_cars_in_ninety_mins()
+        return self.get_window_extremes(window_mins=90)[0]
+
+    @memoized_query
+    def get_window_extremes(self, window_mins=90):
+        """
+        Function to find the contiguous windows of window_mins with least and most cars seen.
+        Returns a (least, most) tuple of TrafficRecord with duration_mins=window_mins,
+        computed in a single pass with a running sum.
+        """
+        if self.streaming:
+            if window_mins == 90:
+                return self._stream_aggregate().get_window_extremes()
+            return find_window_extremes(self._read_records(), window_mins)
+        if self.columnar:
+            return self.columns.get_window_extremes(window_mins)
+        if self.database:
+            return self.store.get_window_extremes(window_mins)
+        return self.get_range_index().window_extremes(window_mins)
+
+    @memoized_query
+    def get_counter_results(self, n=3):
+        """
+        Function to get the report of each counter, with its top n half hours, ordered by counter id.
+        Files without counter id column are reported as a single counter named "default".
+        """
+        return self._aggregate_counters(n).counter_results(n)
+
+    @memoized_query
+    def get_hourly_traffic(self):
+        """
+        Function to get the cars seen in each hour with records, keyed by yyyy-mm-ddThh:00:00 timestamp.
+        """
+        return self.get_rollups().hourly_traffic()
+
+    @memoized_query
+    def get_weekly_traffic(self):
+        """
+        Function to get the cars seen in each week, keyed by the yyyy-mm-dd date of its Monday.
+        """
+        return self.get_rollups().weekly_traffic()
+
+    @memoized_query
+    def get_monthly_traffic(self):
+        """
+        Function to get the cars seen in each month, keyed by yyyy-mm.
+        """
+        return self.get_rollups().monthly_traffic()
+
+    @memoized_query
+    def get_day_of_week_traffic(self):
+        """
+        Function to get the cars seen on each day of the week over all weeks, Monday first.
+        """
+        return self.get_rollups().day_of_week_traffic()
+
+    def get_traffic_between(self, start: str, end: str) -> int:
+        """
+        Function to count the cars seen from the start timestamp up to, excluding, the end timestamp.
+        O(log n) with the prefix sum index, built on the first range query.
+        """
+        return self.get_range_index().range_total(parse_slot(start), parse_slot(end))
+
+    def get_day_traffic(self, date: str) -> int:
+        """
+        Function to count the cars seen on a date in yyyy-mm-dd format, O(log n).
+        """
+        return self.get_range_index().day_total(day_of_date(date))
+
+    def get_window_traffic(self, start: str, window_mins=90) -> int:
+        """
+        Function to count the cars seen in the window_mins starting at the start timestamp, O(log n).
+        """
+        return self.get_range_index().window_total(parse_slot(start), window_mins)
+
+    def segments(self):
+        """
+        Function to get the segments of contiguous half hours between gaps, as TrafficRecord of
+        the first half hour of each segment with the cars seen in it and its length in duration_mins.
+        """
+        return self.get_range_index().segments()
+
+    def get_range_index(self) -> PrefixSumIndex:
+        """
+        Function to get the prefix sum index of the records, built once and kept with the query results.
+        """
+        key = ("get_range_index",)
+        if key not in self._query_cache:
+            in_memory = not (self.streaming or self.columnar or self.database)
+            self._query_cache[key] = PrefixSumIndex(self.traffic_data if in_memory else self._records())
+        return self._query_cache[key]
+
+    def to_arrow(self):
+        """
+        Function to export the records as an Arrow table of timestamp and car_count columns.
+        The timestamps of numpy columns are handed to Arrow without copying them, loaded records are copied
+        so they can still be appended to.
+        """
+        self.load()
+        if self.columnar:
+            return columns_to_arrow(self.columns.timestamps, self.columns.car_counts)
+        if isinstance(self.traffic_data, TrafficRecords) and not self.streaming:
+            return records_to_arrow(self.traffic_data)
+        return records_to_arrow(self._records())
+
+    def _prefetch(self):
+        """
+        Function to load the data file in the prefetch thread.
+        """
+        try:
+            self.load()
+        except Exception:
+            pass  # load raises the error again on the next query
+
+    def get_rollups(self) -> Rollups:
+        """
+        Function to get the hourly, daily, weekly and monthly rollups, built once in a single pass
+        over the records and kept with the query results.
+        """
+        key = ("get_rollups",)
+        if key not in self._query_cache:
+            if self.columnar:
+                self._query_cache[key] = Rollups.from_hourly(self.columns.hourly_rollup())
+            elif isinstance(self.traffic_data, TrafficRecords) and not self.streaming:
+                slots = self.traffic_data.slots
+                self._query_cache[key] = Rollups.from_slots(zip(slots, self.traffic_data.car_counts),
+                                                            *((min(slots), max(slots)) if slots else ()))
+            else:
+                self._query_cache[key] = Rollups.from_records(self._records())
+        return self._query_cache[key]
+
+    def _phase(self, name: str):
+        """
+        Function to measure the code run in a with block as a phase of stats, when profiling.
+        """
+        if not self.profile:
+            return nullcontext()
+        return self.stats.phase(name, self._record_count)
+
+    def _record_count(self) -> int | None:
+        """
+        Function to count the loaded records, None when streaming as the records are not kept.
+        """
+        if self.streaming:
+            return None
+        if self.columnar:
+            return len(self.columns)
+        if self.database:
+            return len(self.store)
+        return len(self.traffic_data)
+
+    def _load(self, time_filter: TimeFilter | None = None):
+        """
+        Function to load the data file into the backend in use, nothing to load when streaming.
+        Only the half hours selected by time_filter are loaded, by default the time_filter of the analyzer.
+        The file format is detected here rather than on construction, so creating an analyzer reads nothing.
+        """
+        time_filter = self.time_filter if time_filter is None else time_filter
+        if self.streaming:
+            return
+        if self.database:
+            self.store = SQLiteTrafficData.open(self.database, self.data_file_path, time_filter)
+        elif self.columnar and arrow_format(self.data_file_path):
+            columns = read_arrow_columns(self.data_file_path, time_filter.start_slot, time_filter.end_slot)
+            self.columns = columns.select(time_filter)
+        elif self.columnar and (self.memory_map or time_filter):
+            self.columns = ColumnarTrafficData.from_mmap(self.data_file_path, time_filter)
+        elif self.columnar:
+            self.columns = ColumnarTrafficData.from_file(self.data_file_path)
+        elif arrow_format(self.data_file_path):
+            traffic_records = read_arrow_records(self.data_file_path, time_filter.start_slot, time_filter.end_slot)
+            self.traffic_data = time_filter.select_records(traffic_records)
+        elif self.memory_map or time_filter:
+            self.traffic_data = TrafficRecords.from_slots(read_slots_mmap(self.data_file_path, time_filter))
+        else:
+            self._transform_data()
+
+    def _load_cached(self):
+        """
+        Function to load the data file from its binary cache file, or to load it and write the cache file.
+        The cache file holds the whole data file, the time_filter selects from it once it is loaded.
+        """
+        source_stat = os.stat(self.data_file_path)
+        traffic_records = load_cached(self.data_file_path)
+        if traffic_records is None:
+            self._load(TimeFilter())
+            if self.columnar and not self.columns.on_half_hours():
+                logger.warning("Not caching %s, its timestamps are not all on a half hour", self.data_file_path)
+            else:
+                traffic_records = self.columns.to_traffic_records() if self.columnar else self.traffic_data
+                save_cached(self.data_file_path, traffic_records, source_stat=source_stat)
+            if self.columnar:
+                self.columns = self.columns.select(self.time_filter)
+            else:
+                self.traffic_data = self.time_filter.select_records(self.traffic_data)
+        elif self.columnar:
+            self.columns = ColumnarTrafficData.from_traffic_records(self.time_filter.select_records(traffic_records))
+        else:
+            self.traffic_data = self.time_filter.select_records(traffic_records)
 
     def _transform_data(self):
         """
         Function to transform the data from file into a dictionary.
         """
-        with open(self.data_file_path, "r") as data_file:
-            data = [(x.strip().split()) for x in data_file.readlines()]
-            self.traffic_data = [TrafficRecord(timestamp=k, car_count=int(v)) for k, v in data]
+        with open_data_file(self.data_file_path, "r") as data_file:
+            data = (x.strip().split() for x in data_file)
+            self.traffic_data = TrafficRecords.from_records(TrafficRecord(timestamp=k, car_count=int(v)) for k, v in data)
+
+    def _read_records(self):
+        """
+        Function to read the data files lazily as a generator of TrafficRecord.
+        """
+        if self.counters:
+            yield from self._aggregate_counters().global_records()
+            return
+        for file_path in self.data_files:
+            yield from read_file_records(file_path, self.memory_map, self.time_filter)
+
+    def _records(self):
+        """
+        Function to iterate over the records of whichever backend is in use.
+        """
+        if self.streaming:
+            return self._read_records()
+        if self.columnar:
+            return self.columns.iter_records()
+        if self.database:
+            return self.store.iter_records()
+        return iter(self.traffic_data)
+
+    def _stream_aggregate(self, n=3):
+        """
+        Function to aggregate the data files in a single streaming pass.
+        Several files are aggregated in parallel and their partial aggregates merged.
+        With a state_file only the lines appended since the last run are aggregated.
+        The aggregate is reused by later queries unless a larger top n is asked for.
+        """
+        if self._aggregator is None or self._aggregator.top_n < n:
+            if self.counters:
+                aggregator = self._aggregate_counters(n).global_aggregator()
+            elif self.state_file:
+                if arrow_format(self.data_file_path) or compression_format(self.data_file_path):
+                    raise ValueError("incremental mode needs an uncompressed text data file")
+                aggregator = update_state(self.data_file_path, self.state_file, top_n=max(n, 3))
+            elif len(self.data_files) > 1:
+                aggregator = aggregate_files(self.data_files, top_n=max(n, 3), max_workers=self.workers,
+                                             memory_map=self.memory_map, time_filter=self.time_filter)
+            else:
+                aggregator = TrafficAggregator(top_n=max(n, 3))
+                for record in self._read_records():
+                    aggregator.add(record)
+            self._aggregator = aggregator
+        return self._aggregator
+
+    def _aggregate_counters(self, n=3):
+        """
+        Function to aggregate the data files per counter and globally in a single streaming pass,
+        writing the counter shards when a shard_dir is given. The aggregate is reused by later
+        queries unless a larger top n is asked for.
+        """
+        if self._counter_aggregator is None or self._counter_aggregator.top_n < n:
+            self._counter_aggregator = aggregate_counters(self.data_files, top_n=max(n, 3), shard_dir=self.shard_dir,
+                                                          time_filter=self.time_filter)
+        return self._counter_aggregator
 
     def _get_date(self, timestamp):
         """
         Function to convert timestamp to date in YYYY-MM-DD format.
         """
-        return datetime.fromisoformat(timestamp).date().strftime("%Y-%m-%d")
+        return slot_to_date(parse_slot(timestamp))
 
     def _next_ts(self, timestamp, delta_mins):
         """
         Function to get the next timestamp after adding delta minutes.
         """
-        timestamp_dt = datetime.fromisoformat(timestamp)
-        new_timestamp_dt = timestamp_dt + timedelta(minutes=delta_mins)
-        return new_timestamp_dt.isoformat()
+        return slot_to_timestamp(parse_slot(timestamp) + delta_mins // 30)
 
     def _has_contiguous_records(self, i: int) -> bool:
         """
         Function to check if the given timestamp has contiguous records
-        for the next 30 minutes and 60 minutes.
+        for the next 30 minutes and 60 minutes, looked up in the segments of the range index.
         """
-        timestamp = self.traffic_data[i].timestamp
-        if i + 2 < len(self.traffic_data):
-            return (self.traffic_data[i + 1].timestamp == self._next_ts(timestamp, 30) and
-                    self.traffic_data[i + 2].timestamp == self._next_ts(timestamp, 60))
-        return False
+        return self.get_range_index().contiguous_records(i) >= 3
 
     def _get_next_records(self, i: int):
         """
@@ -97,8 +567,8 @@ class TrafficAnalyzer:
         Function to calculate car count for contiguous 90 minutes intervals.
         """
         return [
-            TrafficRecord(
-                timestamp=self.traffic_data[i].timestamp,
+            TrafficRecord.from_slot(
+                self.traffic_data[i].slot,
                 car_count=sum(record.car_count for record in self._get_next_records(i)),
                 duration_mins=90
             )